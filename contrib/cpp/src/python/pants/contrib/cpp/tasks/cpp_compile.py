@@ -5,17 +5,38 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import errno
+import hashlib
+import json
 import os
+import re
+import shutil
+import uuid
+from collections import OrderedDict
+from multiprocessing import cpu_count
 
 from pants.base.build_environment import get_buildroot
 from pants.base.workunit import WorkUnitLabel
-from pants.util.dirutil import safe_mkdir_for
+from pants.invalidation.build_invalidator import CacheKey
+from pants.util.dirutil import (safe_concurrent_rename, safe_delete, safe_mkdir, safe_mkdir_for,
+                                safe_rmtree)
 
 from pants.contrib.cpp.tasks.cpp_task import CppTask
 
 
 class CppCompile(CppTask):
-  """Compile C++ sources into object files."""
+  """Compile C++ sources into object files.
+
+  Each source is compiled to its own object, on a pool of workers. Objects are kept in a store in
+  the workdir, keyed by the compiler, its options and the source. Alongside each object, the store
+  records the digests of every file that the compiler read to produce it (as listed in the depfile
+  written by `-MD`), so an object is only recompiled once its source or one of the headers it
+  includes has changed. Objects are also shared via the artifact cache, under the same key, rather
+  than per target.
+  """
+
+  _OBJECT_NAME = 'object.o'
+  _INPUTS_NAME = 'inputs.json'
 
   @classmethod
   def register_options(cls, register):
@@ -26,13 +47,22 @@ class CppCompile(CppTask):
              default=['.cc', '.cxx', '.cpp'],
              help=('The list of extensions to consider when determining if a file is a '
                    'C++ source file.'))
+    register('--worker-count', advanced=True, type=int, default=cpu_count(),
+             help='The number of sources to compile concurrently.')
 
   @classmethod
   def product_types(cls):
     return ['objs']
 
+  def __init__(self, *args, **kwargs):
+    super(CppCompile, self).__init__(*args, **kwargs)
+    # Digests of the inputs of compiles, by absolute path, which are shared between the sources
+    # that include the same headers.
+    self._digests = {}
+
   @property
-  def cache_target_dirs(self):
+  def create_target_dirs(self):
+    # Objects are cached individually, so the results dirs that they are linked into are not.
     return True
 
   def execute(self):
@@ -47,18 +77,34 @@ class CppCompile(CppTask):
     # Compile source files to objects.
     with self.invalidated(targets, invalidate_dependents=True) as invalidation_check:
       obj_mapping = self.context.products.get('objs')
+      compiles = []
       for vt in invalidation_check.all_vts:
         for source in vt.target.sources_relative_to_buildroot():
           if is_cc(source):
-            if not vt.valid:
-              with self.context.new_workunit(name='cpp-compile', labels=[WorkUnitLabel.MULTITOOL]):
-                # TODO: Parallelise the compilation.
-                # TODO: Only recompile source files that have changed since the
-                #       object file was last written. Also use the output from
-                #       gcc -M to track dependencies on headers.
-                self._compile(vt.target, vt.results_dir, source)
             objpath = self._objpath(vt.target, vt.results_dir, source)
+            if not vt.valid:
+              compiles.append((vt.target, source, objpath))
             obj_mapping.add(vt.target, vt.results_dir).append(objpath)
+      if compiles:
+        self._compile_all(compiles)
+
+  def _compile_all(self, compiles):
+    """Places the objects of the given (target, source, objpath) tuples, compiling as needed."""
+    # Sources with the same key share an object dir, so each key is placed by a single worker.
+    compiles_by_key = OrderedDict()
+    for target, source, objpath in compiles:
+      key = self._object_cache_key(target, source)
+      if key in compiles_by_key:
+        compiles_by_key[key][3].append(objpath)
+      else:
+        compiles_by_key[key] = (key, target, source, [objpath])
+    with self.context.new_workunit(name='cpp-compile', labels=[WorkUnitLabel.MULTITOOL]):
+      compiled = self.map_concurrently('cpp-compile', self._compile, compiles_by_key.values(),
+                                       self.get_options().worker_count)
+    # An existing entry may be for different versions of the headers, so always overwrite it.
+    self.update_artifact_cache_for_keys([(cache_key, [object_dir])
+                                         for cache_key, object_dir in filter(None, compiled)],
+                                        overwrite=True)
 
   def _objpath(self, target, results_dir, source):
     abs_source_root = os.path.join(get_buildroot(), target.target_base)
@@ -69,27 +115,150 @@ class CppCompile(CppTask):
 
     return os.path.join(results_dir, obj_name)
 
-  def _compile(self, target, results_dir, source):
-    """Compile given source to an object file."""
-    obj = self._objpath(target, results_dir, source)
-    safe_mkdir_for(obj)
-
-    abs_source = os.path.join(get_buildroot(), source)
-
+  def _include_dirs(self, target):
     # TODO: include dir should include dependent work dir when headers are copied there.
     include_dirs = []
     for dep in target.dependencies:
       if self.is_library(dep):
         include_dirs.extend([os.path.join(get_buildroot(), dep.target_base)])
+    return include_dirs
+
+  def _digest(self, path):
+    """Returns the sha1 of the file at the given path, or None if it does not exist."""
+    try:
+      return self._digests[path]
+    except KeyError:
+      pass
+    try:
+      with open(path, 'rb') as fp:
+        digest = hashlib.sha1(fp.read()).hexdigest()
+    except IOError as e:
+      if e.errno != errno.ENOENT:
+        raise
+      digest = None
+    self._digests[path] = digest
+    return digest
+
+  def _object_cache_key(self, target, source):
+    """Returns the key of the object compiled from the given source of the given target.
+
+    The key covers everything that determines the object except for the headers that the source
+    includes, which are checked against the inputs recorded with the object instead.
+    """
+    hasher = hashlib.sha1()
+    hasher.update(self.implementation_version_str().encode('utf-8'))
+    hasher.update(self.cpp_toolchain.fingerprint.encode('utf-8'))
+    for option in self.get_options().cc_options:
+      hasher.update(option.encode('utf-8'))
+      hasher.update(b'\0')
+    for include_dir in self._include_dirs(target):
+      hasher.update(os.path.relpath(include_dir, get_buildroot()).encode('utf-8'))
+      hasher.update(b'\0')
+    hasher.update(source.encode('utf-8'))
+    hasher.update((self._digest(os.path.join(get_buildroot(), source)) or '').encode('utf-8'))
+    return CacheKey(source.replace(os.sep, '.'), hasher.hexdigest())
+
+  def _object_dir(self, cache_key):
+    return os.path.join(self.workdir, 'objects', cache_key.hash)
+
+  def _is_up_to_date(self, object_dir):
+    """Returns True if the object in the given dir was compiled from the current inputs."""
+    try:
+      with open(os.path.join(object_dir, self._INPUTS_NAME), 'rb') as fp:
+        inputs = json.load(fp)
+    except (IOError, ValueError):
+      return False
+    if not os.path.isfile(os.path.join(object_dir, self._OBJECT_NAME)):
+      return False
+    # Relative inputs are relative to the buildroot, and absolute ones are outside of it.
+    return all(self._digest(os.path.join(get_buildroot(), path)) == digest
+               for path, digest in inputs.items())
+
+  def _use_cached_object(self, cache_key, object_dir):
+    """Fetches the object with the given key from the artifact cache, if it is up to date there."""
+    if not self.artifact_cache_reads_enabled():
+      return False
+    safe_rmtree(object_dir)
+    if not self.fetch_cached_artifact(cache_key):
+      return False
+    return self._is_up_to_date(object_dir)
+
+  def _compile(self, cache_key, target, source, objpaths):
+    """Places the object for the given source at objpaths, compiling it if it is not up to date.
+
+    :returns: The cache key and dir of the object if it was compiled, or None if it was reused.
+    """
+    object_dir = self._object_dir(cache_key)
+    compiled = None
+    if not self._is_up_to_date(object_dir) and not self._use_cached_object(cache_key, object_dir):
+      self._compile_object(target, source, object_dir)
+      compiled = (cache_key, object_dir)
+
+    for objpath in objpaths:
+      safe_mkdir_for(objpath)
+      safe_delete(objpath)
+      try:
+        os.link(os.path.join(object_dir, self._OBJECT_NAME), objpath)
+      except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+          raise
+        shutil.copy2(os.path.join(object_dir, self._OBJECT_NAME), objpath)
+    return compiled
+
+  def _compile_object(self, target, source, object_dir):
+    """Compile given source to an object file, recording the inputs that it was compiled from."""
+    tmp_dir = '{}.tmp.{}'.format(object_dir, uuid.uuid4().hex)
+    safe_mkdir(tmp_dir)
+    try:
+      obj = os.path.join(tmp_dir, self._OBJECT_NAME)
+      depfile = os.path.join(tmp_dir, 'object.d')
+      abs_source = os.path.join(get_buildroot(), source)
+
+      cmd = [self.cpp_toolchain.compiler]
+      cmd.extend(['-c'])
+      cmd.extend(('-I{0}'.format(i) for i in self._include_dirs(target)))
+      cmd.extend(['-MD', '-MF', depfile])
+      cmd.extend(['-o' + obj, abs_source])
+      cmd.extend(self.get_options().cc_options)
+
+      with self.context.new_workunit(name='cpp-compile',
+                                     labels=[WorkUnitLabel.COMPILER]) as workunit:
+        self.run_command(cmd, workunit)
+
+      # Inputs under the buildroot are recorded relative to it, so that objects can be shared
+      # between buildroots via the artifact cache.
+      buildroot_prefix = os.path.join(get_buildroot(), '')
+      inputs = {}
+      for path in parse_depfile(depfile):
+        path = os.path.normpath(os.path.join(get_buildroot(), path))
+        key = path[len(buildroot_prefix):] if path.startswith(buildroot_prefix) else path
+        inputs[key] = self._digest(path)
+      safe_delete(depfile)
+      with open(os.path.join(tmp_dir, self._INPUTS_NAME), 'wb') as fp:
+        json.dump(inputs, fp, sort_keys=True)
+
+      safe_concurrent_rename(tmp_dir, object_dir)
+    finally:
+      safe_rmtree(tmp_dir)
+
+    self.context.log.info('Built c++ object: {0}'.format(source))
+
+
+# Prerequisites are separated by whitespace and escaped newlines, but not by escaped spaces.
+_DEPFILE_SEPARATOR_RE = re.compile(r'(?<!\\)(?:\s|\\\n)+')
+_DEPFILE_ESCAPE_RE = re.compile(r'\\([ #\\])')
 
-    cmd = [self.cpp_toolchain.compiler]
-    cmd.extend(['-c'])
-    cmd.extend(('-I{0}'.format(i) for i in include_dirs))
-    cmd.extend(['-o' + obj, abs_source])
-    cmd.extend(self.get_options().cc_options)
 
-    # TODO: submit_async_work with self.run_command, [(cmd)] as a Work object.
-    with self.context.new_workunit(name='cpp-compile', labels=[WorkUnitLabel.COMPILER]) as workunit:
-      self.run_command(cmd, workunit)
+def parse_depfile(path):
+  """Returns the prerequisites of the rule in the Makefile depfile at the given path.
 
-    self.context.log.info('Built c++ object: {0}'.format(obj))
+  :param string path: The path of a depfile written by the compiler's `-MD` or `-MMD` option.
+  :returns: The paths of the source and the headers that were read to compile it.
+  """
+  with open(path, 'rb') as fp:
+    contents = fp.read().decode('utf-8')
+  # Only the first rule is of interest: `-MP` adds phony rules for each header after it.
+  rule = re.split(r'\n(?=\S)', contents, 1)[0]
+  _, _, prerequisites = rule.partition(': ')
+  words = _DEPFILE_SEPARATOR_RE.split(prerequisites.strip())
+  return [_DEPFILE_ESCAPE_RE.sub(r'\1', word).replace('$$', '$') for word in words if word]
@@ -9,6 +9,7 @@ import subprocess
 
 from pants.base.exceptions import TaskError
 from pants.task.task import Task
+from pants.util.memo import memoized_property
 
 from pants.contrib.cpp.targets.cpp_binary import CppBinary
 from pants.contrib.cpp.targets.cpp_library import CppLibrary
@@ -46,6 +47,6 @@ class CppTask(Task):
     except subprocess.CalledProcessError as e:
       raise TaskError('Execution failed: {0}'.format(e))
 
-  @property
+  @memoized_property
   def cpp_toolchain(self):
     return CppToolchain(self.get_options().compiler)
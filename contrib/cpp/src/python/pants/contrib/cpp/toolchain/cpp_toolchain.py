@@ -5,7 +5,9 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import hashlib
 import os
+import subprocess
 
 
 class CppToolchain(object):
@@ -18,6 +20,7 @@ class CppToolchain(object):
     """Create a cpp toolchain and cache tools for quick retrieval."""
     self._validated_tools = {}
     self._compiler = compiler
+    self._fingerprint = None
 
   @property
   def compiler(self):
@@ -29,6 +32,21 @@ class CppToolchain(object):
       raise self.Error('Please set the CXX environment variable or the "compiler" option.')
     return self.register_tool(name='compiler', tool=_compiler)
 
+  @property
+  def fingerprint(self):
+    """A fingerprint of the compiler, which changes if it is switched or upgraded."""
+    if self._fingerprint is None:
+      compiler = self.compiler
+      try:
+        version = subprocess.check_output([compiler, '--version'], stderr=subprocess.STDOUT)
+      except (OSError, subprocess.CalledProcessError) as e:
+        raise self.Error('Failed to determine the version of {0}: {1}'.format(compiler, e))
+      hasher = hashlib.sha1()
+      hasher.update(compiler.encode('utf-8'))
+      hasher.update(version)
+      self._fingerprint = hasher.hexdigest()
+    return self._fingerprint
+
   def register_tool(self, tool, name=None):
     """Check tool and see if it is installed in the local cpp toolchain.
 
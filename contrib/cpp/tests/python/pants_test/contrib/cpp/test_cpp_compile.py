@@ -0,0 +1,124 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+from unittest import skipUnless
+
+from mock import patch
+from pants.util.contextutil import temporary_dir
+from pants_test.tasks.task_test_base import TaskTestBase
+
+from pants.contrib.cpp.targets.cpp_library import CppLibrary
+from pants.contrib.cpp.tasks.cpp_compile import CppCompile, parse_depfile
+from pants.contrib.cpp.toolchain.cpp_toolchain import CppToolchain
+
+
+def have_compiler():
+  try:
+    CppToolchain().compiler
+    return True
+  except CppToolchain.Error:
+    return False
+
+
+class ParseDepfileTest(unittest.TestCase):
+  def parse(self, contents):
+    with temporary_dir() as tmpdir:
+      depfile = os.path.join(tmpdir, 'object.d')
+      with open(depfile, 'wb') as fp:
+        fp.write(contents.encode('utf-8'))
+      return parse_depfile(depfile)
+
+  def test_continued_lines(self):
+    self.assertEqual(['/src/a.cc', '/src/a.h', '/usr/include/stdio.h'],
+                     self.parse('/out/object.o: /src/a.cc /src/a.h \\\n /usr/include/stdio.h\n'))
+
+  def test_escapes(self):
+    self.assertEqual(['/src/a b.cc', '/src/#c.h', '/src/$d.h'],
+                     self.parse('/out/object.o: /src/a\\ b.cc /src/\\#c.h /src/$$d.h\n'))
+
+  def test_phony_rules_ignored(self):
+    self.assertEqual(['/src/a.cc', '/src/a.h'],
+                     self.parse('/out/object.o: /src/a.cc \\\n  /src/a.h\n\n/src/a.h:\n'))
+
+
+class CppCompileTest(TaskTestBase):
+
+  @classmethod
+  def task_type(cls):
+    return CppCompile
+
+  def compile(self, **options):
+    """Compiles the `lib` library, returning the sources that had to be recompiled."""
+    # Make the target anew each time, so that its fingerprint reflects changes to its sources.
+    self.reset_build_graph()
+    target = self.make_target(spec='src/cpp/lib', target_type=CppLibrary,
+                              sources=['a.cc', 'b.cc', 'a.h'])
+    self.set_options(compiler=CppToolchain().compiler, **options)
+    task = self.create_task(self.context(target_roots=[target]))
+
+    compiled = []
+    compile_object = task._compile_object
+    def record_compile(target, source, object_dir):
+      compiled.append(source)
+      compile_object(target, source, object_dir)
+
+    with patch.object(task, '_compile_object', side_effect=record_compile):
+      task.execute()
+    objs = task.context.products.get('objs').get(target)
+    self.assertEqual(1, len(objs))
+    for results_dir, names in objs.items():
+      self.assertEqual(['lib/a.o', 'lib/b.o'],
+                       sorted(os.path.relpath(name, results_dir) for name in names))
+      for name in names:
+        self.assertTrue(os.path.isfile(os.path.join(results_dir, name)))
+    return sorted(compiled)
+
+  def setUp(self):
+    super(CppCompileTest, self).setUp()
+    self.create_file('src/cpp/lib/a.h', 'int a();\n')
+    self.create_file('src/cpp/lib/a.cc', '#include "a.h"\nint a() { return 1; }\n')
+    self.create_file('src/cpp/lib/b.cc', 'int b() { return 2; }\n')
+
+  @skipUnless(have_compiler(), reason='cpp compile tests require a compiler')
+  def test_only_objects_with_changed_inputs_recompiled(self):
+    self.assertEqual(['src/cpp/lib/a.cc', 'src/cpp/lib/b.cc'], self.compile())
+    self.assertEqual([], self.compile())
+
+    # Only a.cc includes the header.
+    self.create_file('src/cpp/lib/a.h', 'int a();\nint c();\n')
+    self.assertEqual(['src/cpp/lib/a.cc'], self.compile())
+
+    self.create_file('src/cpp/lib/b.cc', 'int b() { return 3; }\n')
+    self.assertEqual(['src/cpp/lib/b.cc'], self.compile())
+
+  @skipUnless(have_compiler(), reason='cpp compile tests require a compiler')
+  def test_changed_options_recompile(self):
+    self.assertEqual(['src/cpp/lib/a.cc', 'src/cpp/lib/b.cc'], self.compile())
+
+    # Invalidate the target, and check that its unchanged sources are recompiled too.
+    self.create_file('src/cpp/lib/b.cc', 'int b() { return 3; }\n')
+    self.assertEqual(['src/cpp/lib/a.cc', 'src/cpp/lib/b.cc'], self.compile(cc_options=['-O2']))
+
+  @skipUnless(have_compiler(), reason='cpp compile tests require a compiler')
+  def test_shared_sources_compiled_once(self):
+    self.set_options(compiler=CppToolchain().compiler)
+    targets = [self.make_target(spec='src/cpp/lib:{}'.format(name), target_type=CppLibrary,
+                                sources=['a.cc', 'b.cc', 'a.h'])
+               for name in ('one', 'two')]
+    task = self.create_task(self.context(target_roots=targets))
+
+    with patch.object(task, '_compile_object', wraps=task._compile_object) as compile_object:
+      task.execute()
+    self.assertEqual(['src/cpp/lib/a.cc', 'src/cpp/lib/b.cc'],
+                     sorted(call[0][1] for call in compile_object.call_args_list))
+    for target in targets:
+      for results_dir, names in task.context.products.get('objs').get(target).items():
+        self.assertEqual(2, len(names))
+        for name in names:
+          self.assertTrue(os.path.isfile(os.path.join(results_dir, name)))
@@ -45,3 +45,15 @@ class CppToolchainTest(unittest.TestCase):
   def test_invalid_tool_registration(self):
     with self.assertRaises(CppToolchain.Error):
       CppToolchain().register_tool('not-a-command')
+
+  def test_fingerprint(self):
+    def set_version(tool_path, version):
+      with open(tool_path, 'w') as fp:
+        fp.write('#!/bin/sh\necho {}\n'.format(version))
+
+    with self.tool('g++') as tool_path:
+      set_version(tool_path, '4.8')
+      fingerprint = CppToolchain(compiler=tool_path).fingerprint
+      self.assertEqual(fingerprint, CppToolchain(compiler=tool_path).fingerprint)
+      set_version(tool_path, '4.9')
+      self.assertNotEqual(fingerprint, CppToolchain(compiler=tool_path).fingerprint)
@@ -6,8 +6,11 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import os
+from functools import partial
+from multiprocessing import cpu_count
 
 from pants.base.exceptions import TaskError
+from pants.base.execution_graph import ExecutionFailure, ExecutionGraph, Job
 from pants.base.workunit import WorkUnitLabel
 from pants.util.dirutil import safe_mkdir
 
@@ -20,6 +23,9 @@ class GoCompile(GoWorkspaceTask):
 
   GoCompile will populate the "bin/" and "pkg/" directories of each target's Go
   workspace (see GoWorkspaceTask) with executables and library binaries respectively.
+
+  Each target is installed in its own workspace, so targets that do not depend on each other are
+  installed concurrently, each as soon as the targets it depends on have been installed.
   """
 
   @classmethod
@@ -27,6 +33,8 @@ class GoCompile(GoWorkspaceTask):
     super(GoCompile, cls).register_options(register)
     register('--build-flags', default='',
              help='Build flags to pass to Go compiler.')
+    register('--worker-count', advanced=True, type=int, default=cpu_count(),
+             help='The number of go install invocations to run concurrently.')
 
   @classmethod
   def product_types(cls):
@@ -39,14 +47,9 @@ class GoCompile(GoWorkspaceTask):
                           topological_order=True) as invalidation_check:
       # Maps each local/remote library target to its compiled binary.
       lib_binary_map = {}
-      for vt in invalidation_check.all_vts:
+      go_vts = [vt for vt in invalidation_check.all_vts if isinstance(vt.target, GoTarget)]
+      for vt in go_vts:
         gopath = self.get_gopath(vt.target)
-        if not isinstance(vt.target, GoTarget):
-          continue
-        if not vt.valid:
-          self.ensure_workspace(vt.target)
-          self._sync_binary_dep_links(vt.target, gopath, lib_binary_map)
-          self._go_install(vt.target, gopath)
         if self.is_binary(vt.target):
           binary_path = os.path.join(gopath, 'bin', os.path.basename(vt.target.address.spec_path))
           self.context.products.get_data('exec_binary')[vt.target] = binary_path
@@ -54,6 +57,60 @@ class GoCompile(GoWorkspaceTask):
           lib_binary_map[vt.target] = os.path.join(gopath, 'pkg', self.goos_goarch,
                                                    vt.target.import_path + '.a')
 
+      invalid_vts = [vt for vt in go_vts if not vt.valid]
+      if invalid_vts:
+        self._install_all(invalid_vts, lib_binary_map)
+
+  def _install_all(self, invalid_vts, lib_binary_map):
+    """Installs the targets of the given vts, which are in topological order.
+
+    Targets are installed on a pool of workers, each once all of the invalid targets that it
+    depends on have been installed.
+    """
+    worker_count = min(self.get_options().worker_count, len(invalid_vts))
+    if worker_count <= 1:
+      for vt in invalid_vts:
+        self._install(vt.target, lib_binary_map)
+      return
+
+    invalid_targets = set(vt.target for vt in invalid_vts)
+    jobs = []
+    for vt in invalid_vts:
+      dependencies = self._collect_invalid_dependencies(vt.target, invalid_targets)
+      jobs.append(Job(vt.target.address.spec,
+                      partial(self._install, vt.target, lib_binary_map),
+                      [dep.address.spec for dep in dependencies],
+                      on_success=vt.update,
+                      on_failure=vt.force_invalidate))
+
+    with self.worker_pool('go-compile', worker_count) as worker_pool:
+      try:
+        ExecutionGraph(jobs).execute(worker_pool, self.context.log)
+      except ExecutionFailure as e:
+        raise TaskError('Go compilation failure: {}'.format(e))
+
+  @staticmethod
+  def _collect_invalid_dependencies(target, invalid_targets):
+    """Returns the invalid targets in target's closure that no other such target depends on."""
+    invalid_dependencies = set()
+
+    def predicate(dep):
+      if dep is target:
+        return True
+      if dep in invalid_targets:
+        invalid_dependencies.add(dep)
+        return False
+      return True
+
+    target.walk(lambda dep: None, predicate)
+    return invalid_dependencies
+
+  def _install(self, target, lib_binary_map):
+    gopath = self.get_gopath(target)
+    self.ensure_workspace(target)
+    self._sync_binary_dep_links(target, gopath, lib_binary_map)
+    self._go_install(target, gopath)
+
   def _go_install(self, target, gopath):
     args = self.get_options().build_flags.split() + [target.import_path]
     result, go_cmd = self.go_dist.execute_go_cmd('install', gopath=gopath, args=args,
@@ -6,14 +6,16 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import os
-import shutil
+import threading
 from collections import defaultdict
+from multiprocessing import cpu_count
 
 from pants.base.exceptions import TaskError
+from pants.base.worker_pool import Work
 from pants.build_graph.address import Address
 from pants.build_graph.address_lookup_error import AddressLookupError
 from pants.util.contextutil import temporary_dir
-from pants.util.dirutil import safe_mkdir
+from pants.util.dirutil import safe_concurrent_rename, safe_mkdir, safe_mkdir_for
 
 from pants.contrib.go.subsystems.fetcher_factory import FetcherFactory
 from pants.contrib.go.targets.go_remote_library import GoRemoteLibrary
@@ -21,7 +23,13 @@ from pants.contrib.go.tasks.go_task import GoTask
 
 
 class GoFetch(GoTask):
-  """Fetches third-party Go libraries."""
+  """Fetches third-party Go libraries.
+
+  Remote libraries are fetched concurrently, on a pool of workers. As each remote library's
+  dependencies are resolved, they start downloading in the background, ahead of their own turn to
+  be fetched. The dependencies found are resolved in a fixed order, so the resulting build graph
+  does not depend on the order in which fetches finish.
+  """
 
   @classmethod
   def subsystem_dependencies(cls):
@@ -37,6 +45,13 @@ class GoFetch(GoTask):
              removal_version='1.2.0',
              removal_hint='Use --disallow-cloning-fetcher on scope go-fetchers instead.',
              help='Whether to ignore meta tag resolution when resolving remote libraries.')
+    register('--worker-count', advanced=True, type=int, default=cpu_count(),
+             help='The number of remote libraries to fetch concurrently.')
+
+  def __init__(self, *args, **kwargs):
+    super(GoFetch, self).__init__(*args, **kwargs)
+    self._download_cache = _DownloadCache(os.path.join(self.workdir, 'fetches'))
+    self._worker_pool = None
 
   @property
   def cache_target_dirs(self):
@@ -50,7 +65,16 @@ class GoFetch(GoTask):
     if not go_remote_libs:
       return
 
-    undeclared_deps = self._transitive_download_remote_libs(set(go_remote_libs))
+    worker_count = self.get_options().worker_count
+    if worker_count > 1:
+      with self.worker_pool('go-fetch', worker_count) as worker_pool:
+        self._worker_pool = worker_pool
+        try:
+          undeclared_deps = self._transitive_download_remote_libs(set(go_remote_libs))
+        finally:
+          self._worker_pool = None
+    else:
+      undeclared_deps = self._transitive_download_remote_libs(set(go_remote_libs))
     if undeclared_deps:
       self._log_undeclared_deps(undeclared_deps)
       raise TaskError('Failed to resolve transitive Go remote dependencies.')
@@ -67,19 +91,43 @@ class GoFetch(GoTask):
   def _get_fetcher(self, import_path):
     return FetcherFactory.global_instance().get_fetcher(import_path)
 
+  def _submit(self, func, *args):
+    """Calls func with args on the worker pool, if there is one.
+
+    :returns: A function that waits for and returns the result of the call.
+    """
+    if self._worker_pool is None:
+      result = func(*args)
+      return lambda: result
+    async_result = self._worker_pool.submit_async_work(Work(func, [args]))
+    # We need to specify a timeout explicitly, because otherwise python ignores SIGINT when waiting
+    # on a condition variable, so we won't be able to ctrl-c out.
+    return lambda: async_result.get(timeout=1000000000)[0]
+
+  def _prefetch(self, go_remote_libs):
+    """Starts downloading the given remote libraries in the background, if there are workers."""
+    # A library that ends up being satisfied from the artifact cache will not need its download.
+    if self._worker_pool is None or self.artifact_cache_reads_enabled():
+      return
+    for go_remote_lib in sorted(go_remote_libs, key=lambda lib: lib.address):
+      # Any failure is reported when the library is fetched in turn, which retries the download.
+      self._worker_pool.submit_async_work(
+        Work(self._download, [(go_remote_lib.import_path, go_remote_lib.rev)]))
+
+  def _download(self, pkg, rev):
+    return self._download_cache.fetch(self._get_fetcher(pkg), rev)
+
+  def _fetch_and_list_imports(self, gopath, pkg, rev, fetch):
+    """Fetches the package (if `fetch`) and returns its remote import paths."""
+    if fetch:
+      self._fetch_pkg(gopath, pkg, rev)
+    return self._get_remote_import_paths(pkg, gopath=gopath)
+
   def _fetch_pkg(self, gopath, pkg, rev):
     """Fetch the package and setup symlinks."""
     fetcher = self._get_fetcher(pkg)
     root = fetcher.root()
-    root_dir = os.path.join(self.workdir, 'fetches', root, rev)
-
-    # Only fetch each remote root once.
-    if not os.path.exists(root_dir):
-      with temporary_dir() as tmp_fetch_root:
-        fetcher.fetch(dest=tmp_fetch_root, rev=rev)
-        safe_mkdir(root_dir)
-        for path in os.listdir(tmp_fetch_root):
-          shutil.move(os.path.join(tmp_fetch_root, path), os.path.join(root_dir, path))
+    root_dir = self._download_cache.fetch(fetcher, rev)
 
     # TODO(John Sirois): Circle back and get get rid of this symlink tree.
     # GoWorkspaceTask will further symlink a single package from the tree below into a
@@ -96,8 +144,9 @@ class GoFetch(GoTask):
     for path in os.listdir(root_dir):
       os.symlink(os.path.join(root_dir, path), os.path.join(dest_dir, path))
 
-  def _map_fetched_remote_source(self, go_remote_lib, gopath, all_known_remote_libs, resolved_remote_libs, undeclared_deps):
-    for remote_import_path in self._get_remote_import_paths(go_remote_lib.import_path, gopath=gopath):
+  def _map_fetched_remote_source(self, go_remote_lib, remote_import_paths, all_known_remote_libs,
+                                 resolved_remote_libs, undeclared_deps):
+    for remote_import_path in remote_import_paths:
       fetcher = self._get_fetcher(remote_import_path)
       remote_root = fetcher.root()
       spec_path = os.path.join(go_remote_lib.target_base, remote_root)
@@ -110,7 +159,8 @@ class GoFetch(GoTask):
         try:
           # If we've already resolved a package from this remote root, its ok to define an
           # implicit synthetic remote target for all other packages in the same remote root.
-          same_remote_libs = [lib for lib in all_known_remote_libs if spec_path == lib.address.spec_path]
+          same_remote_libs = [lib for lib in all_known_remote_libs
+                              if spec_path == lib.address.spec_path]
           implicit_ok = any(same_remote_libs)
 
           # If we're creating a synthetic remote target, we should pin it to the same
@@ -153,14 +203,24 @@ class GoFetch(GoTask):
     go_remote_lib_src = self.context.products.get_data('go_remote_lib_src')
 
     with self.invalidated(go_remote_libs) as invalidation_check:
-      for vt in invalidation_check.all_vts:
+      # Fetch and list the imports of all libraries concurrently, but map their dependencies in
+      # order, so that synthetic targets are created and injected deterministically.
+      vts = sorted(invalidation_check.all_vts, key=lambda vt: vt.target.address)
+      import_paths_results = [
+        self._submit(self._fetch_and_list_imports, vt.results_dir, vt.target.import_path,
+                     vt.target.rev, not vt.valid)
+        for vt in vts]
+      for vt, import_paths_result in zip(vts, import_paths_results):
         go_remote_lib = vt.target
         gopath = vt.results_dir
 
-        if not vt.valid:
-          self._fetch_pkg(gopath, go_remote_lib.import_path, go_remote_lib.rev)
-        self._map_fetched_remote_source(go_remote_lib, gopath, all_known_remote_libs,
-                                        resolved_remote_libs, undeclared_deps)
+        newly_resolved_remote_libs = set()
+        self._map_fetched_remote_source(go_remote_lib, import_paths_result(),
+                                        all_known_remote_libs, newly_resolved_remote_libs,
+                                        undeclared_deps)
+        # Start downloading the next level of libraries while this one is still being fetched.
+        self._prefetch(newly_resolved_remote_libs)
+        resolved_remote_libs.update(newly_resolved_remote_libs)
 
         go_remote_lib_src[go_remote_lib] = os.path.join(gopath, 'src', go_remote_lib.import_path)
 
@@ -225,3 +285,37 @@ class GoFetch(GoTask):
                 # We assume relative imports are local to the package and skip attempts to
                 # recursively resolve them.
                 not self._is_relative(imp))]
+
+
+class _DownloadCache(object):
+  """A directory of fetched remote roots, keyed by the import path of the root and the revision.
+
+  Each root is only fetched once per revision, even when it is requested concurrently: concurrent
+  requests for the same root and revision wait for the first one to finish.
+  """
+
+  def __init__(self, cache_dir):
+    """
+    :param string cache_dir: The directory to fetch roots into.
+    """
+    self._cache_dir = cache_dir
+    self._lock = threading.Lock()
+    self._fetch_locks = {}
+
+  def fetch(self, fetcher, rev):
+    """Fetches the root of the given fetcher at the given revision, if it is not already.
+
+    :returns: The directory that the root was fetched to.
+    """
+    root_dir = os.path.normpath(os.path.join(self._cache_dir, fetcher.root(), rev))
+    with self._lock:
+      fetch_lock = self._fetch_locks.setdefault(root_dir, threading.Lock())
+    with fetch_lock:
+      if not os.path.exists(root_dir):
+        # Fetch into a sibling temporary dir, so that an interrupted fetch is never mistaken for a
+        # complete one.
+        safe_mkdir_for(root_dir)
+        with temporary_dir(root_dir=os.path.dirname(root_dir)) as tmp_fetch_root:
+          fetcher.fetch(dest=tmp_fetch_root, rev=rev)
+          safe_concurrent_rename(tmp_fetch_root, root_dir)
+    return root_dir
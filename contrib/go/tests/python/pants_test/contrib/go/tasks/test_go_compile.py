@@ -85,3 +85,14 @@ class GoCompileTest(TaskTestBase):
     mtime = lambda t: os.lstat(os.path.join(os.path.join(a_gopath, 'pkg', t.address.spec))).st_mtime
     # Make sure c's link was untouched, while b's link was refreshed.
     self.assertLessEqual(mtime(c), mtime(b) - 1)
+
+  def test_collect_invalid_dependencies(self):
+    d = self.make_target(spec='libD', target_type=GoLibrary)
+    c = self.make_target(spec='libC', target_type=GoLibrary)
+    b = self.make_target(spec='libB', target_type=GoLibrary, dependencies=[c])
+    a = self.make_target(spec='libA', target_type=GoLibrary, dependencies=[b, d])
+
+    # Only the nearest invalid dependencies are collected, through valid ones too.
+    self.assertEqual({b, d}, GoCompile._collect_invalid_dependencies(a, {a, b, c, d}))
+    self.assertEqual({c}, GoCompile._collect_invalid_dependencies(a, {a, c}))
+    self.assertEqual(set(), GoCompile._collect_invalid_dependencies(c, {a, b, c, d}))
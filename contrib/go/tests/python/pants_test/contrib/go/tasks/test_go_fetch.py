@@ -7,6 +7,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import os
 import shutil
+import threading
 from collections import defaultdict
 
 from pants.build_graph.address import Address
@@ -15,7 +16,7 @@ from pants_test.tasks.task_test_base import TaskTestBase
 
 from pants.contrib.go.subsystems.fetcher import ArchiveFetcher
 from pants.contrib.go.targets.go_remote_library import GoRemoteLibrary
-from pants.contrib.go.tasks.go_fetch import GoFetch
+from pants.contrib.go.tasks.go_fetch import GoFetch, _DownloadCache
 
 
 class GoFetchTest(TaskTestBase):
@@ -49,7 +50,8 @@ class GoFetchTest(TaskTestBase):
     r2 = self.make_target(spec='3rdparty/go/r2', target_type=GoRemoteLibrary)
 
     go_fetch = self.create_task(self.context())
-    resolved = go_fetch._resolve(r1, self.address('3rdparty/go/r2'), 'r2', rev=None, implicit_ok=False)
+    resolved = go_fetch._resolve(r1, self.address('3rdparty/go/r2'), 'r2', rev=None,
+                                 implicit_ok=False)
     self.assertEqual(r2, resolved)
 
   def test_resolve_and_inject_explicit_failure(self):
@@ -70,7 +72,8 @@ class GoFetchTest(TaskTestBase):
     r1 = self.make_target(spec='3rdparty/go/r1', target_type=GoRemoteLibrary)
     self.make_target(spec='3rdparty/go/r2', target_type=GoRemoteLibrary)
     go_fetch = self.create_task(self.context())
-    r2_resolved = go_fetch._resolve(r1, self.address('3rdparty/go/r2'), 'r2', rev=None, implicit_ok=True)
+    r2_resolved = go_fetch._resolve(r1, self.address('3rdparty/go/r2'), 'r2', rev=None,
+                                    implicit_ok=True)
     self.assertEqual(self.address('3rdparty/go/r2'), r2_resolved.address)
     self.assertIsInstance(r2_resolved, GoRemoteLibrary)
 
@@ -102,13 +105,13 @@ class GoFetchTest(TaskTestBase):
       self._create_zip(src, zipdir, t)
       self._create_remote_lib(t)
 
-  def _create_fetch_context(self, zipdir):
+  def _create_fetch_context(self, zipdir, target_roots=None):
     """Given a directory of zipfiles, creates a context for GoFetch."""
     matcher = ArchiveFetcher.UrlInfo(url_format=os.path.join(zipdir, '\g<zip>.zip'),
                                      default_rev='HEAD',
                                      strip_level=0)
     self.set_options_for_scope('go-fetchers', matchers={r'localzip/(?P<zip>[^/]+)': matcher})
-    context = self.context()
+    context = self.context(target_roots=target_roots)
     context.products.safe_create_data('go_remote_lib_src', lambda: defaultdict(str))
     return context
 
@@ -170,6 +173,64 @@ class GoFetchTest(TaskTestBase):
         self._assert_dependency_graph(r1, dep_graph)
         self._assert_dependency_graph(r2, dep_graph)
 
+  def _injected_graph(self):
+    return [(target.address.spec, [address.spec for address in
+                                   self.build_graph.dependencies_of(target.address)])
+            for target in self.build_graph.targets()]
+
+  def test_fetch_concurrently_out_of_order(self):
+    with temporary_dir() as src:
+      with temporary_dir() as zipdir:
+
+        dep_graph = {
+          'r1': ['r3', 'r4'],
+          'r2': ['r3'],
+          'r3': ['r4'],
+          'r4': []
+        }
+        self._init_dep_graph_files(src, zipdir, dep_graph)
+        target_roots = [self.target('3rdparty/go/localzip/r1'),
+                        self.target('3rdparty/go/localzip/r2')]
+
+        self.set_options(worker_count=1)
+        go_fetch = self.create_task(self._create_fetch_context(zipdir, target_roots))
+        go_fetch.execute()
+        expected_graph = self._injected_graph()
+
+        self.reset_build_graph()
+        self._init_dep_graph_files(src, zipdir, dep_graph)
+        target_roots = [self.target('3rdparty/go/localzip/r1'),
+                        self.target('3rdparty/go/localzip/r2')]
+
+        self.set_options(worker_count=4)
+        go_fetch = self.create_task(self._create_fetch_context(zipdir, target_roots))
+        go_fetch.invalidate()
+
+        # Each of the first and third libraries only finishes once the library after it, which is
+        # fetched at the same level, has.
+        waits_for = {'r1': 'r2', 'r3': 'r4'}
+        finished = defaultdict(threading.Event)
+        completions = []
+        fetch_and_list_imports = go_fetch._fetch_and_list_imports
+
+        def fetch_out_of_order(gopath, pkg, rev, fetch):
+          name = os.path.basename(pkg)
+          if name in waits_for:
+            self.assertTrue(finished[waits_for[name]].wait(timeout=60))
+          try:
+            return fetch_and_list_imports(gopath, pkg, rev, fetch)
+          finally:
+            completions.append(name)
+            finished[name].set()
+
+        go_fetch._fetch_and_list_imports = fetch_out_of_order
+        go_fetch.execute()
+
+        self.assertEqual(['r2', 'r1', 'r4', 'r3'], completions)
+        self.assertEqual(expected_graph, self._injected_graph())
+        self._assert_dependency_graph(target_roots[0], dep_graph)
+        self._assert_dependency_graph(target_roots[1], dep_graph)
+
   def test_transitive_download_remote_libs_undeclared_deps(self):
     with temporary_dir() as src:
       with temporary_dir() as zipdir:
@@ -191,6 +252,64 @@ class GoFetchTest(TaskTestBase):
         expected[r2] = {('localzip/r4', self.address('3rdparty/go/localzip/r4'))}
         self.assertEqual(undeclared_deps, expected)
 
+  class FakeFetcher(object):
+    def __init__(self, root, fetched=None):
+      self._root = root
+      self.fetches = []
+      self._fetched = fetched or threading.Event()
+
+    def root(self):
+      return self._root
+
+    def fetch(self, dest, rev=None):
+      self.fetches.append(rev)
+      self._fetched.wait()
+      with open(os.path.join(dest, 'a.go'), 'w') as fp:
+        fp.write('package a\n')
+
+  def test_download_cache_fetches_once(self):
+    with temporary_dir() as cache_dir:
+      download_cache = _DownloadCache(cache_dir)
+      fetched = threading.Event()
+      fetcher = self.FakeFetcher('github.com/u/a', fetched)
+      root_dirs = []
+      threads = [threading.Thread(target=lambda: root_dirs.append(download_cache.fetch(fetcher,
+                                                                                      'v1')))
+                 for _ in range(3)]
+      for thread in threads:
+        thread.start()
+      fetched.set()
+      for thread in threads:
+        thread.join()
+
+      expected_root_dir = os.path.join(cache_dir, 'github.com/u/a/v1')
+      self.assertEqual([expected_root_dir] * 3, root_dirs)
+      self.assertEqual(['v1'], fetcher.fetches)
+      self.assertTrue(os.path.isfile(os.path.join(expected_root_dir, 'a.go')))
+
+      # Each revision is fetched separately.
+      download_cache.fetch(fetcher, 'v2')
+      self.assertEqual(['v1', 'v2'], fetcher.fetches)
+
+  def test_download_cache_failed_fetch(self):
+    class FailingFetcher(self.FakeFetcher):
+      def fetch(self, dest, rev=None):
+        with open(os.path.join(dest, 'partial.go'), 'w') as fp:
+          fp.write('package')
+        raise IOError('Connection reset')
+
+    with temporary_dir() as cache_dir:
+      download_cache = _DownloadCache(cache_dir)
+      with self.assertRaises(IOError):
+        download_cache.fetch(FailingFetcher('github.com/u/a'), 'v1')
+      self.assertEqual([], os.listdir(os.path.join(cache_dir, 'github.com/u/a')))
+
+      fetched = threading.Event()
+      fetched.set()
+      fetcher = self.FakeFetcher('github.com/u/a', fetched)
+      root_dir = download_cache.fetch(fetcher, 'v1')
+      self.assertEqual(['a.go'], os.listdir(root_dir))
+
   def test_issues_2616(self):
     go_fetch = self.create_task(self.context())
     self.create_file('src/github.com/u/a/a.go', contents="""
@@ -6,14 +6,18 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import errno
+import hashlib
+import io
 import json
 import logging
 import os
 import pkgutil
 import threading
+import uuid
 import xml.etree.ElementTree as ET
 from abc import abstractmethod
 from collections import OrderedDict, defaultdict, namedtuple
+from multiprocessing.pool import ThreadPool
 
 import six
 from twitter.common.collections import OrderedSet
@@ -24,12 +28,15 @@ from pants.backend.jvm.subsystems.jar_dependency_management import (JarDependenc
 from pants.backend.jvm.targets.exclude import Exclude
 from pants.backend.jvm.targets.jar_dependency import JarDependency
 from pants.backend.jvm.targets.jar_library import JarLibrary
+from pants.base.build_environment import get_buildroot
 from pants.base.generator import Generator, TemplateData
 from pants.base.revision import Revision
 from pants.build_graph.target import Target
 from pants.ivy.bootstrapper import Bootstrapper
 from pants.java.util import execute_runner
-from pants.util.dirutil import safe_concurrent_creation, safe_mkdir, safe_open
+from pants.net.http.fetcher import Fetcher
+from pants.util.dirutil import (safe_concurrent_creation, safe_concurrent_rename, safe_delete,
+                                safe_mkdir, safe_mkdir_for, safe_open, safe_rmtree)
 from pants.util.fileutil import atomic_copy
 
 
@@ -243,6 +250,46 @@ class IvyResolveStep(IvyResolutionStep):
     FrozenResolution.dump_to_file(self.frozen_resolve_file, frozen_resolutions_by_conf)
     return result
 
+  def resolution_cache_key(self, targets, extra_args, identity):
+    """Returns the key of the resolve of these targets in an `IvyResolutionCache`.
+
+    :param targets: The targets to resolve.
+    :param extra_args: Any extra arguments that will be passed to ivy.
+    :param string identity: A fingerprint of the options that affect the resolve.
+    :returns: The key, or None if the resolve may not be reused.
+    :rtype: string
+    """
+    jars, global_excludes = IvyUtils.calculate_classpath(targets)
+    if self.soft_excludes:
+      global_excludes = []
+    return IvyResolutionCache.key_for(jars, global_excludes, self.confs, self.pinned_artifacts,
+                                      extra_args, self.ivy_cache_dir, identity)
+
+  def load_from_resolution_cache(self, resolution_cache, key, targets, fetch_workers=1):
+    """Loads the result of an identical resolve from the given cache, if there is one.
+
+    Any artifacts of the cached resolve that are missing from the ivy cache are fetched from their
+    origin.
+
+    :returns: The loaded result, or None if the resolve could not be loaded from the cache.
+    :rtype: :class:`IvyResolveResult`
+    """
+    if not resolution_cache.restore(key, self):
+      return None
+    fetcher = IvyArtifactFetcher(fetch_workers, os.path.join(self.global_ivy_workdir,
+                                                             'fetched-artifacts'))
+    fetched = fetcher.fetch_missing(self.workdir_reports_by_conf.values())
+    IvyArtifactFetcher.relocate(fetched, self.workdir_reports_by_conf.values(),
+                                self.ivy_cache_classpath_filename)
+    result = self.load(targets)
+    if not result.all_linked_artifacts_exist():
+      logger.debug('Artifacts of cached resolve {} are missing, ignoring it.'.format(key))
+      return None
+
+    frozen_resolutions_by_conf = result.get_frozen_resolutions_by_conf(targets)
+    FrozenResolution.dump_to_file(self.frozen_resolve_file, frozen_resolutions_by_conf)
+    return result
+
   def _do_resolve(self, executor, extra_args, targets, jvm_options, workunit_name, workunit_factory):
     safe_mkdir(self.workdir)
 
@@ -369,6 +416,268 @@ class FrozenResolution(object):
         json.dump(res, f)
 
 
+class IvyResolutionCache(object):
+  """A cache of the outputs of ivy resolves, keyed by what was resolved rather than by targets.
+
+  The resolve step of a set of targets is keyed by the fingerprints of those targets, so any change
+  to the targets means a new resolve, even if the jars, excludes and confs that ivy is asked to
+  resolve are the same as a previous resolve's. This cache stores the ivy reports and classpath of
+  each resolve under a key computed from just those inputs, so that the result of a previous
+  resolve can be loaded in place of running ivy again.
+  """
+
+  _CLASSPATH_FILENAME = 'classpath.raw'
+
+  @staticmethod
+  def is_dynamic_rev(rev):
+    """Returns True if ivy may resolve the given rev to a different revision over time.
+
+    This covers snapshots, `latest.*` revs, prefix revs like `1.+` and version ranges like
+    `[1.0,2.0)`. A missing rev is treated as dynamic.
+
+    :param string rev: An ivy revision.
+    :rtype: bool
+    """
+    if not rev:
+      return True
+    return (rev.endswith('SNAPSHOT') or rev.startswith('latest.') or rev.endswith('+') or
+            (rev[0] in '[]()' and rev[-1] in '[]()'))
+
+  @classmethod
+  def key_for(cls, jars, excludes, confs, pinned_artifacts, extra_args, ivy_cache_dir, identity):
+    """Computes the cache key for a resolve.
+
+    Jars are kept in the order given, since ivy orders the resolved classpath by the order of the
+    dependencies it was asked to resolve. Resolves of mutable jars or of jars with dynamic revs are
+    not cached, since ivy may resolve them differently each time.
+
+    :param jars: The JarDependencies to resolve.
+    :param excludes: The global excludes of the resolve.
+    :param confs: The ivy confs to resolve.
+    :param pinned_artifacts: The managed artifact set to pin versions with, or None.
+    :param extra_args: Any extra arguments passed to ivy.
+    :param string ivy_cache_dir: The ivy cache dir that the resolved artifacts are stored in.
+    :param string identity: A fingerprint of the options that affect the resolve.
+    :returns: The key, or None if the resolve may not be cached.
+    :rtype: string
+    """
+    def pinned_rev(jar):
+      return pinned_artifacts.get(jar.coordinate).rev if pinned_artifacts else jar.rev
+
+    if any(jar.mutable or cls.is_dynamic_rev(pinned_rev(jar)) for jar in jars):
+      return None
+    if pinned_artifacts and any(cls.is_dynamic_rev(coord.rev) for coord in pinned_artifacts):
+      return None
+
+    def jar_key(jar):
+      return [jar.org, jar.name, jar.rev, jar.force, jar.ext, jar.url, jar.classifier,
+              jar.transitive, jar.mutable, sorted([e.org, e.name] for e in jar.excludes)]
+
+    request = dict(jars=[jar_key(jar) for jar in jars],
+                   excludes=sorted([e.org, e.name] for e in excludes),
+                   confs=sorted(confs),
+                   pinned=list(pinned_artifacts.id) if pinned_artifacts else [],
+                   extra_args=list(extra_args or ()),
+                   ivy_cache_dir=ivy_cache_dir,
+                   identity=identity)
+    return hashlib.sha1(json.dumps(request, sort_keys=True)).hexdigest()
+
+  def __init__(self, cache_dir):
+    """
+    :param string cache_dir: The directory to store cached resolves in.
+    """
+    self._cache_dir = cache_dir
+
+  def _entry_dir(self, key):
+    return os.path.join(self._cache_dir, key)
+
+  @staticmethod
+  def _report_filename(conf):
+    return 'report-{}.xml'.format(conf)
+
+  def restore(self, key, resolve_step):
+    """Copies the outputs of the cached resolve with the given key into the resolve step.
+
+    :param string key: The key of the resolve.
+    :param resolve_step: The step to restore the outputs of.
+    :type resolve_step: :class:`IvyResolveStep`
+    :returns: True if the cached resolve was restored.
+    """
+    entry_dir = self._entry_dir(key)
+    copies = [(os.path.join(entry_dir, self._CLASSPATH_FILENAME),
+               resolve_step.ivy_cache_classpath_filename)]
+    copies.extend((os.path.join(entry_dir, self._report_filename(conf)), report_path)
+                  for conf, report_path in resolve_step.workdir_reports_by_conf.items())
+    if not all(os.path.isfile(src) for src, _ in copies):
+      return False
+    try:
+      for src, dst in copies:
+        safe_mkdir_for(dst)
+        atomic_copy(src, dst)
+    except (IOError, OSError) as e:
+      logger.debug('Failed to restore cached resolve {}: {}'.format(key, e))
+      return False
+    logger.debug('Restored cached resolve {}.'.format(key))
+    return True
+
+  def store(self, key, resolve_step):
+    """Stores the outputs of a completed resolve step under the given key.
+
+    :param string key: The key of the resolve.
+    :param resolve_step: The step whose outputs to store.
+    :type resolve_step: :class:`IvyResolveStep`
+    """
+    entry_dir = self._entry_dir(key)
+    tmp_dir = '{}.tmp.{}'.format(entry_dir, uuid.uuid4().hex)
+    try:
+      safe_mkdir(tmp_dir)
+      atomic_copy(resolve_step.ivy_cache_classpath_filename,
+                  os.path.join(tmp_dir, self._CLASSPATH_FILENAME))
+      for conf, report_path in resolve_step.workdir_reports_by_conf.items():
+        atomic_copy(report_path, os.path.join(tmp_dir, self._report_filename(conf)))
+      safe_concurrent_rename(tmp_dir, entry_dir)
+    except (IOError, OSError) as e:
+      logger.debug('Failed to cache resolve {}: {}'.format(key, e))
+    finally:
+      safe_rmtree(tmp_dir)
+
+
+class IvyArtifactFetcher(object):
+  """Fetches artifacts listed in ivy reports that are missing from the ivy cache, in parallel.
+
+  Ivy downloads the artifacts of a resolve one at a time. When a resolve is loaded from an
+  `IvyResolutionCache` instead, any of its artifacts that have since been removed from the ivy cache
+  are fetched concurrently from the origin locations recorded in the reports. Fetched artifacts are
+  kept in a directory of their own rather than in the ivy cache, which ivy expects to hold its
+  metadata alongside every artifact. Failures are logged and leave the artifact missing, so that
+  the caller falls back to resolving with ivy.
+  """
+
+  def __init__(self, num_workers, artifacts_dir, fetcher=None, timeout_secs=None):
+    """
+    :param int num_workers: The maximum number of artifacts to fetch concurrently.
+    :param string artifacts_dir: The directory to store fetched artifacts in.
+    :param fetcher: The fetcher to download with; by default a new `Fetcher`.
+    :param timeout_secs: The read timeout of each download.
+    """
+    self._num_workers = max(1, num_workers)
+    self._artifacts_dir = artifacts_dir
+    self._fetcher = fetcher or Fetcher(get_buildroot())
+    self._timeout_secs = timeout_secs or 30
+
+  @staticmethod
+  def missing_artifacts(report_paths):
+    """Returns a dict of the missing cache paths of the reported artifacts to their origin urls.
+
+    Artifacts with a local origin are not included.
+    """
+    missing = OrderedDict()
+    for report_path in report_paths:
+      root = ET.parse(report_path).getroot()
+      for artifact in root.findall('dependencies/module/revision/artifacts/artifact'):
+        location = artifact.get('location')
+        origin = artifact.find('origin-location')
+        if (location and origin is not None and origin.get('is-local') != 'true' and
+            not os.path.isfile(location)):
+          missing[location] = origin.get('location')
+    return missing
+
+  @staticmethod
+  def relocate(paths_by_location, report_paths, classpath_filename):
+    """Points the given reports and raw classpath file at relocated artifacts.
+
+    :param dict paths_by_location: The new paths of artifacts, keyed by their ivy cache locations.
+    :param report_paths: The paths of ivy xml reports to update.
+    :param string classpath_filename: The path of a raw ivy classpath file to update.
+    """
+    if not paths_by_location:
+      return
+    for report_path in report_paths:
+      tree = ET.parse(report_path)
+      for artifact in tree.getroot().findall('dependencies/module/revision/artifacts/artifact'):
+        location = artifact.get('location')
+        if location in paths_by_location:
+          artifact.set('location', paths_by_location[location])
+      with safe_concurrent_creation(report_path) as tmp_path:
+        tree.write(tmp_path, encoding='utf-8', xml_declaration=True)
+
+    # Ivy may list the real paths of artifacts on the classpath.
+    paths_by_real_location = {os.path.realpath(location): path
+                              for location, path in paths_by_location.items()}
+    classpath = IvyUtils._load_classpath_from_cachepath(classpath_filename)
+    with safe_concurrent_creation(classpath_filename) as tmp_path:
+      with open(tmp_path, 'w') as fp:
+        fp.write(os.pathsep.join(paths_by_real_location.get(os.path.realpath(path), path)
+                                 for path in classpath))
+
+  def fetch_path(self, location, url):
+    """Returns the path that the artifact at the given ivy cache location is fetched to."""
+    url_hash = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    return os.path.join(self._artifacts_dir, url_hash, os.path.basename(location))
+
+  def fetch_missing(self, report_paths):
+    """Fetches the artifacts of the given reports that are missing from the ivy cache.
+
+    Artifacts that were fetched by an earlier call are not fetched again.
+
+    :param report_paths: The paths of ivy xml reports.
+    :returns: The fetched paths of the available missing artifacts, keyed by their ivy cache
+              locations.
+    :rtype: dict
+    """
+    fetched = OrderedDict()
+    to_fetch = []
+    for location, url in self.missing_artifacts(report_paths).items():
+      path = self.fetch_path(location, url)
+      if os.path.isfile(path):
+        fetched[location] = path
+      else:
+        to_fetch.append((location, url, path))
+    if to_fetch:
+      logger.debug('Fetching {} missing artifacts.'.format(len(to_fetch)))
+      pool = ThreadPool(processes=min(self._num_workers, len(to_fetch)))
+      try:
+        results = pool.map(self._fetch, to_fetch)
+      finally:
+        pool.close()
+        pool.join()
+      fetched.update((location, path) for (location, _, path), ok in zip(to_fetch, results) if ok)
+    return fetched
+
+  def _fetch(self, location_url_and_path):
+    _, url, path = location_url_and_path
+    safe_mkdir_for(path)
+    tmp_path = '{}.tmp.{}'.format(path, uuid.uuid4().hex)
+    checksummer = self._fetcher.ChecksumListener(digest=hashlib.sha1())
+    try:
+      self._fetcher.download(url, listener=checksummer, path_or_fd=tmp_path,
+                             timeout_secs=self._timeout_secs)
+      expected = self._expected_sha1(url)
+      if expected and expected != checksummer.checksum:
+        logger.debug('Checksum mismatch fetching {}: expected {}, got {}.'
+                     .format(url, expected, checksummer.checksum))
+        return False
+      safe_concurrent_rename(tmp_path, path)
+      return True
+    except (Fetcher.Error, IOError, OSError) as e:
+      logger.debug('Failed to fetch {}: {}'.format(url, e))
+      return False
+    finally:
+      safe_delete(tmp_path)
+
+  def _expected_sha1(self, url):
+    """Returns the published sha1 of the artifact at url, or None if it does not publish one."""
+    buf = io.BytesIO()
+    try:
+      self._fetcher.fetch('{}.sha1'.format(url), Fetcher.DownloadListener(buf),
+                          timeout_secs=self._timeout_secs)
+    except Fetcher.Error:
+      return None
+    # Maven checksum files may be followed by the name of the file they checksum.
+    fields = buf.getvalue().decode('utf-8').split()
+    return fields[0].lower() if fields else None
+
+
 class IvyResolveResult(object):
   """The result of an Ivy resolution.
 
@@ -7,8 +7,6 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import os
 
-from twitter.common.collections import OrderedSet
-
 from pants.backend.jvm.targets.exclude import Exclude
 from pants.backend.jvm.targets.jvm_target import JvmTarget
 from pants.base.exceptions import TaskError
@@ -24,6 +22,8 @@ class ClasspathEntry(object):
 
   def __init__(self, path):
     self._path = path
+    # Entries are immutable, and are hashed many times over as classpaths are assembled.
+    self._hash = hash(path)
 
   @property
   def path(self):
@@ -47,7 +47,7 @@ class ClasspathEntry(object):
     return False
 
   def __hash__(self):
-    return hash(self.path)
+    return self._hash
 
   def __eq__(self, other):
     return isinstance(other, ClasspathEntry) and self.path == other.path
@@ -83,6 +83,7 @@ class ArtifactClasspathEntry(ClasspathEntry):
     super(ArtifactClasspathEntry, self).__init__(path)
     self._coordinate = coordinate
     self._cache_path = cache_path
+    self._hash = hash((path, coordinate, cache_path))
 
   @property
   def coordinate(self):
@@ -111,9 +112,6 @@ class ArtifactClasspathEntry(ClasspathEntry):
   def is_excluded_by(self, excludes):
     return any(_matches_exclude(self.coordinate, exclude) for exclude in excludes)
 
-  def __hash__(self):
-    return hash((self.path, self.coordinate, self.cache_path))
-
   def __eq__(self, other):
     return (isinstance(other, ArtifactClasspathEntry) and
             self.path == other.path and
@@ -140,10 +138,29 @@ def _matches_exclude(coordinate, exclude):
 
 
 def _not_excluded_filter(excludes):
-  def not_excluded(product_to_target):
-    path_tuple = product_to_target[0]
-    conf, classpath_entry = path_tuple
-    return not classpath_entry.is_excluded_by(excludes)
+  """Returns a predicate that accepts the classpath entries not excluded by the given excludes.
+
+  Equivalent to `not entry.is_excluded_by(excludes)`, but matches the entries whose exclusion
+  rules are known with set lookups, rather than against each of the excludes in turn.
+  """
+  excluded_orgs = set()
+  excluded_org_names = set()
+  for exclude in excludes:
+    if exclude.name:
+      excluded_org_names.add((exclude.org, exclude.name))
+    else:
+      excluded_orgs.add(exclude.org)
+
+  def not_excluded(classpath_entry):
+    entry_type = type(classpath_entry)
+    if entry_type is ClasspathEntry:
+      return True
+    elif entry_type is ArtifactClasspathEntry:
+      coordinate = classpath_entry.coordinate
+      return not (coordinate.org in excluded_orgs or
+                  (coordinate.org, coordinate.name) in excluded_org_names)
+    else:
+      return not classpath_entry.is_excluded_by(excludes)
   return not_excluded
 
 
@@ -156,6 +173,9 @@ class ClasspathProducts(object):
     self._classpaths = classpaths or UnionProducts()
     self._excludes = excludes or UnionProducts()
     self._pants_workdir = pants_workdir
+    # Interned classpath entries, so that each distinct entry is held once however many targets
+    # and copies refer to it.
+    self._interned_entries = {}
 
   @staticmethod
   def init_func(pants_workdir):
@@ -175,9 +195,11 @@ class ClasspathProducts(object):
 
     :rtype: :class:`ClasspathProducts`
     """
-    return ClasspathProducts(pants_workdir=self._pants_workdir,
+    copy = ClasspathProducts(pants_workdir=self._pants_workdir,
                              classpaths=self._classpaths.copy(),
                              excludes=self._excludes.copy())
+    copy._interned_entries = self._interned_entries
+    return copy
 
   def add_for_targets(self, targets, classpath_elements):
     """Adds classpath path elements to the products of all the provided targets."""
@@ -198,7 +220,7 @@ class ClasspathProducts(object):
       if not jar.pants_path:
         raise TaskError('Jar: {!s} has no specified path.'.format(jar.coordinate))
       cp_entry = ArtifactClasspathEntry(jar.pants_path, jar.coordinate, jar.cache_path)
-      classpath_entries.append((conf, cp_entry))
+      classpath_entries.append((conf, self._intern(cp_entry)))
 
     for target in targets:
       self._add_elements_for_target(target, classpath_entries)
@@ -254,9 +276,14 @@ class ClasspathProducts(object):
     :rtype: list of (string, :class:`ClasspathEntry`)
     """
 
-    # remove the duplicate, preserve the ordering.
-    return list(OrderedSet([cp for cp, target in self.get_product_target_mappings_for_targets(
-                            targets, respect_excludes)]))
+    # Remove duplicates before filtering, since the excludes in play are the same for every
+    # target: each distinct entry need only be checked once.
+    classpath_tuples = self._classpaths.get_for_targets(targets)
+    if respect_excludes:
+      not_excluded = self._not_excluded_filter(targets)
+      return [cp for cp in classpath_tuples if not_excluded(cp[1])]
+    else:
+      return list(classpath_tuples)
 
   def get_product_target_mappings_for_targets(self, targets, respect_excludes=True):
     """Gets the classpath products-target associations for the given targets.
@@ -305,12 +332,16 @@ class ClasspathProducts(object):
     return [(conf, cp_entry) for conf, cp_entry in classpath_tuples
             if ClasspathEntry.is_internal_classpath_entry(cp_entry)]
 
-  def _filter_by_excludes(self, classpath_target_tuples, root_targets):
+  def _not_excluded_filter(self, root_targets):
     # Excludes are always applied transitively, so regardless of whether a transitive
     # set of targets was included here, their closure must be included.
     closure = BuildGraph.closure(root_targets, bfs=True)
     excludes = self._excludes.get_for_targets(closure)
-    return filter(_not_excluded_filter(excludes), classpath_target_tuples)
+    return _not_excluded_filter(excludes)
+
+  def _filter_by_excludes(self, classpath_target_tuples, root_targets):
+    not_excluded = self._not_excluded_filter(root_targets)
+    return [(cp, target) for cp, target in classpath_target_tuples if not_excluded(cp[1])]
 
   def _add_excludes_for_target(self, target):
     if target.is_exported:
@@ -319,8 +350,12 @@ class ClasspathProducts(object):
     if isinstance(target, JvmTarget) and target.excludes:
       self._excludes.add_for_target(target, target.excludes)
 
+  def _intern(self, classpath_entry):
+    return self._interned_entries.setdefault(classpath_entry, classpath_entry)
+
   def _wrap_path_elements(self, classpath_elements):
-    return [(element[0], ClasspathEntry(element[1])) for element in classpath_elements]
+    return [(element[0], self._intern(ClasspathEntry(element[1])))
+            for element in classpath_elements]
 
   def _add_elements_for_target(self, target, elements):
     self._validate_classpath_tuples(elements, target)
@@ -7,8 +7,11 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import os
 from collections import defaultdict
+from multiprocessing import cpu_count
 
+from pants.backend.jvm.targets.jvm_binary import JarRules, Skip
 from pants.backend.jvm.tasks.classpath_util import ClasspathUtil
+from pants.backend.jvm.tasks.directory_jar import DirectoryJar
 from pants.backend.jvm.tasks.jvm_binary_task import JvmBinaryTask
 from pants.build_graph.target_scopes import Scopes
 
@@ -21,7 +24,13 @@ class ConsolidateClasspath(JvmBinaryTask):
 
   @classmethod
   def implementation_version(cls):
-    return super(ConsolidateClasspath, cls).implementation_version() + [('ConsolidateClasspath', 1)]
+    return super(ConsolidateClasspath, cls).implementation_version() + [('ConsolidateClasspath', 2)]
+
+  @classmethod
+  def register_options(cls, register):
+    super(ConsolidateClasspath, cls).register_options(register)
+    register('--worker-count', advanced=True, type=int, default=cpu_count(),
+             help='The number of directories to jar concurrently.')
 
   @classmethod
   def prepare(cls, options, round_manager):
@@ -58,6 +67,7 @@ class ConsolidateClasspath(JvmBinaryTask):
       entries_map[target].append(cp)
 
     with self.invalidated(targets=targets, invalidate_dependents=True) as invalidation:
+      jars_to_update = []
       for vt in invalidation.all_vts:
         entries = entries_map.get(vt.target, [])
         for index, (conf, entry) in enumerate(entries):
@@ -66,9 +76,22 @@ class ConsolidateClasspath(JvmBinaryTask):
 
             # Regenerate artifact for invalid vts.
             if not vt.valid:
-              with self.open_jar(jarpath, overwrite=True, compressed=False) as jar:
-                jar.write(entry.path)
+              jars_to_update.append((DirectoryJar(entry.path, jarpath,
+                                                  skip_patterns=self._skip_patterns,
+                                                  write_manifest=True),))
 
             # Replace directory classpath entry with its jarpath.
             classpath_products.remove_for_target(vt.target, [(conf, entry.path)])
             classpath_products.add_for_target(vt.target, [(conf, jarpath)])
+
+      self._update_jars(jars_to_update)
+
+  @property
+  def _skip_patterns(self):
+    # The jar tool applied the default jar rules when it jarred these directories: only their
+    # `Skip` rules apply to the contents of a single directory, which cannot hold duplicates.
+    return [rule.apply_pattern for rule in JarRules.default().rules if isinstance(rule, Skip)]
+
+  def _update_jars(self, jars_to_update):
+    self.map_concurrently('consolidate', DirectoryJar.update, jars_to_update,
+                          self.get_options().worker_count)
@@ -15,15 +15,22 @@ from pants.util.strutil import safe_shlex_split
 
 
 class CoverageTaskSettings(object):
-  """A class containing settings for code coverage tasks."""
+  """A class containing settings for code coverage tasks.
 
-  def __init__(self, options, context, workdir, tool_classpath, confs, log):
+  If `invalidated` (the method of the same name of the task) and the task's fingerprint are given,
+  coverage processors may use them to cache instrumented classes per target.
+  """
+
+  def __init__(self, options, context, workdir, tool_classpath, confs, log, invalidated=None,
+               task_fingerprint=None):
     self.options = options
     self.context = context
     self.workdir = workdir
     self.tool_classpath = tool_classpath
     self.confs = confs
     self.log = log
+    self.invalidated = invalidated
+    self.task_fingerprint = task_fingerprint
 
     self.coverage_dir = os.path.join(self.workdir, 'coverage')
     self.coverage_instrument_dir = os.path.join(self.coverage_dir, 'classes')
@@ -38,7 +45,9 @@ class CoverageTaskSettings(object):
                workdir=workdir or task.workdir,
                tool_classpath=task.tool_classpath,
                confs=task.confs,
-               log=task.context.log)
+               log=task.context.log,
+               invalidated=task.invalidated,
+               task_fingerprint=task.fingerprint)
 
 
 class Coverage(AbstractClass):
@@ -6,35 +6,73 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import os
+import shutil
 from collections import defaultdict
+from hashlib import sha1
 
 from twitter.common.collections import OrderedSet
 
 from pants.backend.jvm.targets.jar_dependency import JarDependency
 from pants.backend.jvm.tasks.coverage.base import Coverage, CoverageTaskSettings
 from pants.base.exceptions import TaskError
+from pants.base.fingerprint_strategy import FingerprintStrategy
+from pants.base.hash_utils import hash_file
 from pants.util import desktop
 from pants.util.contextutil import temporary_file
-from pants.util.dirutil import relativize_paths, safe_delete, safe_mkdir, touch
+from pants.util.dirutil import safe_delete, safe_mkdir, safe_walk, touch
 
 
 class CoberturaTaskSettings(CoverageTaskSettings):
   """A class that holds task settings for cobertura coverage."""
 
 
+class CoberturaInstrumentFingerprintStrategy(FingerprintStrategy):
+  """Fingerprints a target by its payload, the task and the contents of its classpath entries.
+
+  The classpath entries are the classes that get instrumented, so their instrumentation stays valid
+  only as long as they do.
+  """
+
+  def __init__(self, task_fingerprint, classpath_digests):
+    """
+    :param string task_fingerprint: The fingerprint of the task that instruments the targets.
+    :param dict classpath_digests: A digest of the classpath entries of each target.
+    """
+    self._task_fingerprint = task_fingerprint
+    self._classpath_digests = classpath_digests
+
+  def compute_fingerprint(self, target):
+    hasher = sha1()
+    hasher.update(target.payload.fingerprint() or '')
+    hasher.update(self._task_fingerprint or '')
+    hasher.update(self._classpath_digests.get(target, ''))
+    return hasher.hexdigest()
+
+  def __hash__(self):
+    return hash((type(self), self._task_fingerprint, frozenset(self._classpath_digests.items())))
+
+  def __eq__(self, other):
+    return (type(self) == type(other) and
+            self._task_fingerprint == other._task_fingerprint and
+            self._classpath_digests == other._classpath_digests)
+
+
 class Cobertura(Coverage):
   """Class to run coverage tests with cobertura."""
 
+  # The number of datafiles to merge per invocation of cobertura, to bound the command line.
+  _MERGE_BATCH_SIZE = 200
+
   @classmethod
   def register_options(cls, register, register_jvm_tool):
     slf4j_jar = JarDependency(org='org.slf4j', name='slf4j-simple', rev='1.7.5')
 
-    register('--coverage-cobertura-include-classes', advanced=True, type=list,
+    register('--coverage-cobertura-include-classes', advanced=True, type=list, fingerprint=True,
              help='Regex patterns passed to cobertura specifying which classes should be '
                   'instrumented. (see the "includeclasses" element description here: '
                   'https://github.com/cobertura/cobertura/wiki/Ant-Task-Reference)')
 
-    register('--coverage-cobertura-exclude-classes', advanced=True, type=list,
+    register('--coverage-cobertura-exclude-classes', advanced=True, type=list, fingerprint=True,
              help='Regex patterns passed to cobertura specifying which classes should NOT be '
                   'instrumented. (see the "excludeclasses" element description here: '
                   'https://github.com/cobertura/cobertura/wiki/Ant-Task-Reference')
@@ -76,10 +114,12 @@ class Cobertura(Coverage):
     runtime_classpath = self._context.products.get_data('runtime_classpath')
     instrumentation_classpath = self._context.products.safe_create_data('instrument_classpath',
                                                                         runtime_classpath.copy)
-    self.initialize_instrument_classpath(targets, instrumentation_classpath)
-
-    cobertura_cp = self._settings.tool_classpath('cobertura-instrument')
     safe_delete(self._coverage_datafile)
+    if self._settings.invalidated:
+      self._instrument_cached(targets, instrumentation_classpath, execute_java_for_targets)
+      return
+
+    self.initialize_instrument_classpath(targets, instrumentation_classpath)
     files_to_instrument = []
     for target in targets:
       if self.is_coverage_target(target):
@@ -89,44 +129,130 @@ class Cobertura(Coverage):
 
     if len(files_to_instrument) > 0:
       self._nothing_to_instrument = False
+      self._run_instrument(targets, execute_java_for_targets, list(set(files_to_instrument)),
+                           self._settings.workdir, self._coverage_datafile)
 
-      unique_files = list(set(files_to_instrument))
-      relativize_paths(unique_files, self._settings.workdir)
+  def _instrument_cached(self, targets, instrumentation_classpath, execute_java_for_targets):
+    """Instruments the classpath entries of each target into its results dir, and reuses them.
 
-      args = [
-        '--basedir',
-        self._settings.workdir,
-        '--datafile',
-        self._coverage_datafile,
-      ]
-      # apply class incl/excl filters
-      if len(self._include_classes) > 0:
-        for pattern in self._include_classes:
-          args += ["--includeClasses", pattern]
-      else:
-        args += ["--includeClasses", '.*']  # default to instrumenting all classes
-      for pattern in self._exclude_classes:
-        args += ["--excludeClasses", pattern]
-
-      with temporary_file() as tmp_file:
-        tmp_file.write("\n".join(unique_files))
-        tmp_file.flush()
-
-        args += ["--listOfFilesToInstrument", tmp_file.name]
-
-        main = 'net.sourceforge.cobertura.instrument.InstrumentMain'
-        self._context.log.debug(
-          "executing cobertura instrumentation with the following args: {}".format(args))
-        result = execute_java_for_targets(targets,
-                                          classpath=cobertura_cp,
-                                          main=main,
-                                          jvm_options=self._coverage_jvm_options,
-                                          args=args,
-                                          workunit_factory=self._context.new_workunit,
-                                          workunit_name='cobertura-instrument')
-        if result != 0:
-          raise TaskError("java {0} ... exited non-zero ({1})"
-                          " 'failed to instrument'".format(main, result))
+    Each target's classes are instrumented with their own datafile, so that the classes and the
+    datafile can be cached together. The instrumented classes of a target stay valid until the
+    contents of its classpath entries change, the target or one of its dependencies changes, or the
+    instrumentation settings change. The datafiles of all the targets are then merged into the
+    datafile of this run.
+    """
+    coverage_targets = [t for t in targets if self.is_coverage_target(t)]
+    classpath_digests = {t: self._classpath_digest(instrumentation_classpath.get_for_target(t))
+                         for t in coverage_targets}
+    fingerprint_strategy = CoberturaInstrumentFingerprintStrategy(self._settings.task_fingerprint,
+                                                                  classpath_digests)
+    datafiles = []
+    invalidated = self._settings.invalidated(coverage_targets,
+                                             invalidate_dependents=True,
+                                             fingerprint_strategy=fingerprint_strategy)
+    with invalidated as invalidation_check:
+      for vt in invalidation_check.all_vts:
+        paths = instrumentation_classpath.get_for_target(vt.target)
+        if not paths:
+          continue
+        self._nothing_to_instrument = False
+        instrumented_paths = [self._instrumented_path(vt.results_dir, index, path)
+                              for index, (_, path) in enumerate(paths)]
+        datafile = os.path.join(vt.results_dir, 'cobertura.ser')
+        if not vt.valid:
+          for (_, path), instrumented_path in zip(paths, instrumented_paths):
+            if os.path.isfile(path):
+              safe_mkdir(os.path.dirname(instrumented_path))
+              shutil.copy2(path, instrumented_path)
+            else:
+              shutil.copytree(path, instrumented_path)
+          self._run_instrument([vt.target], execute_java_for_targets, instrumented_paths,
+                               vt.results_dir, datafile)
+
+        for (config, path), instrumented_path in zip(paths, instrumented_paths):
+          instrumentation_classpath.remove_for_target(vt.target, [(config, path)])
+          instrumentation_classpath.add_for_target(vt.target, [(config, instrumented_path)])
+        datafiles.append(datafile)
+
+    for index in range(0, len(datafiles), self._MERGE_BATCH_SIZE):
+      self._run_merge(targets, execute_java_for_targets,
+                      datafiles[index:index + self._MERGE_BATCH_SIZE])
+
+  @staticmethod
+  def _classpath_digest(paths):
+    """Returns a digest of the contents of the given classpath entries."""
+    hasher = sha1()
+    for _, path in paths:
+      hasher.update(path)
+      if os.path.isfile(path):
+        hash_file(path, digest=hasher)
+        continue
+      for root, dirs, files in safe_walk(path):
+        dirs.sort()
+        for f in sorted(files):
+          file_path = os.path.join(root, f)
+          hasher.update(os.path.relpath(file_path, path))
+          hash_file(file_path, digest=hasher)
+    return hasher.hexdigest()
+
+  @staticmethod
+  def _instrumented_path(results_dir, index, path):
+    # Mirrors the layout of `initialize_instrument_classpath`.
+    entry_dir = os.path.join(results_dir, str(index))
+    return os.path.join(entry_dir, os.path.basename(path)) if os.path.isfile(path) else entry_dir
+
+  def _run_instrument(self, targets, execute_java_for_targets, files_to_instrument, basedir,
+                      datafile):
+    cobertura_cp = self._settings.tool_classpath('cobertura-instrument')
+    args = [
+      '--basedir',
+      basedir,
+      '--datafile',
+      datafile,
+    ]
+    # apply class incl/excl filters
+    if len(self._include_classes) > 0:
+      for pattern in self._include_classes:
+        args += ["--includeClasses", pattern]
+    else:
+      args += ["--includeClasses", '.*']  # default to instrumenting all classes
+    for pattern in self._exclude_classes:
+      args += ["--excludeClasses", pattern]
+
+    with temporary_file() as tmp_file:
+      tmp_file.write("\n".join(files_to_instrument))
+      tmp_file.flush()
+
+      args += ["--listOfFilesToInstrument", tmp_file.name]
+
+      main = 'net.sourceforge.cobertura.instrument.InstrumentMain'
+      self._context.log.debug(
+        "executing cobertura instrumentation with the following args: {}".format(args))
+      result = execute_java_for_targets(targets,
+                                        classpath=cobertura_cp,
+                                        main=main,
+                                        jvm_options=self._coverage_jvm_options,
+                                        args=args,
+                                        workunit_factory=self._context.new_workunit,
+                                        workunit_name='cobertura-instrument')
+      if result != 0:
+        raise TaskError("java {0} ... exited non-zero ({1})"
+                        " 'failed to instrument'".format(main, result))
+
+  def _run_merge(self, targets, execute_java_for_targets, datafiles):
+    """Merges the given datafiles into (any existing contents of) the datafile of this run."""
+    cobertura_cp = self._settings.tool_classpath('cobertura-instrument')
+    main = 'net.sourceforge.cobertura.merge.MergeMain'
+    result = execute_java_for_targets(targets,
+                                      classpath=cobertura_cp,
+                                      main=main,
+                                      jvm_options=self._coverage_jvm_options,
+                                      args=['--datafile', self._coverage_datafile] + datafiles,
+                                      workunit_factory=self._context.new_workunit,
+                                      workunit_name='cobertura-merge')
+    if result != 0:
+      raise TaskError("java {0} ... exited non-zero ({1})"
+                      " 'failed to merge'".format(main, result))
 
   @property
   def classpath_append(self):
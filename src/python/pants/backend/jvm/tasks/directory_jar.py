@@ -0,0 +1,161 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import json
+import os
+import zipfile
+from contextlib import contextmanager
+
+from pants.java.jar.manifest import Manifest
+from pants.util.contextutil import open_zip
+from pants.util.dirutil import fast_relpath, safe_concurrent_creation, safe_delete, safe_walk
+
+
+class DirectoryJar(object):
+  """Maintains a jar of the contents of a directory, with stored (uncompressed) entries.
+
+  Alongside the jar, an index records the size and modification time of each file as it was when
+  it was jarred. When the jar is updated, the entries for files that have not changed since are
+  copied from the previous jar, and only new and changed files are read from the directory. After
+  an incremental compile, that means only recompiled classfiles are re-read.
+  """
+
+  _DEFAULT_MANIFEST_ENTRIES = ((Manifest.MANIFEST_VERSION, '1.0'), (Manifest.CREATED_BY, 'pants'))
+
+  def __init__(self, directory, path, skip_patterns=(), write_manifest=False):
+    """
+    :param string directory: The directory to jar the contents of.
+    :param string path: The path of the jar.
+    :param skip_patterns: Compiled regexes of the paths of entries to leave out of the jar, as
+      applied by the jar tool's `Skip` jar rules.
+    :param bool write_manifest: True to write a manifest to the jar, as the jar tool does: the
+      directory's own manifest, with any missing default entries added, or else a default one.
+    """
+    self._directory = directory
+    self._path = path
+    self._skip_patterns = tuple(skip_patterns)
+    self._write_manifest = write_manifest
+
+  @property
+  def directory(self):
+    return self._directory
+
+  @property
+  def path(self):
+    return self._path
+
+  @property
+  def _index_path(self):
+    return '{}.index'.format(self._path)
+
+  def _stat_directory(self):
+    """Returns an ordered list of (arcname, abspath, stat) for the contents of the directory."""
+    contents = []
+    for abs_sub_dir, dirnames, filenames in safe_walk(self._directory):
+      for name in dirnames + filenames:
+        abs_filename = os.path.join(abs_sub_dir, name)
+        arcname = fast_relpath(abs_filename, self._directory)
+        if self._write_manifest and arcname == Manifest.PATH:
+          continue
+        if any(pattern.search(arcname) for pattern in self._skip_patterns):
+          continue
+        contents.append((arcname, abs_filename, os.stat(abs_filename)))
+    return contents
+
+  def _manifest_contents(self):
+    """Returns the manifest of the directory, with any missing default entries added."""
+    manifest_path = os.path.join(self._directory, Manifest.PATH)
+    lines = []
+    if os.path.isfile(manifest_path):
+      with open(manifest_path, 'rb') as fp:
+        lines = fp.read().strip().splitlines()
+    # Only the main section, which ends at the first blank line, holds the default entries.
+    main_section = lines[:lines.index(b'')] if b'' in lines else lines
+    headers = {line.split(b':', 1)[0].strip() for line in main_section}
+    missing = ['{}: {}'.format(header, value).encode('ascii')
+               for header, value in self._DEFAULT_MANIFEST_ENTRIES
+               if header.encode('ascii') not in headers]
+    return b'\n'.join(missing + lines) + b'\n'
+
+  def _load_index(self):
+    if not os.path.isfile(self._path):
+      return {}
+    try:
+      with open(self._index_path, 'rb') as fp:
+        return json.load(fp)
+    except (IOError, ValueError):
+      return {}
+
+  def update(self):
+    """Updates the jar to match the current contents of the directory.
+
+    :returns: The number of files that were read from the directory, rather than being copied from
+      the previous jar.
+    :rtype: int
+    """
+    contents = self._stat_directory()
+    previous_index = self._load_index()
+    # Drop the index until the new jar is complete, so that an interrupted update cannot leave an
+    # index that describes the wrong jar.
+    safe_delete(self._index_path)
+    index = {}
+    files_read = 0
+
+    with safe_concurrent_creation(self._path) as tmp_path:
+      with open_zip(tmp_path, mode='w', compression=zipfile.ZIP_STORED) as jar:
+        if self._write_manifest:
+          jar.writestr(Manifest.PATH, self._manifest_contents())
+        with self._open_previous_jar(previous_index) as previous_jar:
+          for arcname, abs_filename, stat in contents:
+            if os.path.isdir(abs_filename):
+              jar.write(abs_filename, arcname)
+              continue
+
+            stamp = [stat.st_size, stat.st_mtime]
+            index[arcname] = stamp
+            info = previous_jar.get(arcname) if previous_jar else None
+            if info and previous_index.get(arcname) == stamp:
+              copied_info = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+              copied_info.external_attr = info.external_attr
+              copied_info.compress_type = zipfile.ZIP_STORED
+              jar.writestr(copied_info, previous_jar.read(info))
+            else:
+              jar.write(abs_filename, arcname)
+              files_read += 1
+
+    with safe_concurrent_creation(self._index_path) as tmp_index_path:
+      with open(tmp_index_path, 'wb') as fp:
+        json.dump(index, fp)
+    return files_read
+
+  @contextmanager
+  def _open_previous_jar(self, previous_index):
+    """Yields the previous version of the jar, or None if there is none to copy entries from."""
+    if not previous_index:
+      yield None
+      return
+    try:
+      previous_jar = zipfile.ZipFile(self._path, mode='r', allowZip64=True)
+    except (IOError, zipfile.BadZipfile):
+      yield None
+      return
+    try:
+      yield _PreviousJar(previous_jar)
+    finally:
+      previous_jar.close()
+
+
+class _PreviousJar(object):
+  def __init__(self, jar):
+    self._jar = jar
+    self._infos = {info.filename: info for info in jar.infolist()}
+
+  def get(self, arcname):
+    return self._infos.get(arcname)
+
+  def read(self, info):
+    return self._jar.read(info)
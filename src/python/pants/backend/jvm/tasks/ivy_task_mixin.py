@@ -8,7 +8,8 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import logging
 import os
 
-from pants.backend.jvm.ivy_utils import NO_RESOLVE_RUN_RESULT, IvyFetchStep, IvyResolveStep
+from pants.backend.jvm.ivy_utils import (NO_RESOLVE_RUN_RESULT, IvyFetchStep, IvyResolutionCache,
+                                         IvyResolveStep)
 from pants.backend.jvm.subsystems.jar_dependency_management import JarDependencyManagement
 from pants.backend.jvm.targets.jar_library import JarLibrary
 from pants.backend.jvm.targets.jvm_target import JvmTarget
@@ -93,6 +94,9 @@ class IvyTaskMixin(TaskBase):
     register('--soft-excludes', type=bool, advanced=True, fingerprint=True,
              help='If a target depends on a jar that is excluded by another target '
                   'resolve this jar anyway')
+    register('--fetch-workers', type=int, default=8, advanced=True,
+             help='When reusing a previous resolve of the same jars, excludes and confs, fetch up '
+                  'to this many of its artifacts that are missing from the ivy cache concurrently.')
 
   @classmethod
   def implementation_version(cls):
@@ -282,9 +286,23 @@ class IvyTaskMixin(TaskBase):
       else:
         logger.debug("Fetch failed, falling through to resolve.")
 
-    logger.debug('Performing a resolve using ivy.')
-    result = resolve.exec_and_load(executor, extra_args, targets, jvm_options, workunit_name,
-                                   workunit_factory)
+    # The targets have changed since they were last resolved, but what is asked of ivy may not have.
+    # Resolves of mutable jars or of jars with dynamic revs get no key and are never reused.
+    resolution_cache = IvyResolutionCache(os.path.join(resolve.global_ivy_workdir,
+                                                       'resolution-cache'))
+    resolution_cache_key = resolve.resolution_cache_key(targets, extra_args, self.fingerprint)
+    result = None
+    if resolution_cache_key:
+      result = resolve.load_from_resolution_cache(resolution_cache, resolution_cache_key, targets,
+                                                  fetch_workers=self.get_options().fetch_workers)
+    if result:
+      logger.debug('Using cached resolve {}.'.format(resolution_cache_key))
+    else:
+      logger.debug('Performing a resolve using ivy.')
+      result = resolve.exec_and_load(executor, extra_args, targets, jvm_options, workunit_name,
+                                     workunit_factory)
+      if resolution_cache_key:
+        resolution_cache.store(resolution_cache_key, resolve)
     if self.artifact_cache_writes_enabled():
       self.update_artifact_cache([(resolve_vts, [resolve.frozen_resolve_file])])
     return result
@@ -7,7 +7,9 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import os
 import sys
+import threading
 from abc import abstractmethod
+from collections import defaultdict, deque
 from contextlib import contextmanager
 
 from six.moves import range
@@ -135,6 +137,11 @@ class JUnitRun(TestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
     super(JUnitRun, cls).register_options(register)
     register('--batch-size', advanced=True, type=int, default=sys.maxint,
              help='Run at most this many tests in a single test process.')
+    register('--worker-count', advanced=True, type=int, default=1,
+             help='The number of test processes to run concurrently. When greater than 1, each '
+                  'worker launches a test process for the next batch of tests from a shared queue '
+                  'as soon as its previous one exits. Batches shrink as the queue drains, so that '
+                  'workers finish at about the same time.')
     register('--test', type=list,
              help='Force running of just these tests.  Tests can be specified using any of: '
                   '[classname], [classname]#[methodname], [filename] or [filename]#[methodname]')
@@ -206,6 +213,7 @@ class JUnitRun(TestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
     options = self.get_options()
     self._tests_to_run = options.test
     self._batch_size = options.batch_size
+    self._worker_count = options.worker_count
     self._fail_fast = options.fail_fast
     self._working_dir = options.cwd or get_buildroot()
     self._strict_jvm_version = options.strict_jvm_version
@@ -269,6 +277,11 @@ class JUnitRun(TestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
 
     return args
 
+  @property
+  def cache_target_dirs(self):
+    # Coverage instrumentation of each target is cached in its results dir.
+    return True
+
   def classpath(self, targets, classpath_product=None, **kwargs):
     return super(JUnitRun, self).classpath(targets,
                                            classpath_product=classpath_product,
@@ -371,58 +384,65 @@ class JUnitRun(TestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
     # the below will be None if not set, and we'll default back to runtime_classpath
     classpath_product = self.context.products.get_data('instrument_classpath')
 
-    result = 0
-    for properties, tests in tests_by_properties.items():
-      (workdir, platform, target_jvm_options, target_env_vars, concurrency, threads) = properties
-      for batch in self._partition(tests):
-        # Batches of test classes will likely exist within the same targets: dedupe them.
-        relevant_targets = {test_registry.get_owning_target(t) for t in batch}
-        complete_classpath = OrderedSet()
-        complete_classpath.update(classpath_prepend)
-        complete_classpath.update(JUnit.global_instance().runner_classpath(self.context))
-        complete_classpath.update(self.classpath(relevant_targets,
-                                                 classpath_product=classpath_product))
-        complete_classpath.update(classpath_append)
-        distribution = JvmPlatform.preferred_jvm_distribution([platform], self._strict_jvm_version)
-
-        # Override cmdline args with values from junit_test() target that specify concurrency:
-        args = self._args(output_dir) + [u'-xmlreport']
-
-        if concurrency is not None:
-          args = remove_arg(args, '-default-parallel')
-          if concurrency == JUnitTests.CONCURRENCY_SERIAL:
-            args = ensure_arg(args, '-default-concurrency', param='SERIAL')
-          elif concurrency == JUnitTests.CONCURRENCY_PARALLEL_CLASSES:
-            args = ensure_arg(args, '-default-concurrency', param='PARALLEL_CLASSES')
-          elif concurrency == JUnitTests.CONCURRENCY_PARALLEL_METHODS:
-            args = ensure_arg(args, '-default-concurrency', param='PARALLEL_METHODS')
-          elif concurrency == JUnitTests.CONCURRENCY_PARALLEL_CLASSES_AND_METHODS:
-            args = ensure_arg(args, '-default-concurrency', param='PARALLEL_CLASSES_AND_METHODS')
-
-        if threads is not None:
-          args = remove_arg(args, '-parallel-threads', has_param=True)
-          args += ['-parallel-threads', str(threads)]
-
-        batch_test_specs = [test.render_test_spec() for test in batch]
-        with argfile.safe_args(batch_test_specs, self.get_options()) as batch_tests:
-          self.context.log.debug('CWD = {}'.format(workdir))
-          self.context.log.debug('platform = {}'.format(platform))
+    def run_batch(properties, batch):
+      """Runs a batch of tests in a single process, with the environment already set."""
+      (workdir, platform, target_jvm_options, _, concurrency, threads) = properties
+      # Batches of test classes will likely exist within the same targets: dedupe them.
+      relevant_targets = {test_registry.get_owning_target(t) for t in batch}
+      complete_classpath = OrderedSet()
+      complete_classpath.update(classpath_prepend)
+      complete_classpath.update(JUnit.global_instance().runner_classpath(self.context))
+      complete_classpath.update(self.classpath(relevant_targets,
+                                               classpath_product=classpath_product))
+      complete_classpath.update(classpath_append)
+      distribution = JvmPlatform.preferred_jvm_distribution([platform], self._strict_jvm_version)
+
+      # Override cmdline args with values from junit_test() target that specify concurrency:
+      args = self._args(output_dir) + [u'-xmlreport']
+
+      if concurrency is not None:
+        args = remove_arg(args, '-default-parallel')
+        if concurrency == JUnitTests.CONCURRENCY_SERIAL:
+          args = ensure_arg(args, '-default-concurrency', param='SERIAL')
+        elif concurrency == JUnitTests.CONCURRENCY_PARALLEL_CLASSES:
+          args = ensure_arg(args, '-default-concurrency', param='PARALLEL_CLASSES')
+        elif concurrency == JUnitTests.CONCURRENCY_PARALLEL_METHODS:
+          args = ensure_arg(args, '-default-concurrency', param='PARALLEL_METHODS')
+        elif concurrency == JUnitTests.CONCURRENCY_PARALLEL_CLASSES_AND_METHODS:
+          args = ensure_arg(args, '-default-concurrency', param='PARALLEL_CLASSES_AND_METHODS')
+
+      if threads is not None:
+        args = remove_arg(args, '-parallel-threads', has_param=True)
+        args += ['-parallel-threads', str(threads)]
+
+      batch_test_specs = [test.render_test_spec() for test in batch]
+      with argfile.safe_args(batch_test_specs, self.get_options()) as batch_tests:
+        self.context.log.debug('CWD = {}'.format(workdir))
+        self.context.log.debug('platform = {}'.format(platform))
+        return abs(self._spawn_and_wait(
+          executor=SubprocessExecutor(distribution),
+          distribution=distribution,
+          classpath=complete_classpath,
+          main=JUnit.RUNNER_MAIN,
+          jvm_options=self.jvm_options + extra_jvm_options + list(target_jvm_options),
+          args=args + batch_tests,
+          workunit_factory=self.context.new_workunit,
+          workunit_name='run',
+          workunit_labels=[WorkUnitLabel.TEST],
+          cwd=workdir,
+          synthetic_jar_dir=output_dir,
+          create_synthetic_jar=self.synthetic_classpath,
+        ))
+
+    if self._worker_count > 1:
+      result = self._run_batches_concurrently(tests_by_properties, run_batch)
+    else:
+      result = 0
+      for properties, tests in tests_by_properties.items():
+        target_env_vars = properties[3]
+        for batch in self._partition(tests):
           with environment_as(**dict(target_env_vars)):
-            result += abs(self._spawn_and_wait(
-              executor=SubprocessExecutor(distribution),
-              distribution=distribution,
-              classpath=complete_classpath,
-              main=JUnit.RUNNER_MAIN,
-              jvm_options=self.jvm_options + extra_jvm_options + list(target_jvm_options),
-              args=args + batch_tests,
-              workunit_factory=self.context.new_workunit,
-              workunit_name='run',
-              workunit_labels=[WorkUnitLabel.TEST],
-              cwd=workdir,
-              synthetic_jar_dir=output_dir,
-              create_synthetic_jar=self.synthetic_classpath,
-            ))
-
+            result += run_batch(properties, batch)
           if result != 0 and self._fail_fast:
             break
 
@@ -457,6 +477,43 @@ class JUnitRun(TestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
     for i in range(0, len(tests), stride):
       yield tests[i:i + stride]
 
+  def _run_batches_concurrently(self, tests_by_properties, run_batch):
+    """Runs the tests on a pool of workers that each pull their next batch from a shared queue.
+
+    Environment variables are process-wide, so only tests with the same target env vars share a
+    queue; each set of env vars is run in turn.
+
+    :returns: The sum of the exit codes of the test processes.
+    """
+    tests_by_env_vars = defaultdict(list)
+    for properties, tests in tests_by_properties.items():
+      tests_by_env_vars[properties[3]].append((properties, tests))
+
+    result = 0
+    for target_env_vars, properties_and_tests in tests_by_env_vars.items():
+      queue = _TestBatchQueue(properties_and_tests, self._worker_count, self._batch_size)
+
+      def work():
+        worker_result = 0
+        try:
+          for properties, batch in iter(queue.next_batch, None):
+            batch_result = run_batch(properties, batch)
+            worker_result += batch_result
+            if batch_result != 0 and self._fail_fast:
+              queue.close()
+        except Exception:
+          queue.close()
+          raise
+        return worker_result
+
+      worker_count = min(self._worker_count, queue.test_count)
+      with environment_as(**dict(target_env_vars)):
+        result += sum(self.map_concurrently('junit', work, [()] * worker_count, worker_count))
+
+      if result != 0 and self._fail_fast:
+        break
+    return result
+
   def _get_possible_tests_to_run(self):
     buildroot = get_buildroot()
     for test_spec in self._tests_to_run:
@@ -544,11 +601,14 @@ class JUnitRun(TestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
       # TODO(John Sirois): Deprecate this ~API and provide a stable directory solution for test
       # output: https://github.com/pantsbuild/pants/issues/3879
       lock_file = '.file_lock'
+      # The results dirs of this version of the task hold the cached coverage instrumentation of
+      # targets.
+      results_root = os.path.basename(self.results_dir_root)
       with OwnerPrintingInterProcessFileLock(os.path.join(self.workdir, lock_file)):
-        # Kill everything except the isolated runs/ dir.
+        # Kill everything except the isolated runs/ dir and the results dirs.
         for name in os.listdir(self.workdir):
           path = os.path.join(self.workdir, name)
-          if name not in (run_dir, lock_file):
+          if name not in (run_dir, lock_file, results_root):
             if os.path.isdir(path):
               safe_rmtree(path)
             else:
@@ -558,3 +618,52 @@ class JUnitRun(TestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
         for name in os.listdir(output_dir):
           path = os.path.join(output_dir, name)
           os.symlink(path, os.path.join(self.workdir, name))
+
+
+class _TestBatchQueue(object):
+  """A thread-safe queue of tests that hands out batches of tests with the same properties.
+
+  Batches are sized by guided self-scheduling: each is half of the remaining tests' share of a
+  worker, capped at the max batch size, so early batches amortize process startup while the last
+  batches are single tests that keep every worker busy until the queue drains.
+  """
+
+  def __init__(self, properties_and_tests, worker_count, max_batch_size):
+    """
+    :param properties_and_tests: A list of (properties, tests) pairs.
+    :param int worker_count: The number of workers pulling from the queue.
+    :param int max_batch_size: The largest batch to hand out.
+    """
+    self._pending = deque((properties, list(tests)) for properties, tests in properties_and_tests
+                          if tests)
+    self._remaining = sum(len(tests) for _, tests in self._pending)
+    self._test_count = self._remaining
+    self._worker_count = max(worker_count, 1)
+    self._max_batch_size = max(max_batch_size, 1)
+    self._lock = threading.Lock()
+
+  @property
+  def test_count(self):
+    """The total number of tests in the queue when it was created."""
+    return self._test_count
+
+  def next_batch(self):
+    """Returns the next (properties, tests) batch, or None if the queue is drained or closed."""
+    with self._lock:
+      if not self._pending:
+        return None
+      properties, tests = self._pending[0]
+      size = -(-self._remaining // (2 * self._worker_count))
+      size = max(1, min(size, self._max_batch_size, len(tests)))
+      batch = tests[:size]
+      del tests[:size]
+      if not tests:
+        self._pending.popleft()
+      self._remaining -= size
+      return properties, batch
+
+  def close(self):
+    """Drops all remaining tests, so that workers stop after their current batch."""
+    with self._lock:
+      self._pending.clear()
+      self._remaining = 0
@@ -0,0 +1,183 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import mmap
+import os
+from collections import defaultdict
+
+from pants.goal.products import MultipleRootedProducts
+from pants.util.dirutil import safe_concurrent_creation
+
+
+class ClassesBySourceIndex(object):
+  """An on-disk index from each source of a compiled target to the classfiles compiled from it.
+
+  The index is a text file with a line per source, sorted by source, which is binary searched via
+  mmap so that looking up a few sources does not require reading the whole index. Each index is
+  stamped with the state of the analysis it was computed from, and lookups against a different
+  stamp miss.
+  """
+
+  _HEADER = 'classes-by-source 1 {}\n'
+
+  def __init__(self, path):
+    """
+    :param string path: The path of the index file.
+    """
+    self._path = path
+
+  @property
+  def path(self):
+    return self._path
+
+  def write(self, classes_by_source, classes_dir, stamp):
+    """Writes the index.
+
+    :param dict classes_by_source: A dict of buildroot-relative source to absolute classfile paths.
+    :param string classes_dir: The directory that the classfiles are stored in.
+    :param string stamp: An identifier of the state the mapping was computed from.
+    """
+    with safe_concurrent_creation(self._path) as tmp_path:
+      with open(tmp_path, 'wb') as fp:
+        fp.write(self._HEADER.format(stamp).encode('utf-8'))
+        # Entries are sorted by their encoded source, which is what `_find` compares.
+        entries = sorted((source.encode('utf-8'), classes)
+                         for source, classes in classes_by_source.items())
+        for source, classes in entries:
+          fields = [os.path.relpath(cls, classes_dir) for cls in classes]
+          fp.write(source + '\t{}\n'.format('\t'.join(fields + [''])).encode('utf-8'))
+
+  def lookup(self, sources, stamp):
+    """Looks up the classfiles compiled from the given sources.
+
+    :param sources: Buildroot-relative source paths.
+    :param string stamp: The identifier that the index must have been written with.
+    :returns: A dict from each source to a list of its classfiles, relative to the classes dir; or
+      None if the index does not exist or has a different stamp.
+    """
+    try:
+      fp = open(self._path, 'rb')
+    except IOError:
+      return None
+    with fp:
+      header = self._HEADER.format(stamp).encode('utf-8')
+      if fp.readline() != header:
+        return None
+      contents = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+      try:
+        return {source: self._find(contents, len(header), source) for source in sources}
+      finally:
+        contents.close()
+
+  @staticmethod
+  def _find(contents, start, source):
+    """Binary searches the sorted entries from offset `start` to the end of `contents`."""
+    key = source.encode('utf-8')
+    # `lo` is always the start of an entry, and `hi` the end of the search range.
+    lo, hi = start, len(contents)
+    while lo < hi:
+      mid = (lo + hi) // 2
+      entry_start = contents.rfind(b'\n', lo, mid) + 1 or lo
+      entry_end = contents.find(b'\n', entry_start, hi)
+      if entry_end == -1:
+        entry_end = hi
+      source_end = contents.find(b'\t', entry_start, entry_end)
+      entry_source = contents[entry_start:source_end]
+      if entry_source == key:
+        classes = contents[source_end + 1:entry_end].decode('utf-8')
+        return [cls for cls in classes.split('\t') if cls]
+      elif entry_source < key:
+        lo = entry_end + 1
+      else:
+        hi = entry_start
+    return []
+
+
+class ClassesBySource(defaultdict):
+  """The `classes_by_source` product: a dict of source to the MultipleRootedProducts of its classes.
+
+  Sources may be registered lazily with `add_index`, in which case their products are only looked
+  up in the corresponding `ClassesBySourceIndex` when they are first accessed. Since most consumers
+  of the product are only interested in a few sources, most indexes are never read.
+  """
+
+  def __init__(self):
+    super(ClassesBySource, self).__init__(MultipleRootedProducts)
+    # A dict of source to a list of (classes_dir, lookup) for sources with products not yet loaded.
+    self._pending = {}
+
+  def add_index(self, sources, classes_dir, lookup):
+    """Registers the products of the given sources, to be loaded on demand.
+
+    :param sources: Buildroot-relative source paths.
+    :param string classes_dir: The root of the classfiles compiled from the sources.
+    :param lookup: A function that takes a list of sources and returns a dict of each of those
+      sources to their classfiles, relative to `classes_dir`.
+    """
+    for source in sources:
+      self._pending.setdefault(source, []).append((classes_dir, lookup))
+
+  def _load(self, sources):
+    # Group the pending sources by lookup, so that each index is read once per load.
+    pending_by_lookup = defaultdict(list)
+    for source in sources:
+      for classes_dir, lookup in self._pending.pop(source, ()):
+        pending_by_lookup[(classes_dir, lookup)].append(source)
+    for (classes_dir, lookup), lookup_sources in pending_by_lookup.items():
+      classes_by_source = lookup(lookup_sources)
+      for source in lookup_sources:
+        super(ClassesBySource, self).__getitem__(source).add_rel_paths(
+          classes_dir, classes_by_source.get(source, []))
+
+  def _load_all(self):
+    if self._pending:
+      self._load(list(self._pending))
+
+  def __getitem__(self, source):
+    if source in self._pending:
+      self._load([source])
+    return super(ClassesBySource, self).__getitem__(source)
+
+  def get(self, source, default=None):
+    if source in self._pending:
+      self._load([source])
+    return super(ClassesBySource, self).get(source, default)
+
+  def __contains__(self, source):
+    return source in self._pending or super(ClassesBySource, self).__contains__(source)
+
+  def __len__(self):
+    self._load_all()
+    return super(ClassesBySource, self).__len__()
+
+  def __iter__(self):
+    self._load_all()
+    return super(ClassesBySource, self).__iter__()
+
+  def keys(self):
+    self._load_all()
+    return super(ClassesBySource, self).keys()
+
+  def values(self):
+    self._load_all()
+    return super(ClassesBySource, self).values()
+
+  def items(self):
+    self._load_all()
+    return super(ClassesBySource, self).items()
+
+  def iterkeys(self):
+    self._load_all()
+    return super(ClassesBySource, self).iterkeys()
+
+  def itervalues(self):
+    self._load_all()
+    return super(ClassesBySource, self).itervalues()
+
+  def iteritems(self):
+    self._load_all()
+    return super(ClassesBySource, self).iteritems()
@@ -7,7 +7,6 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import functools
 import os
-from collections import defaultdict
 from multiprocessing import cpu_count
 
 from twitter.common.collections import OrderedSet
@@ -18,21 +17,22 @@ from pants.backend.jvm.subsystems.scala_platform import ScalaPlatform
 from pants.backend.jvm.targets.jar_library import JarLibrary
 from pants.backend.jvm.targets.javac_plugin import JavacPlugin
 from pants.backend.jvm.tasks.classpath_util import ClasspathUtil
+from pants.backend.jvm.tasks.directory_jar import DirectoryJar
+from pants.backend.jvm.tasks.jvm_compile.classes_by_source import (ClassesBySource,
+                                                                   ClassesBySourceIndex)
 from pants.backend.jvm.tasks.jvm_compile.compile_context import CompileContext, DependencyContext
-from pants.backend.jvm.tasks.jvm_compile.execution_graph import (ExecutionFailure, ExecutionGraph,
-                                                                 Job)
 from pants.backend.jvm.tasks.jvm_dependency_analyzer import JvmDependencyAnalyzer
 from pants.backend.jvm.tasks.nailgun_task import NailgunTaskBase
 from pants.base.build_environment import get_buildroot
 from pants.base.exceptions import TaskError
+from pants.base.execution_graph import ExecutionFailure, ExecutionGraph, Job
 from pants.base.fingerprint_strategy import TaskIdentityFingerprintStrategy
 from pants.base.worker_pool import WorkerPool
 from pants.base.workunit import WorkUnitLabel
 from pants.build_graph.resources import Resources
 from pants.build_graph.target_scopes import Scopes
-from pants.goal.products import MultipleRootedProducts
 from pants.reporting.reporting_utils import items_to_report_element
-from pants.util.dirutil import fast_relpath, safe_delete, safe_mkdir, safe_rmtree, safe_walk
+from pants.util.dirutil import safe_delete, safe_mkdir, safe_rmtree
 from pants.util.fileutil import create_size_estimators
 from pants.util.memo import memoized_property
 
@@ -534,61 +534,24 @@ class JvmCompile(NailgunTaskBase):
 
   def _create_empty_products(self):
     if self.context.products.is_required_data('classes_by_source'):
-      make_products = lambda: defaultdict(MultipleRootedProducts)
-      self.context.products.safe_create_data('classes_by_source', make_products)
+      self.context.products.safe_create_data('classes_by_source', ClassesBySource)
 
     if self.context.products.is_required_data('product_deps_by_src') \
         or self._unused_deps_check_enabled:
       self.context.products.safe_create_data('product_deps_by_src', dict)
 
-  def compute_classes_by_source(self, compile_contexts):
-    """Compute a map of (context->(src->classes)) for the given compile_contexts.
-
-    It's possible (although unfortunate) for multiple targets to own the same sources, hence
-    the top level division. Srcs are relative to buildroot. Classes are absolute paths.
-
-    Returning classes with 'None' as their src indicates that the compiler analysis indicated
-    that they were un-owned. This case is triggered when annotation processors generate
-    classes (or due to bugs in classfile tracking in zinc/jmake.)
-    """
-    buildroot = get_buildroot()
-    # Build a mapping of srcs to classes for each context.
-    classes_by_src_by_context = defaultdict(dict)
-    for compile_context in compile_contexts:
-      # Walk the context's jar to build a set of unclaimed classfiles.
-      unclaimed_classes = set()
-      with compile_context.open_jar(mode='r') as jar:
-        for name in jar.namelist():
-          if not name.endswith('/'):
-            unclaimed_classes.add(os.path.join(compile_context.classes_dir, name))
-
-      # Grab the analysis' view of which classfiles were generated.
-      classes_by_src = classes_by_src_by_context[compile_context]
-      if os.path.exists(compile_context.analysis_file):
-        products = self._analysis_parser.parse_products_from_path(compile_context.analysis_file,
-                                                                  compile_context.classes_dir)
-        for src, classes in products.items():
-          relsrc = os.path.relpath(src, buildroot)
-          classes_by_src[relsrc] = classes
-          unclaimed_classes.difference_update(classes)
-
-      # Any remaining classfiles were unclaimed by sources/analysis.
-      classes_by_src[None] = list(unclaimed_classes)
-    return classes_by_src_by_context
-
   def _register_vts(self, compile_contexts):
     classes_by_source = self.context.products.get_data('classes_by_source')
     product_deps_by_src = self.context.products.get_data('product_deps_by_src')
 
-    # Register a mapping between sources and classfiles (if requested).
+    # Register a mapping between sources and classfiles (if requested). The mapping for each
+    # target is only read from its index when one of its sources is first looked up.
     if classes_by_source is not None:
-      ccbsbc = self.compute_classes_by_source(compile_contexts).items()
-      for compile_context, computed_classes_by_source in ccbsbc:
-        classes_dir = compile_context.classes_dir
-
-        for source in compile_context.sources:
-          classes = computed_classes_by_source.get(source, [])
-          classes_by_source[source].add_abs_paths(classes_dir, classes)
+      for compile_context in compile_contexts:
+        classes_by_source.add_index(compile_context.sources,
+                                    compile_context.classes_dir,
+                                    functools.partial(self._lookup_classes_by_source,
+                                                      compile_context))
 
     # Register classfile product dependencies (if requested).
     if product_deps_by_src is not None:
@@ -596,6 +559,50 @@ class JvmCompile(NailgunTaskBase):
         product_deps_by_src[compile_context.target] = \
             self._analysis_parser.parse_deps_from_path(compile_context.analysis_file)
 
+  @staticmethod
+  def _classes_by_source_index(compile_context):
+    return ClassesBySourceIndex('{}.classes_by_source'.format(compile_context.analysis_file))
+
+  @staticmethod
+  def _analysis_stamp(compile_context):
+    try:
+      stat = os.stat(compile_context.analysis_file)
+    except OSError:
+      return None
+    return '{}-{}'.format(stat.st_size, repr(stat.st_mtime))
+
+  def _write_classes_by_source_index(self, compile_context):
+    """Writes the index of sources to classes for the analysis of the given context.
+
+    :returns: The stamp the index was written with, or None if the context has no analysis.
+    """
+    stamp = self._analysis_stamp(compile_context)
+    if stamp is None:
+      return None
+    buildroot = get_buildroot()
+    products = self._analysis_parser.parse_products_from_path(compile_context.analysis_file,
+                                                              compile_context.classes_dir)
+    classes_by_src = {os.path.relpath(src, buildroot): classes for src, classes in products.items()}
+    self._classes_by_source_index(compile_context).write(classes_by_src,
+                                                          compile_context.classes_dir,
+                                                          stamp)
+    return stamp
+
+  def _lookup_classes_by_source(self, compile_context, sources):
+    """Returns a dict of the given sources of the context to their classfiles (relative paths).
+
+    The context's index is (re)written from its analysis if it is missing or stale.
+    """
+    index = self._classes_by_source_index(compile_context)
+    stamp = self._analysis_stamp(compile_context)
+    if stamp is None:
+      return {}
+    classes_by_source = index.lookup(sources, stamp)
+    if classes_by_source is None:
+      stamp = self._write_classes_by_source_index(compile_context)
+      classes_by_source = index.lookup(sources, stamp) if stamp else None
+    return classes_by_source or {}
+
   def _check_unused_deps(self, compile_context):
     """Uses `product_deps_by_src` to check unused deps and warn or error."""
     with self.context.new_workunit('unused-check', labels=[WorkUnitLabel.COMPILER]):
@@ -736,6 +743,10 @@ class JvmCompile(NailgunTaskBase):
         # Jar the compiled output.
         self._create_context_jar(ctx)
 
+        # Index the classes compiled from each source, for later runs as well as this one.
+        if self.context.products.is_required_data('classes_by_source'):
+          self._write_classes_by_source_index(ctx)
+
       # Update the products with the latest classes.
       self._register_vts([ctx])
 
@@ -789,13 +800,8 @@ class JvmCompile(NailgunTaskBase):
     compile inputs would make the compiler's analysis useless.
       see https://github.com/twitter-forks/sbt/tree/stuhood/output-jars
     """
-    root = compile_context.classes_dir
-    with compile_context.open_jar(mode='w') as jar:
-      for abs_sub_dir, dirnames, filenames in safe_walk(root):
-        for name in dirnames + filenames:
-          abs_filename = os.path.join(abs_sub_dir, name)
-          arcname = fast_relpath(abs_filename, root)
-          jar.write(abs_filename, arcname)
+    # Only the classfiles changed by an incremental compile are re-read into the jar.
+    DirectoryJar(compile_context.classes_dir, compile_context.jar_file).update()
 
   def validate_analysis(self, path):
     """Throws a TaskError for invalid analysis files."""
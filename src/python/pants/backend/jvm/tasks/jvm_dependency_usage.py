@@ -5,10 +5,12 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import hashlib
 import json
 import os
 import sys
 from collections import defaultdict, namedtuple
+from multiprocessing import cpu_count
 
 from pants.backend.jvm.targets.jar_library import JarLibrary
 from pants.backend.jvm.tasks.jvm_dependency_analyzer import JvmDependencyAnalyzer
@@ -63,6 +65,8 @@ class JvmDependencyUsage(Task):
                   'Useful for computing analysis for a lot of targets, but '
                   'result can differ from direct execution because cached information '
                   'doesn\'t depend on 3rdparty libraries versions.')
+    register('--worker-count', advanced=True, type=int, default=cpu_count(),
+             help='The number of targets to compute dependency usage for concurrently.')
 
   @classmethod
   def prepare(cls, options, round_manager):
@@ -96,7 +100,7 @@ class JvmDependencyUsage(Task):
 
   @classmethod
   def implementation_version(cls):
-    return super(JvmDependencyUsage, cls).implementation_version() + [('JvmDependencyUsage', 7)]
+    return super(JvmDependencyUsage, cls).implementation_version() + [('JvmDependencyUsage', 8)]
 
   def _render(self, graph, fh):
     chunks = graph.to_summary() if self.get_options().summary else graph.to_json()
@@ -156,26 +160,86 @@ class JvmDependencyUsage(Task):
     """Strategy directly computes dependency graph node based on
     `classes_by_source`, `runtime_classpath`, `product_deps_by_src` parameters and
     stores the result to the build cache.
+
+    Nodes are only computed for invalid targets: the node stored for a valid target is reused as
+    long as the resolved 3rdparty jars have not changed since it was computed. Since targets are
+    invalidated along with their dependents, that means that only nodes whose sources, analysis or
+    dependencies have changed are recomputed. The nodes that do need computing are computed
+    concurrently, before any node is requested.
     """
-    analyzer = JvmDependencyAnalyzer(get_buildroot(), runtime_classpath, product_deps_by_src)
-    targets = self.context.targets()
-    targets_by_file = analyzer.targets_by_file(targets)
-    transitive_deps_by_target = analyzer.compute_transitive_deps_by_target(targets)
+    resolved_jars = self._resolved_jars_fingerprint(runtime_classpath)
+    targets_by_spec = {t.address.spec: t for t in self.context.targets()}
+
+    nodes = {}
+    invalid_targets = []
+    for target, vt in target_to_vts.items():
+      if not self._select(target):
+        continue
+      node = self._load_node(vt, resolved_jars, targets_by_spec) if vt.valid else None
+      if node is None:
+        invalid_targets.append(target)
+      else:
+        nodes[target] = node
+
+    if invalid_targets:
+      analyzer = JvmDependencyAnalyzer(get_buildroot(), runtime_classpath, product_deps_by_src)
+      targets = self.context.targets()
+      targets_by_file = analyzer.targets_by_file(targets)
+      transitive_deps_by_target = analyzer.compute_transitive_deps_by_target(targets)
+
+      def compute(target):
+        transitive_deps = set(transitive_deps_by_target.get(target))
+        node = self.create_dep_usage_node(target,
+                                          analyzer,
+                                          classes_by_source,
+                                          targets_by_file,
+                                          transitive_deps)
+        cacheable_dict = node.to_cacheable_dict()
+        cacheable_dict['resolved_jars'] = resolved_jars
+        with open(self.nodes_json(target_to_vts[target].results_dir), mode='w') as fp:
+          json.dump(cacheable_dict, fp, indent=2, sort_keys=True)
+        return node
+
+      computed = self._compute_nodes(compute, invalid_targets)
+      for target, node in zip(invalid_targets, computed):
+        target_to_vts[target].update()
+        nodes[target] = node
+
     def creator(target):
-      transitive_deps = set(transitive_deps_by_target.get(target))
-      node = self.create_dep_usage_node(target,
-                                        analyzer,
-                                        classes_by_source,
-                                        targets_by_file,
-                                        transitive_deps)
-      vt = target_to_vts[target]
-      with open(self.nodes_json(vt.results_dir), mode='w') as fp:
-        json.dump(node.to_cacheable_dict(), fp, indent=2, sort_keys=True)
-      vt.update()
-      return node
+      return nodes[target]
 
     return creator
 
+  def _compute_nodes(self, compute, targets):
+    """Returns the result of `compute` for each of the targets, in order."""
+    return self.map_concurrently('dep-usage', compute, [(t,) for t in targets],
+                                 self.get_options().worker_count)
+
+  def _load_node(self, vt, resolved_jars, targets_by_spec):
+    """Returns the node stored for a valid target, or None if it must be recomputed."""
+    try:
+      with open(self.nodes_json(vt.results_dir)) as fp:
+        cached_dict = json.load(fp)
+      if cached_dict.get('resolved_jars') != resolved_jars:
+        return None
+      return Node.from_cacheable_dict(cached_dict, targets_by_spec.__getitem__)
+    except (IOError, ValueError, KeyError):
+      return None
+
+  def _resolved_jars_fingerprint(self, runtime_classpath):
+    """Fingerprints the resolved coordinates of all 3rdparty jars in the context.
+
+    Nodes record the jars that their products come from, and jars may resolve to different versions
+    without any target changing.
+    """
+    jar_libraries = self.context.targets(lambda t: isinstance(t, JarLibrary))
+    entries = runtime_classpath.get_artifact_classpath_entries_for_targets(jar_libraries)
+    coordinates = sorted(str(entry.coordinate) for _, entry in entries)
+    hasher = hashlib.sha1()
+    for coordinate in coordinates:
+      hasher.update(coordinate)
+    return hasher.hexdigest()
+
   def cached_node_creator(self, target_to_vts):
     """Strategy restores dependency graph node from the build cache.
     """
@@ -411,9 +475,10 @@ class DependencyUsageGraph(object):
     yield '\n]\n'
 
   def to_json(self):
-    """Outputs the entire graph."""
-    res_dict = {}
+    """Outputs the entire graph.
 
+    The graph is output a node at a time, so that large graphs are never fully rendered in memory.
+    """
     def gen_dep_edge(node, edge, dep_tgt, aliases):
       return {
         'target': dep_tgt.address.spec,
@@ -423,12 +488,18 @@ class DependencyUsageGraph(object):
         'aliases': [alias.address.spec for alias in aliases],
       }
 
-    for node in self._nodes.values():
-      res_dict[node.concrete_target.address.spec] = {
+    yield '{'
+    first = True
+    for node in sorted(self._nodes.values(), key=lambda n: n.concrete_target.address.spec):
+      node_dict = {
         'cost': self._cost(node.concrete_target),
         'cost_transitive': self._trans_cost(node.concrete_target),
         'products_total': node.products_total,
         'dependencies': [gen_dep_edge(node, edge, dep_tgt, node.dep_aliases.get(dep_tgt, {}))
                          for dep_tgt, edge in node.dep_edges.items()],
       }
-    yield json.dumps(res_dict, indent=2, sort_keys=True)
+      yield '{}\n  {}: {}'.format('' if first else ',',
+                                   json.dumps(node.concrete_target.address.spec),
+                                   json.dumps(node_dict, sort_keys=True))
+      first = False
+    yield '\n}\n'
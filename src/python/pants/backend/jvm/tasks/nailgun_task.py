@@ -6,6 +6,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import os
+import threading
 
 from pants.backend.jvm.targets.jar_dependency import JarDependency
 from pants.backend.jvm.tasks.jvm_tool_task_mixin import JvmToolTaskMixin
@@ -29,6 +30,13 @@ class NailgunTaskBase(JvmToolTaskMixin, TaskBase):
              help='Timeout (secs) for nailgun startup.')
     register('--nailgun-connect-attempts', advanced=True, default=5, type=int,
              help='Max attempts for nailgun connects.')
+    register('--nailgun-pool-size', advanced=True, default=1, type=int,
+             help='Max number of nailgun servers to run for this task. Concurrent invocations '
+                  'are dispatched to the least loaded server, and additional servers are only '
+                  'spawned when all existing ones are busy.')
+    register('--nailgun-max-rss-mb', advanced=True, type=int,
+             help='If set, restart idle nailgun servers for this task whose resident memory '
+                  'exceeds this many megabytes.')
     cls.register_jvm_tool(register,
                           'nailgun-server',
                           classpath=[
@@ -53,6 +61,16 @@ class NailgunTaskBase(JvmToolTaskMixin, TaskBase):
     self._executor_workdir = os.path.join(self.context.options.for_global_scope().pants_workdir,
                                           *id_tuple)
 
+  # Guards the run tracker's cumulative timings, which tasks may add to from multiple threads.
+  _nailgun_latency_lock = threading.Lock()
+
+  def _record_nailgun_latency(self, latency):
+    """Aggregates the queue, connect and run phases of a nailgun command into the run timings."""
+    with self._nailgun_latency_lock:
+      for phase in latency._fields:
+        self.context.run_tracker.cumulative_timings.add_timing(
+          'nailgun:{}:{}'.format(self._identity, phase), getattr(latency, phase))
+
   def create_java_executor(self):
     """Create java executor that uses this task's ng daemon, if allowed.
 
@@ -60,12 +78,16 @@ class NailgunTaskBase(JvmToolTaskMixin, TaskBase):
     """
     if self.get_options().use_nailgun:
       classpath = os.pathsep.join(self.tool_classpath('nailgun-server'))
+      max_rss_mb = self.get_options().nailgun_max_rss_mb
       return NailgunExecutor(self._identity,
                              self._executor_workdir,
                              classpath,
                              self.dist,
                              connect_timeout=self.get_options().nailgun_timeout_seconds,
-                             connect_attempts=self.get_options().nailgun_connect_attempts)
+                             connect_attempts=self.get_options().nailgun_connect_attempts,
+                             latency_observer=self._record_nailgun_latency,
+                             pool_size=self.get_options().nailgun_pool_size,
+                             max_rss_bytes=max_rss_mb * 1024 * 1024 if max_rss_mb else None)
     else:
       return SubprocessExecutor(self.dist)
 
@@ -9,7 +9,9 @@ import logging
 import os
 import re
 import shutil
+import uuid
 from hashlib import sha1
+from multiprocessing import cpu_count
 
 from twitter.common.dirutil.fileset import fnmatch_translate_extended
 
@@ -19,6 +21,9 @@ from pants.base.build_environment import get_buildroot
 from pants.base.fingerprint_strategy import DefaultFingerprintHashingMixin, FingerprintStrategy
 from pants.fs.archive import ZIP
 from pants.task.task import Task
+from pants.util.contextutil import open_zip
+from pants.util.dirutil import (fast_relpath, safe_concurrent_rename, safe_delete, safe_mkdir,
+                                safe_mkdir_for, safe_rmtree, safe_walk)
 
 
 logger = logging.getLogger(__name__)
@@ -44,6 +49,13 @@ class UnpackJars(Task):
 
   Adds an entry to SourceRoot for the contents.
 
+  Each jar is extracted once into a cache keyed by the digest of its contents, and the files that
+  match a target's patterns are copied from there into the target's unpack dir. So a jar unpacked
+  by many targets with different patterns is only unzipped once. Jars with entries that could not
+  all be extracted side by side, such as a LICENSE file and a license/ dir, are instead extracted
+  directly into each target's unpack dir with its patterns, so that the entries the patterns skip
+  are never written.
+
   :API: public
   """
 
@@ -57,6 +69,12 @@ class UnpackJars(Task):
   def product_types(cls):
     return ['unpacked_archives']
 
+  @classmethod
+  def register_options(cls, register):
+    super(UnpackJars, cls).register_options(register)
+    register('--worker-count', advanced=True, type=int, default=cpu_count(),
+             help='The number of jars to extract concurrently.')
+
   @classmethod
   def prepare(cls, options, round_manager):
     super(UnpackJars, cls).prepare(options, round_manager)
@@ -65,6 +83,10 @@ class UnpackJars(Task):
   def _unpack_dir(self, unpacked_jars):
     return os.path.normpath(os.path.join(self._workdir, unpacked_jars.id))
 
+  @property
+  def _extracted_jars_dir(self):
+    return os.path.join(self._workdir, 'extracted-jars')
+
   @classmethod
   def _file_filter(cls, filename, include_patterns, exclude_patterns):
     """:returns: `True` if the file should be allowed through the filter."""
@@ -93,10 +115,24 @@ class UnpackJars(Task):
           .format(field_name=field_name, field_value=p, spec=spec, msg=e))
     return compiled_patterns
 
+  @classmethod
+  def _combine_patterns(cls, compiled_patterns):
+    """Combines compiled patterns into a single pattern that matches if any of them match."""
+    if not compiled_patterns:
+      return []
+    flags = 0
+    for pattern in compiled_patterns:
+      flags |= pattern.flags
+    return [re.compile('|'.join('(?:{})'.format(pattern.pattern) for pattern in compiled_patterns),
+                       flags)]
+
   @classmethod
   def calculate_unpack_filter(cls, includes=None, excludes=None, spec=None):
     """Take regex patterns and return a filter function.
 
+    The patterns of each kind are combined into a single regex, so that filtering a file costs a
+    single match per kind no matter how many patterns there are.
+
     :param list includes: List of include patterns to pass to _file_filter.
     :param list excludes: List of exclude patterns to pass to _file_filter.
     """
@@ -106,6 +142,8 @@ class UnpackJars(Task):
     exclude_patterns = cls._compile_patterns(excludes or [],
                                              field_name='exclude_patterns',
                                              spec=spec)
+    include_patterns = cls._combine_patterns(include_patterns)
+    exclude_patterns = cls._combine_patterns(exclude_patterns)
     return lambda f: cls._file_filter(f, include_patterns, exclude_patterns)
 
   # TODO(mateor) move unpack code that isn't jar-specific to fs.archive or an Unpack base class.
@@ -119,16 +157,96 @@ class UnpackJars(Task):
                                        excludes=unpacked_jars.payload.exclude_patterns,
                                        spec=unpacked_jars.address.spec)
 
-  def _unpack(self, unpacked_jars):
-    """Extracts files from the downloaded jar files and places them in a work directory.
+  @staticmethod
+  def _jar_digest(jar_path):
+    hasher = sha1()
+    with open(jar_path, 'rb') as fp:
+      for chunk in iter(lambda: fp.read(65536), b''):
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+  @staticmethod
+  def _has_collisions(names):
+    """Returns True if the given zip entries cannot all be extracted into one dir.
+
+    That is the case if a file has the path of a dir, or if two paths differ only in case, since
+    they collide on case-insensitive filesystems.
+    """
+    spellings = {}
+    file_paths = set()
+    dir_paths = set()
+    for name in names:
+      components = name.split(b'/')
+      for i in range(1, len(components) + 1):
+        path = b'/'.join(components[:i])
+        if spellings.setdefault(path.lower(), path) != path:
+          return True
+        (file_paths if i == len(components) else dir_paths).add(path.lower())
+    return not file_paths.isdisjoint(dir_paths)
+
+  def _extract(self, jar_path):
+    """Extracts all of the files of a jar into the shared cache, unless already there.
+
+    :returns: The directory that the jar is extracted to and the paths of its files relative to it,
+      or None if the files of the jar cannot all be extracted into one dir.
+    """
+    with open_zip(jar_path) as jar:
+      names = [name for name in jar.namelist() if not name.endswith(b'/')]
+    if self._has_collisions(names):
+      return None
+    extracted_dir = os.path.join(self._extracted_jars_dir, self._jar_digest(jar_path))
+    if not os.path.isdir(extracted_dir):
+      self.context.log.debug('Extracting jar {jar_path} to {extracted_dir}.'
+                             .format(jar_path=jar_path, extracted_dir=extracted_dir))
+      tmp_dir = '{}.tmp.{}'.format(extracted_dir, uuid.uuid4().hex)
+      try:
+        ZIP.extract(jar_path, tmp_dir)
+        # A jar without any files extracts nothing.
+        safe_mkdir(tmp_dir)
+        safe_concurrent_rename(tmp_dir, extracted_dir)
+      finally:
+        safe_rmtree(tmp_dir)
+    relpaths = [fast_relpath(os.path.join(root, f), extracted_dir)
+                for root, _, files in safe_walk(extracted_dir)
+                for f in files]
+    return extracted_dir, relpaths
+
+  def _extract_all(self, unpacked_targets):
+    """Extracts the jars imported by the given targets into the shared cache, concurrently.
+
+    :returns: A dict from jar path to the result of `_extract` for the jar.
+    """
+    jar_import_products = self.context.products.get_data(JarImportProducts)
+    jar_paths = sorted(set(jar_path
+                           for target in unpacked_targets
+                           for _, jar_path in jar_import_products.imports(target)))
+    extractions = self.map_concurrently('unpack-jars', self._extract,
+                                        [(jar_path,) for jar_path in jar_paths],
+                                        self.get_options().worker_count)
+    return dict(zip(jar_paths, extractions))
+
+  @staticmethod
+  def _copy_extracted(extracted_dir, relpaths, unpack_dir):
+    """Copies the given files of an extracted jar into the unpack dir.
+
+    The files are copied rather than linked so that changes to the unpacked files cannot reach the
+    cache.
+    """
+    for relpath in relpaths:
+      dst = os.path.join(unpack_dir, relpath)
+      safe_mkdir_for(dst)
+      # A file from a later jar replaces the same file from an earlier one, as on extraction.
+      safe_delete(dst)
+      shutil.copy2(os.path.join(extracted_dir, relpath), dst)
+
+  def _unpack(self, unpacked_jars, extractions):
+    """Places the files of the jars a target imports that match its patterns in a work directory.
 
     :param UnpackedJars unpacked_jars: target referencing jar_libraries to unpack.
+    :param dict extractions: The result of `_extract` for each imported jar, keyed by jar path.
     """
     unpack_dir = self._unpack_dir(unpacked_jars)
-    if os.path.exists(unpack_dir):
-      shutil.rmtree(unpack_dir)
-    if not os.path.exists(unpack_dir):
-      os.makedirs(unpack_dir)
+    safe_mkdir(unpack_dir, clean=True)
 
     unpack_filter = self.get_unpack_filter(unpacked_jars)
     jar_import_products = self.context.products.get_data(JarImportProducts)
@@ -137,7 +255,12 @@ class UnpackJars(Task):
                              .format(coordinate=coordinate,
                                      jar_path=jar_path,
                                      unpack_dir=unpack_dir))
-      ZIP.extract(jar_path, unpack_dir, filter_func=unpack_filter)
+      extraction = extractions[jar_path]
+      if extraction is None:
+        ZIP.extract(jar_path, unpack_dir, filter_func=unpack_filter)
+      else:
+        extracted_dir, relpaths = extraction
+        self._copy_extracted(extracted_dir, filter(unpack_filter, relpaths), unpack_dir)
 
   def execute(self):
     addresses = [target.address for target in self.context.targets()]
@@ -150,8 +273,9 @@ class UnpackJars(Task):
                           invalidate_dependents=True) as invalidation_check:
       if invalidation_check.invalid_vts:
         unpacked_targets.extend([vt.target for vt in invalidation_check.invalid_vts])
+        extractions = self._extract_all(unpacked_targets)
         for target in unpacked_targets:
-          self._unpack(target)
+          self._unpack(target, extractions)
 
     for unpacked_jars_target in unpacked_jars_list:
       unpack_dir = self._unpack_dir(unpacked_jars_target)
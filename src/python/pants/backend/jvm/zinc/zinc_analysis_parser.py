@@ -93,24 +93,33 @@ class ZincAnalysisParser(object):
         self.rebase(infile, outfile, rebase_mappings, java_home)
 
   def rebase(self, infile, outfile, rebase_mappings, java_home=None):
+    """Rebases the analysis read from infile, writing the result to outfile.
+
+    The analysis is rebased a section at a time: each section is located in the contents of the
+    file as a whole, and its paths are replaced by a few replacements over the whole section,
+    rather than line by line. Only sections that have paths to scrub under java_home are split
+    into lines.
+    """
     self._verify_version(infile)
     outfile.write(ZincAnalysis.FORMAT_VERSION_LINE)
 
-    # Ensure we replace the longest match first, since the shorter one might be prefix of the longer.
-    rebase_mappings_sorted = [(old_base, rebase_mappings[old_base])
-                              for old_base in sorted(rebase_mappings, key=len, reverse=True)]
-    def rebase_element(cls):
-      for header in cls.headers:
-        self._rebase_section(cls, header, infile, outfile, rebase_mappings_sorted, java_home)
-
-    rebase_element(CompileSetup)
-    rebase_element(Relations)
-    rebase_element(Stamps)
-    rebase_element(APIs)
-    rebase_element(SourceInfos)
-    rebase_element(Compilations)
-
-  def _rebase_section(self, cls, header, lines_iter, outfile, rebase_mappings, java_home=None):
+    rebaser = _Rebaser(rebase_mappings)
+    contents = b''.join(infile)
+    sections = [(cls, _to_bytes(header))
+                for cls in (CompileSetup, Relations, Stamps, APIs, SourceInfos, Compilations)
+                for header in cls.headers]
+    pos = 0
+    for index, (cls, header) in enumerate(sections):
+      next_header = sections[index + 1][1] if index + 1 < len(sections) else None
+      pos = self._rebase_section(cls, header, next_header, contents, pos, outfile, rebaser,
+                                 java_home)
+
+  def _rebase_section(self, cls, header, next_header, contents, pos, outfile, rebaser,
+                      java_home=None):
+    """Rebases the section with the given header that starts at pos in contents.
+
+    :returns: The position in contents of the end of the section.
+    """
     # Booleans describing the rebasing logic to apply, if any.
     rebase_pants_home_anywhere = header in cls.pants_home_anywhere
     rebase_pants_home_prefix = header in cls.pants_home_prefix_only
@@ -118,41 +127,62 @@ class ZincAnalysisParser(object):
     filter_java_home_prefix = java_home and header in cls.java_home_prefix_only
 
     # Check the header and get the number of items.
-    line = next(lines_iter)
-    if header + b':\n' != line:
+    header_line = header + b':\n'
+    line, pos = self._next_line(contents, pos)
+    if line != header_line:
       raise self.ParseError('Expected: "{}:". Found: "{}"'.format(header, line))
-    n = self._parse_num_items(next(lines_iter))
+    line, pos = self._next_line(contents, pos)
+    n = self._parse_num_items(line)
+    lines_per_item = 1 if cls.inline_vals else 2
 
-    # Iterate over the lines, applying rebasing/dropping logic as required.
-    rebased_lines = []
-    num_rebased_items = 0
-    for _ in range(n):
-      line = next(lines_iter)
-      drop_line = ((filter_java_home_anywhere and java_home in line) or
-                   (filter_java_home_prefix and line.startswith(java_home)))
-      if not drop_line:
-        rebased_line = line
-        if rebase_pants_home_anywhere:
-          for rebased_from, rebased_to in rebase_mappings:
-            rebased_line = rebased_line.replace(rebased_from, rebased_to)
-        elif rebase_pants_home_prefix:
-          for rebased_from, rebased_to in rebase_mappings:
-            if line.startswith(rebased_from):
-              rebased_line = rebased_to + line[len(rebased_from):]
-              break
-        rebased_lines.append(rebased_line)
-        num_rebased_items += 1
-        if not cls.inline_vals:  # These values are blobs and never need to be rebased.
-          rebased_lines.append(next(lines_iter))
-      elif not cls.inline_vals:
-        next(lines_iter)  # Also drop the non-inline value.
-
-    # Write the rebased lines back out.
-    outfile.write(header + b':\n')
-    outfile.write(b'{} items\n'.format(num_rebased_items))
-    chunk_size = 10000
-    for i in range(0, len(rebased_lines), chunk_size):
-      outfile.write(b''.join(rebased_lines[i:i+chunk_size]))
+    # The section ends where the next one starts, unless it is the last or is malformed, in which
+    # case it is scanned line by line.
+    end = -1
+    if next_header is not None:
+      end = contents.find(b'\n' + next_header + b':\n', pos - 1) + 1
+    if end <= 0 or contents.count(b'\n', pos, end) != n * lines_per_item:
+      end = pos
+      for _ in range(n * lines_per_item):
+        _, end = self._next_line(contents, end)
+    section = contents[pos:end]
+
+    if ((filter_java_home_anywhere and java_home in section) or
+        (filter_java_home_prefix and b'\n' + java_home in b'\n' + section)):
+      lines = _split_lines(section)
+      kept = []
+      for i in range(0, len(lines), lines_per_item):
+        line = lines[i]
+        drop_line = ((filter_java_home_anywhere and java_home in line) or
+                     (filter_java_home_prefix and line.startswith(java_home)))
+        if not drop_line:
+          kept.extend(lines[i:i + lines_per_item])
+      section = b''.join(kept)
+      n = len(kept) // lines_per_item
+
+    if rebase_pants_home_anywhere or rebase_pants_home_prefix:
+      rebase = rebaser.rebase_anywhere if rebase_pants_home_anywhere else rebaser.rebase_prefix
+      if cls.inline_vals:
+        section = rebase(section)
+      else:
+        # The values are blobs and never need to be rebased, so only the keys are.
+        lines = _split_lines(section)
+        lines[0::2] = _split_lines(rebase(b''.join(lines[0::2])))
+        section = b''.join(lines)
+
+    # Write the rebased section back out.
+    outfile.write(header_line)
+    outfile.write(b'{} items\n'.format(n))
+    outfile.write(section)
+    return end
+
+  @staticmethod
+  def _next_line(contents, pos):
+    """Returns the line that starts at pos in contents, and the position that follows it."""
+    end = contents.find(b'\n', pos) + 1
+    if end == 0:
+      # Mimic iterating over the lines of a file, which callers handle the end of.
+      raise StopIteration()
+    return contents[pos:end], end
 
   def _find_repeated_at_header(self, lines_iter, header):
     header_line = header + b':\n'
@@ -188,3 +218,53 @@ class ZincAnalysisParser(object):
     if not matchobj:
       raise self.ParseError('Expected: "<num> items". Found: "{0}"'.format(line))
     return int(matchobj.group(1))
+
+
+def _to_bytes(s):
+  return s.encode('utf-8') if isinstance(s, six.text_type) else s
+
+
+def _split_lines(block):
+  """Splits a block of newline-terminated lines into a list of lines, keeping the newlines."""
+  return [line + b'\n' for line in block.split(b'\n')[:-1]]
+
+
+class _Rebaser(object):
+  """Replaces the paths in blocks of analysis lines, given a mapping of old base to new base."""
+
+  def __init__(self, rebase_mappings):
+    # Ensure we replace the longest match first, since the shorter one might be prefix of the longer.
+    self._mappings = [(old_base, rebase_mappings[old_base])
+                      for old_base in sorted(rebase_mappings, key=len, reverse=True)]
+    if any(b'\n' in old_base or b'\n' in new_base for old_base, new_base in self._mappings):
+      raise ValueError('Rebase mappings may not contain newlines: {}'.format(rebase_mappings))
+
+    # Only the first matching base of each line may be replaced in prefix mode. Replacing each line
+    # prefix across the whole block in turn has the same effect, unless a new base itself starts
+    # with an old base that is replaced after it, in which case a regex over the block is used.
+    self._prefix_mappings = [(b'\n' + old_base, b'\n' + new_base)
+                             for old_base, new_base in self._mappings]
+    self._prefix_re = None
+    for i, (_, new_base) in enumerate(self._mappings):
+      if any(new_base.startswith(old_base) for old_base, _ in self._mappings[i + 1:]):
+        self._prefix_re = re.compile(
+          b'^(?:{})'.format(b'|'.join(re.escape(old_base) for old_base, _ in self._mappings)),
+          re.MULTILINE)
+        break
+
+  def rebase_anywhere(self, block):
+    """Replaces old bases anywhere in the block."""
+    # Bases never span lines, so this is the same as replacing them line by line.
+    for old_base, new_base in self._mappings:
+      block = block.replace(old_base, new_base)
+    return block
+
+  def rebase_prefix(self, block):
+    """Replaces an old base at the start of each line of the block."""
+    if self._prefix_re:
+      mappings = dict(self._mappings)
+      return self._prefix_re.sub(lambda match: mappings[match.group(0)], block)
+    block = b'\n' + block
+    for old_base, new_base in self._prefix_mappings:
+      block = block.replace(old_base, new_base)
+    return block[1:]
@@ -10,8 +10,6 @@ import os
 import shutil
 from collections import defaultdict
 
-from pathspec import PathSpec
-from pathspec.gitignore import GitIgnorePattern
 from twitter.common.collections.orderedset import OrderedSet
 
 from pants.backend.jvm.subsystems.scala_platform import ScalaPlatform
@@ -23,6 +21,7 @@ from pants.backend.jvm.tasks.nailgun_task import NailgunTask
 from pants.base.build_environment import get_buildroot
 from pants.base.build_file import BuildFile
 from pants.base.exceptions import TaskError
+from pants.base.ignore_path_spec import IgnorePathSpec
 from pants.build_graph.address import BuildFileAddress
 from pants.build_graph.resources import Resources
 from pants.util import desktop
@@ -207,7 +206,7 @@ class IdeGen(IvyTaskMixin, NailgunTask):
                       jvm_targets,
                       not self.intransitive,
                       self.TargetUtil(self.context),
-                      PathSpec.from_lines(GitIgnorePattern, build_ignore_patterns))
+                      IgnorePathSpec.from_gitignore_lines(build_ignore_patterns))
 
     if self.python:
       python_source_paths = self.get_options().python_source_paths
@@ -6,11 +6,12 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import functools
+import json
 import logging
 import os
 import shutil
 import sys
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 
 from pex.fetcher import Fetcher
 from pex.pex import PEX
@@ -27,17 +28,56 @@ from pants.backend.python.targets.python_library import PythonLibrary
 from pants.backend.python.targets.python_requirement_library import PythonRequirementLibrary
 from pants.backend.python.targets.python_tests import PythonTests
 from pants.backend.python.thrift_builder import PythonThriftBuilder
+from pants.base import hash_utils
 from pants.base.build_environment import get_buildroot
 from pants.build_graph.prep_command import PrepCommand
 from pants.build_graph.resources import Resources
 from pants.build_graph.target import Target
 from pants.invalidation.build_invalidator import BuildInvalidator, CacheKeyGenerator
-from pants.util.dirutil import safe_mkdir, safe_mkdtemp, safe_rmtree
+from pants.util.dirutil import (fast_relpath, safe_concurrent_creation, safe_mkdir, safe_mkdtemp,
+                                safe_rmtree, safe_walk)
+from pants.util.objects import datatype
 
 
 logger = logging.getLogger(__name__)
 
 
+class ChrootManifest(datatype('ChrootManifest', ['path', 'sources_key', 'sources',
+                                                 'requirements_fingerprint', 'distributions'])):
+  """Records what a `PythonChroot.dump` placed in a chroot, so that later dumps may reuse it.
+
+  :param string path: The path of the chroot.
+  :param string sources_key: A key for the targets whose sources were dumped into the chroot.
+  :param dict sources: A dict from the chroot relative path of each source and resource to a
+    `(label, content digest)` pair.
+  :param string requirements_fingerprint: A fingerprint of the distributions resolved into the
+    chroot: of their requirements and everything else that affects their resolution if the
+    requirements are all pinned, and also of the resolved distributions themselves if they are not.
+  :param dict distributions: A dict from the name of each resolved distribution to its hash.
+  """
+
+  @classmethod
+  def load(cls, path):
+    """Loads a manifest saved by `save`, returning None if it is missing or unreadable."""
+    try:
+      with open(path, 'rb') as fp:
+        manifest = json.load(fp)
+      return cls(path=manifest['path'],
+                 sources_key=manifest['sources_key'],
+                 sources={relpath: tuple(entry)
+                          for relpath, entry in manifest['sources'].items()},
+                 requirements_fingerprint=manifest['requirements_fingerprint'],
+                 distributions=manifest['distributions'])
+    except (IOError, KeyError, TypeError, ValueError):
+      return None
+
+  def save(self, path):
+    """Atomically saves this manifest to the given path."""
+    with safe_concurrent_creation(path) as tmp_path:
+      with open(tmp_path, 'wb') as fp:
+        json.dump(self._asdict(), fp)
+
+
 class PythonChroot(object):
   _VALID_DEPENDENCIES = {
     PrepCommand: 'prep',
@@ -87,6 +127,12 @@ class PythonChroot(object):
       self._python_setup.artifact_cache_dir, str(self._interpreter.identity))
     self._key_generator = CacheKeyGenerator()
     self._build_invalidator = BuildInvalidator(self._artifact_cache_root)
+    self._manifest = None
+
+  @property
+  def manifest(self):
+    """The `ChrootManifest` recording the results of `dump`, or None if it has not been called."""
+    return self._manifest
 
   def delete(self):
     """Deletes this chroot from disk if it has been dumped."""
@@ -108,32 +154,33 @@ class PythonChroot(object):
     """
     self._builder.build(filename)
 
-  def _dump_library(self, library):
-    def copy_to_chroot(base, path, add_function):
-      src = os.path.join(get_buildroot(), base, path)
-      add_function(src, path)
-
+  def _dump_library(self, library, previous=None):
     self.debug('  Dumping library: {}'.format(library))
     for relpath in library.sources_relative_to_source_root():
-      try:
-        copy_to_chroot(library.target_base, relpath, self._builder.add_source)
-      except OSError:
-        logger.error("Failed to copy {path} for library {library}"
-                     .format(path=os.path.join(library.target_base, relpath),
-                             library=library))
-        raise
+      self._dump_file(library.target_base, relpath, 'source', previous,
+                      owner='library {}'.format(library))
 
     for resources_tgt in library.resources:
       for resource_file_from_source_root in resources_tgt.sources_relative_to_source_root():
-        try:
-          copy_to_chroot(resources_tgt.target_base, resource_file_from_source_root,
-                         self._builder.add_resource)
-        except OSError:
-          logger.error("Failed to copy {path} for resource {resource}"
-                       .format(path=os.path.join(resources_tgt.target_base,
-                                                 resource_file_from_source_root),
-                               resource=resources_tgt.address.spec))
-          raise
+        self._dump_file(resources_tgt.target_base, resource_file_from_source_root, 'resource',
+                        previous, owner='resource {}'.format(resources_tgt.address.spec))
+
+  def _dump_file(self, base, path, label, previous, owner):
+    src = os.path.join(get_buildroot(), base, path)
+    try:
+      digest = hash_utils.hash_file(src)
+      if previous and previous.sources.get(path) == (label, digest):
+        # The file is unchanged since the previous chroot was dumped: link rather than copy it.
+        self._builder.chroot().link(os.path.join(previous.path, path), path, label=label)
+      elif label == 'source':
+        self._builder.add_source(src, path)
+      else:
+        self._builder.add_resource(src, path)
+    except (IOError, OSError):
+      logger.error("Failed to copy {path} for {owner}"
+                   .format(path=os.path.join(base, path), owner=owner))
+      raise
+    self._sources[path] = (label, digest)
 
   def _dump_requirement(self, req):
     self.debug('  Dumping requirement: {}'.format(req))
@@ -142,6 +189,18 @@ class PythonChroot(object):
   def _dump_distribution(self, dist):
     self.debug('  Dumping distribution: .../{}'.format(os.path.basename(dist.location)))
     self._builder.add_distribution(dist)
+    dist_name = os.path.basename(dist.location)
+    self._distributions[dist_name] = self._builder.info.distributions[dist_name]
+
+  def _link_distribution(self, previous, dist_name, dist_hash):
+    self.debug('  Linking distribution: .../{}'.format(dist_name))
+    dist_relpath = os.path.join(self._builder.info.internal_cache, dist_name)
+    for root, _, files in safe_walk(os.path.join(previous.path, dist_relpath)):
+      for f in files:
+        filename = os.path.join(root, f)
+        self._builder.chroot().link(filename, fast_relpath(filename, previous.path))
+    self._builder.info.add_distribution(dist_name, dist_hash)
+    self._distributions[dist_name] = dist_hash
 
   def _generate_requirement(self, library, builder_cls):
     library_key = self._key_generator.key_for_target(library)
@@ -185,13 +244,19 @@ class PythonChroot(object):
       target.walk(add_dep)
     return children
 
-  def dump(self):
+  def dump(self, find_previous=None):
+    """Dumps the sources and requirements of the targets into the chroot.
+
+    :param find_previous: An optional function from a sources key or a requirements fingerprint to
+      the `ChrootManifest` of the last chroot dumped with it, or None. The unchanged sources of the
+      last chroot for the same targets, and the distributions of the last chroot with the same
+      requirements fingerprint, are linked into this chroot rather than being copied and resolved
+      again.
+    :returns: The PEXBuilder for the chroot.
+    """
     self.debug('Building chroot for {}:'.format(self._targets))
     targets = self.resolve(self._targets)
 
-    for lib in targets['libraries'] | targets['binaries']:
-      self._dump_library(lib)
-
     generated_reqs = OrderedSet()
     if targets['thrifts']:
       for thr in targets['thrifts']:
@@ -214,24 +279,100 @@ class PythonChroot(object):
         self.debug('Skipping {} based upon version filter'.format(req))
         continue
       reqs_to_build.add(req)
-      self._dump_requirement(req.requirement)
       if req.repository:
         find_links.add(req.repository)
 
-    distributions = self._resolve_multi(reqs_to_build, find_links)
+    find_previous = find_previous or (lambda key: None)
 
-    locations = set()
-    for platform, dist_set in distributions.items():
-      for dist in dist_set:
-        if dist.location not in locations:
-          self._dump_distribution(dist)
-        locations.add(dist.location)
+    sources_key = self._sources_key()
+    previous_sources = find_previous(sources_key)
+    self._sources = {}
+    for lib in targets['libraries'] | targets['binaries']:
+      self._dump_library(lib, previous_sources)
+
+    for req in reqs_to_build:
+      self._dump_requirement(req.requirement)
+
+    # Requirements that are not pinned may resolve differently over time, and so are resolved anew:
+    # only their distributions are reused, if they resolve to the same ones as before.
+    distributions = None
+    if not all(self._is_pinned(req) for req in reqs_to_build):
+      distributions = self._resolve_distributions(reqs_to_build, find_links)
+    requirements_fingerprint = self._requirements_fingerprint(reqs_to_build, find_links,
+                                                              distributions)
+    previous_requirements = find_previous(requirements_fingerprint)
+    if previous_requirements and not self._has_distributions(previous_requirements):
+      previous_requirements = None
+
+    self._distributions = {}
+    if previous_requirements:
+      for dist_name, dist_hash in previous_requirements.distributions.items():
+        self._link_distribution(previous_requirements, dist_name, dist_hash)
+    else:
+      if distributions is None:
+        distributions = self._resolve_distributions(reqs_to_build, find_links)
+      for dist in distributions:
+        self._dump_distribution(dist)
 
     if len(targets['binaries']) > 1:
       print('WARNING: Target has multiple python_binary targets!', file=sys.stderr)
 
+    self._manifest = ChrootManifest(path=self.path(),
+                                    sources_key=sources_key,
+                                    sources=self._sources,
+                                    requirements_fingerprint=requirements_fingerprint,
+                                    distributions=self._distributions)
     return self._builder
 
+  def _has_distributions(self, manifest):
+    """Returns True if all of the distributions recorded by the manifest are still in its chroot."""
+    return all(os.path.isdir(os.path.join(manifest.path, self._builder.info.internal_cache,
+                                          dist_name))
+               for dist_name in manifest.distributions)
+
+  def _sources_key(self):
+    """Returns a key for the targets whose sources are dumped, whatever their current contents."""
+    return hash_utils.hash_all(['sources'] + sorted(target.address.spec
+                                                    for target in self._targets))
+
+  @staticmethod
+  def _is_pinned(req):
+    """Returns True if the given requirement can only be satisfied by one exact version."""
+    specs = req.requirement.specs
+    return (len(specs) == 1 and specs[0][0] in ('==', '===') and '*' not in specs[0][1])
+
+  def _requirements_fingerprint(self, requirements, find_links, distributions=None):
+    """Fingerprints everything that determines the distributions the requirements resolve to.
+
+    :param distributions: The distributions that the requirements resolved to, if they have been
+      resolved.
+    """
+    platforms = self.get_platforms(self._platforms or self._python_setup.platforms)
+    fingerprint_components = ['requirements', str(self._interpreter.identity)]
+    fingerprint_components.extend(sorted(str(platform) for platform in platforms))
+    fingerprint_components.extend(self._python_repos.repos)
+    fingerprint_components.extend(self._python_repos.indexes)
+    fingerprint_components.extend(find_links)
+    fingerprint_components.extend([self._python_setup.resolver_cache_dir,
+                                   str(self._python_setup.resolver_cache_ttl),
+                                   self._python_setup.setuptools_version,
+                                   self._python_setup.wheel_version])
+    fingerprint_components.extend(sorted('{}@{}'.format(req.cache_key(), req.repository or '')
+                                         for req in requirements))
+    if distributions is not None:
+      # The name of a distribution includes its version.
+      fingerprint_components.extend(sorted(os.path.basename(dist.location)
+                                           for dist in distributions))
+    return hash_utils.hash_all(fingerprint_components)
+
+  def _resolve_distributions(self, requirements, find_links):
+    """Returns the distributions that the requirements resolve to on any platform, once each."""
+    distributions = OrderedDict()
+    for platform, dist_set in self._resolve_multi(requirements, find_links).items():
+      for dist in dist_set:
+        distributions.setdefault(dist.location, dist)
+    return distributions.values()
+
   def _resolve_multi(self, requirements, find_links):
     """Multi-platform dependency resolution for PEX files.
 
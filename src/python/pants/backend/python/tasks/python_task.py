@@ -15,7 +15,7 @@ from pex.pex_builder import PEXBuilder
 from pex.pex_info import PexInfo
 
 from pants.backend.python.interpreter_cache import PythonInterpreterCache
-from pants.backend.python.python_chroot import PythonChroot
+from pants.backend.python.python_chroot import ChrootManifest, PythonChroot
 from pants.backend.python.python_setup import PythonRepos, PythonSetup
 from pants.base import hash_utils
 from pants.binaries.thrift_binary import ThriftBinary
@@ -109,9 +109,11 @@ class PythonTask(Task):
                              executable_file_content)
     if not os.path.exists(path):
       path_tmp = path + '.tmp'
-      self._build_chroot(path_tmp, interpreter, pex_info, targets, platforms,
-                         extra_requirements, executable_file_content)
+      chroot = self._build_chroot(path_tmp, interpreter, pex_info, targets, platforms,
+                                  extra_requirements, executable_file_content,
+                                  find_previous=self._find_previous_chroot)
       shutil.move(path_tmp, path)
+      self._save_chroot_manifest(chroot.manifest._replace(path=path))
 
     # We must read the PexInfo that was frozen into the pex, so we get the modifications
     # created when that pex was built.
@@ -135,7 +137,7 @@ class PythonTask(Task):
     chroot.delete()
 
   def _build_chroot(self, path, interpreter, pex_info, targets, platforms,
-                     extra_requirements=None, executable_file_content=None):
+                     extra_requirements=None, executable_file_content=None, find_previous=None):
     """Create a PythonChroot with the specified args."""
     builder = PEXBuilder(path=path, interpreter=interpreter, pex_info=pex_info, copy=True)
     with self.context.new_workunit('chroot'):
@@ -145,7 +147,7 @@ class PythonTask(Task):
         targets=targets,
         platforms=platforms,
         extra_requirements=extra_requirements)
-      chroot.dump()
+      chroot.dump(find_previous=find_previous)
       if executable_file_content is not None:
         with open(os.path.join(path, '{}.py'.format(self.CHROOT_EXECUTABLE_NAME)), 'w') as outfile:
           outfile.write(executable_file_content)
@@ -156,6 +158,27 @@ class PythonTask(Task):
       builder.freeze()
     return chroot
 
+  def _chroot_manifest_path(self, key):
+    return os.path.join(self.chroot_cache_dir, '.manifests', key)
+
+  def _find_previous_chroot(self, key):
+    """Returns the manifest of the last cached chroot with the given sources or requirements key.
+
+    Chroots are cached by the fingerprint of their whole target closure, so any change to a source
+    file requires a new chroot. But resolving requirements is the bulk of the cost of building one,
+    and most sources are usually unchanged: a new chroot links in the unchanged sources of the last
+    chroot for the same targets, and the distributions of the last chroot that resolved the same
+    requirements, rather than copying and resolving them again.
+    """
+    manifest = ChrootManifest.load(self._chroot_manifest_path(key))
+    if manifest and os.path.isdir(manifest.path):
+      return manifest
+    return None
+
+  def _save_chroot_manifest(self, manifest):
+    manifest.save(self._chroot_manifest_path(manifest.sources_key))
+    manifest.save(self._chroot_manifest_path(manifest.requirements_fingerprint))
+
   def _chroot_path(self, interpreter, pex_info, targets, platforms, extra_requirements,
                    executable_file_content):
     """Pick a unique, well-known directory name for the chroot with the specified parameters.
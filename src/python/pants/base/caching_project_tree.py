@@ -0,0 +1,181 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import logging
+import os
+import threading
+
+from pants.base.project_tree import ProjectTree
+
+
+logger = logging.getLogger(__name__)
+
+
+class CachingProjectTree(ProjectTree):
+  """A ProjectTree that memoizes the stats, listings and ignore matches of another ProjectTree.
+
+  Legacy build graph construction asks the same questions of the project tree many times over:
+  whether a path is a directory or a file, what a directory contains, and whether a path is
+  ignored. This decorator answers each of them from the underlying tree once, and then from memory
+  until `invalidate` is called for an affected path. File contents are not cached.
+
+  Walks are memoized a directory at a time, so a walk that is pruned by its caller only reads the
+  directories that it actually visits.
+  """
+
+  def __init__(self, delegate):
+    """
+    :param ProjectTree delegate: The ProjectTree to cache the results of.
+    """
+    super(CachingProjectTree, self).__init__(delegate.build_root)
+    self.ignore = delegate.ignore
+    self._delegate = delegate
+    self._lock = threading.RLock()
+    self._init_caches()
+
+  def _init_caches(self):
+    # Results keyed by (method name, args), where the first arg is always a path; and walk listings
+    # keyed by directory.
+    self._results = {}
+    self._walk_listings = {}
+    self._ignored = {}
+
+  @property
+  def delegate(self):
+    """The underlying ProjectTree."""
+    return self._delegate
+
+  def invalidate(self, filenames):
+    """Drops cached results that may have been affected by changes to the given paths.
+
+    :param filenames: Changed paths, relative to the build root.
+    """
+    affected = set()
+    for filename in filenames:
+      path = os.path.normpath(filename)
+      # A change to a path may change its own type and existence, as well as its parent's listing.
+      affected.update((path, os.path.normpath(os.path.dirname(path))))
+
+    with self._lock:
+      for key in [key for key in self._results if os.path.normpath(key[1][0]) in affected]:
+        del self._results[key]
+      # Walks are replayed directory by directory, so only the affected listings need dropping.
+      for relpath in [relpath for relpath in self._walk_listings
+                      if os.path.normpath(relpath) in affected]:
+        del self._walk_listings[relpath]
+
+  def invalidate_all(self):
+    """Drops all cached results."""
+    with self._lock:
+      self._init_caches()
+
+  def _cached(self, method, *args):
+    key = (method, args)
+    try:
+      return self._results[key]
+    except KeyError:
+      result = getattr(self._delegate, method)(*args)
+      if method in ('_scandir_raw', '_glob1_raw'):
+        result = tuple(result)
+      with self._lock:
+        self._results[key] = result
+      return result
+
+  def _glob1_raw(self, dir_relpath, glob):
+    return list(self._cached('_glob1_raw', dir_relpath, glob))
+
+  def _scandir_raw(self, relpath):
+    return iter(self._cached('_scandir_raw', relpath))
+
+  def _isdir_raw(self, relpath):
+    return self._cached('_isdir_raw', relpath)
+
+  def _isfile_raw(self, relpath):
+    return self._cached('_isfile_raw', relpath)
+
+  def _exists_raw(self, relpath):
+    return self._cached('_exists_raw', relpath)
+
+  def _content_raw(self, file_relpath):
+    return self._delegate._content_raw(file_relpath)
+
+  def _relative_readlink_raw(self, relpath):
+    return self._cached('_relative_readlink_raw', relpath)
+
+  def isignored(self, relpath, directory=False):
+    relpath = self._relpath_no_dot(relpath)
+    if directory:
+      relpath = self._append_trailing_slash(relpath)
+    return self._path_ignored(relpath)
+
+  def _filter_ignored(self, entries, selector=None):
+    selector = selector or (lambda x: x)
+    return [entry for entry in entries
+            if not self._path_ignored(self._append_slash_if_dir_path(selector(entry)))]
+
+  def _path_ignored(self, path):
+    # Ignore patterns are fixed for the life of the tree, so matches are never invalidated.
+    try:
+      return self._ignored[path]
+    except KeyError:
+      result = self._ignored[path] = self.ignore.match_file(path)
+      return result
+
+  def walk(self, relpath, topdown=True):
+    for root, dirs, files in self._walk_raw(relpath, topdown):
+      dirs[:] = [d for d in dirs
+                 if not self._path_ignored(os.path.join(root, self._append_trailing_slash(d)))]
+      files[:] = [f for f in files if not self._path_ignored(os.path.join(root, f))]
+      yield root, dirs, files
+
+  def _walk_listing(self, relpath):
+    try:
+      return self._walk_listings[relpath]
+    except KeyError:
+      listing = self._delegate._walk_listing_raw(relpath)
+      with self._lock:
+        self._walk_listings[relpath] = listing
+      return listing
+
+  def _walk_raw(self, relpath, topdown=True):
+    listing = self._walk_listing(relpath)
+    if listing is None:
+      return
+    root, dirs, files, descended = listing
+    dirs, files = list(dirs), list(files)
+
+    if topdown:
+      yield root, dirs, files
+    for dirname in dirs:
+      if dirname in descended:
+        for item in self._walk_raw(os.path.join(relpath, dirname), topdown=topdown):
+          yield item
+    if not topdown:
+      yield root, dirs, files
+
+  def __getstate__(self):
+    state = self.__dict__.copy()
+    for transient in ('_lock', '_results', '_walk_listings', '_ignored'):
+      state.pop(transient)
+    return state
+
+  def __setstate__(self, state):
+    self.__dict__.update(state)
+    self._lock = threading.RLock()
+    self._init_caches()
+
+  def __eq__(self, other):
+    return type(other) == type(self) and self._delegate == other._delegate
+
+  def __ne__(self, other):
+    return not self.__eq__(other)
+
+  def __hash__(self):
+    return hash(self._delegate)
+
+  def __repr__(self):
+    return '{}({!r})'.format(self.__class__.__name__, self._delegate)
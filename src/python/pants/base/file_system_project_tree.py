@@ -75,6 +75,14 @@ class FileSystemProjectTree(ProjectTree):
                                        onerror=onerror):
       yield fast_relpath(root, self.build_root), dirs, files
 
+  def _walk_listing_raw(self, relpath):
+    for root, dirs, files in self._walk_raw(relpath, topdown=True):
+      # Like `os.walk`, `_walk_raw` does not descend into links to directories.
+      descended = frozenset(d for d in dirs
+                            if not os.path.islink(self._join(os.path.join(root, d))))
+      return root, tuple(dirs), tuple(files), descended
+    return None
+
   def __eq__(self, other):
     return other and (type(other) == type(self)) and (self.build_root == other.build_root)
 
@@ -0,0 +1,98 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import re
+from collections import defaultdict
+
+from pathspec import PathSpec
+from pathspec.gitignore import GitIgnorePattern
+from pathspec.util import normalize_files
+
+
+# Matches the regex that GitIgnorePattern compiles for a pattern that is anchored at the root and
+# whose first path component is a literal, capturing the (escaped) literal.
+_ANCHORED_LITERAL_RE = re.compile(r'^\^((?:[^\\^$.|?*+()\[\]{}/]|\\.)+)(?:/|\(\?:/|\$)')
+_ESCAPE_RE = re.compile(r'\\(.)')
+
+
+class IgnorePathSpec(PathSpec):
+  """A PathSpec that matches paths against all of its patterns at once.
+
+  `PathSpec.match_files` tries every pattern's regex against every path in turn. This subclass
+  instead compiles the patterns into a few combined regexes, matched by the regex engine in a
+  single call per path:
+
+  - Consecutive patterns with the same polarity (ignore vs. `!` re-include) are combined, since
+    the last matching pattern decides whether a path is matched, and only the last matching run
+    of patterns needs to be found.
+  - Within a run, patterns anchored at a literal first directory (such as `/dist/` or
+    `build-support/*.venv/`) are only tried against paths below that directory.
+
+  Matches are exactly those of the equivalent `PathSpec`.
+  """
+
+  @classmethod
+  def from_gitignore_lines(cls, lines):
+    """Compiles gitignore-style pattern lines.
+
+    :param lines: An iterable of gitignore pattern strings.
+    :rtype: :class:`IgnorePathSpec`
+    """
+    return cls.from_lines(GitIgnorePattern, lines or [])
+
+  def __init__(self, patterns):
+    super(IgnorePathSpec, self).__init__(patterns)
+    self._runs = self._compile_runs(self.patterns)
+
+  @staticmethod
+  def _combine(regexes):
+    if not regexes:
+      return None
+    return re.compile('|'.join('(?:{})'.format(regex.pattern) for regex in regexes)).match
+
+  @classmethod
+  def _compile_runs(cls, patterns):
+    """Returns a list of (include, match_unindexed, match_by_first_component) runs, last first."""
+    runs = []
+    for pattern in patterns:
+      if pattern.include is None:
+        continue
+      if not runs or runs[-1][0] != pattern.include:
+        runs.append((pattern.include, [], defaultdict(list)))
+      _, unindexed, by_first_component = runs[-1]
+      anchored_literal = _ANCHORED_LITERAL_RE.match(pattern.regex.pattern)
+      if anchored_literal and not pattern.regex.flags & ~re.UNICODE:
+        by_first_component[_ESCAPE_RE.sub(r'\1', anchored_literal.group(1))].append(pattern.regex)
+      else:
+        unindexed.append(pattern.regex)
+
+    return [(include,
+             cls._combine(run_unindexed),
+             {first: cls._combine(regexes) for first, regexes in run_by_first_component.items()})
+            for include, run_unindexed, run_by_first_component in reversed(runs)]
+
+  def match_file(self, path):
+    """Returns True if the given normalized (`/`-separated) path is matched by this spec.
+
+    :param string path: A path relative to the root of the spec.
+    :rtype: bool
+    """
+    first_component = path.split('/', 1)[0]
+    for include, match_unindexed, match_by_first_component in self._runs:
+      if match_unindexed and match_unindexed(path):
+        return include
+      match_indexed = match_by_first_component.get(first_component)
+      if match_indexed and match_indexed(path):
+        return include
+    return False
+
+  def match_files(self, files, separators=None):
+    """Matches the files to this spec, with the same semantics as `PathSpec.match_files`."""
+    file_map = normalize_files(files, separators=separators)
+    for path, original in file_map.items():
+      if self.match_file(path):
+        yield original
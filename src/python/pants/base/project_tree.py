@@ -10,9 +10,8 @@ import os
 from abc import abstractmethod, abstractproperty
 
 import six
-from pathspec.gitignore import GitIgnorePattern
-from pathspec.pathspec import PathSpec
 
+from pants.base.ignore_path_spec import IgnorePathSpec
 from pants.util.dirutil import fast_relpath
 from pants.util.meta import AbstractClass
 from pants.util.objects import datatype
@@ -38,7 +37,7 @@ class ProjectTree(AbstractClass):
           'ProjectTree build_root {} must be an absolute path.'.format(build_root))
     self.build_root = os.path.realpath(build_root)
     logger.debug('ProjectTree ignore_patterns: %s', ignore_patterns)
-    self.ignore = PathSpec.from_lines(GitIgnorePattern, ignore_patterns if ignore_patterns else [])
+    self.ignore = IgnorePathSpec.from_gitignore_lines(ignore_patterns)
 
   @abstractmethod
   def _glob1_raw(self, dir_relpath, glob):
@@ -75,6 +74,26 @@ class ProjectTree(AbstractClass):
     Works like os.walk but returned root value is relative path.
     """
 
+  def _walk_listing_raw(self, relpath):
+    """Returns the first entry that `_walk_raw` yields for a directory, without walking below it.
+
+    :returns: A tuple of the (root, dirs, files) yielded for relpath, and the set of dirs that
+              `_walk_raw` would descend into; or None if `_walk_raw` yields nothing for relpath.
+    """
+    listing = None
+    walk = self._walk_raw(relpath, topdown=True)
+    try:
+      for root, dirs, files in walk:
+        if listing is None:
+          listing = (root, tuple(dirs), tuple(files), set())
+        else:
+          # This is a subdirectory that the walk descended into: record it, but go no deeper.
+          listing[3].add(os.path.basename(root))
+          del dirs[:]
+    finally:
+      walk.close()
+    return listing if listing is None else listing[:3] + (frozenset(listing[3]),)
+
   def glob1(self, dir_relpath, glob):
     """Returns a list of paths in path that match glob and are not ignored."""
     if self.isignored(dir_relpath, directory=True):
@@ -164,8 +183,7 @@ class ProjectTree(AbstractClass):
     relpath = self._relpath_no_dot(relpath)
     if directory:
       relpath = self._append_trailing_slash(relpath)
-    # TODO: Use match_file instead when pathspec 0.4.1 (TBD) is released.
-    return any(True for _ in self.ignore.match_files([relpath]))
+    return self.ignore.match_file(relpath)
 
   def _filter_ignored(self, entries, selector=None):
     """Given an opaque entry list, filter any ignored entries.
@@ -5,17 +5,46 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import os
+
 from pants.base.build_environment import get_buildroot, get_scm
+from pants.base.caching_project_tree import CachingProjectTree
 from pants.base.file_system_project_tree import FileSystemProjectTree
 from pants.base.scm_project_tree import ScmProjectTree
 from pants.util.memo import memoized
 
 
+# The caching filesystem tree of the daemon, if any, as a tuple of (build root, ignore patterns,
+# tree).
+_CACHING_PROJECT_TREE = None
+
+
 @memoized
 def get_project_tree(options):
   """Creates the project tree for build files for use in a given pants run."""
   pants_ignore = options.pants_ignore or []
   if options.build_file_rev:
     return ScmProjectTree(get_buildroot(), get_scm(), options.build_file_rev, pants_ignore)
-  else:
-    return FileSystemProjectTree(get_buildroot(), pants_ignore)
+  if _CACHING_PROJECT_TREE:
+    build_root, ignore_patterns, project_tree = _CACHING_PROJECT_TREE
+    if build_root == os.path.realpath(get_buildroot()) and ignore_patterns == tuple(pants_ignore):
+      return project_tree
+  return FileSystemProjectTree(get_buildroot(), pants_ignore)
+
+
+def create_caching_project_tree(build_root, pants_ignore):
+  """Creates a filesystem project tree that caches stats and listings across pants runs.
+
+  The tree is returned by `get_project_tree` for runs in this process, and in processes forked from
+  it, that have the same build root and ignore patterns. It is only valid for as long as its owner
+  passes every changed path to its `invalidate` method, as the pantsd SchedulerService does with
+  filesystem events.
+
+  :param string build_root: The build root of the tree.
+  :param list pants_ignore: The ignore patterns of the tree.
+  :returns: A `CachingProjectTree`.
+  """
+  global _CACHING_PROJECT_TREE
+  project_tree = CachingProjectTree(FileSystemProjectTree(build_root, pants_ignore))
+  _CACHING_PROJECT_TREE = (os.path.realpath(build_root), tuple(pants_ignore), project_tree)
+  return project_tree
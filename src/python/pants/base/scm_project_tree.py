@@ -73,9 +73,17 @@ class ScmProjectTree(ProjectTree):
       raise IOError('Unsupported file type in {}: {}'.format(self, relpath))
 
   def _walk_raw(self, relpath, topdown=True):
+    # Read every tree below the walk root up front, in batches, rather than one at a time.
+    self._reader.prefetch(self._scm_relpath(relpath))
     for path, dirnames, filenames in self._do_walk(self._scm_relpath(relpath), topdown=topdown):
       yield fast_relpath(os.path.join(self._scm_worktree, path), self.build_root), dirnames, filenames
 
+  def _walk_listing_raw(self, relpath):
+    for root, dirs, files in self._walk_raw(relpath, topdown=True):
+      # Unlike `os.walk`, `_do_walk` descends into links to directories.
+      return root, tuple(dirs), tuple(files), frozenset(dirs)
+    return None
+
   def _do_walk(self, scm_relpath, topdown):
     """
     Helper method for _walk, works similarly to os.walk.
@@ -15,6 +15,7 @@ from setproctitle import setproctitle as set_process_title
 
 from pants.bin.exiter import Exiter
 from pants.bin.local_pants_runner import LocalPantsRunner
+from pants.bin.options_initializer import OptionsInitializer
 from pants.java.nailgun_io import NailgunStreamWriter
 from pants.java.nailgun_protocol import ChunkType, NailgunProtocol
 from pants.pantsd.process_manager import ProcessManager
@@ -62,7 +63,8 @@ class DaemonPantsRunner(ProcessManager):
   N.B. this class is primarily used by the PailgunService in pantsd.
   """
 
-  def __init__(self, socket, exiter, args, env, graph_helper, deferred_exception=None):
+  def __init__(self, socket, exiter, args, env, graph_helper, deferred_exception=None,
+               build_configuration_fingerprint=None):
     """
     :param socket socket: A connected socket capable of speaking the nailgun protocol.
     :param Exiter exiter: The Exiter instance for this run.
@@ -73,6 +75,10 @@ class DaemonPantsRunner(ProcessManager):
                                            None.
     :param Exception deferred_exception: A deferred exception from the daemon's graph construction.
                                          If present, this will be re-raised in the client context.
+    :param string build_configuration_fingerprint: The fingerprint of the backends, plugins and
+                                                   goals that the daemon loaded for this run, or
+                                                   None. They are reused post-fork if they are
+                                                   still the loaded ones when the run forks.
     """
     super(DaemonPantsRunner, self).__init__(name=self._make_identity())
     self._socket = socket
@@ -81,6 +87,8 @@ class DaemonPantsRunner(ProcessManager):
     self._env = env
     self._graph_helper = graph_helper
     self._deferred_exception = deferred_exception
+    self._build_configuration_fingerprint = build_configuration_fingerprint
+    self._reuse_build_configuration = False
 
   def _make_identity(self):
     """Generate a ProcessManager identity for a given pants run.
@@ -128,6 +136,13 @@ class DaemonPantsRunner(ProcessManager):
 
   def run(self):
     """Fork, daemonize and invoke self.post_fork_child() (via ProcessManager)."""
+    # N.B. This is invoked under the pailgun context lock, which excludes reloads of the daemon's
+    # backends and plugins by other requests, so the state checked here is what the child inherits.
+    self._reuse_build_configuration = (
+      self._build_configuration_fingerprint is not None and
+      self._build_configuration_fingerprint ==
+        OptionsInitializer.loaded_build_configuration_fingerprint()
+    )
     self.daemonize(write_pid=False)
 
   def post_fork_child(self):
@@ -148,8 +163,9 @@ class DaemonPantsRunner(ProcessManager):
     # Invoke a Pants run with stdio redirected.
     with self._nailgunned_stdio(self._socket):
       try:
-        # Clean global state.
-        clean_global_runtime_state(reset_subsystem=True)
+        # Clean global state, retaining the daemon's loaded backends and plugins if they match.
+        clean_global_runtime_state(reset_subsystem=True,
+                                   reset_build_configuration=not self._reuse_build_configuration)
 
         # Re-raise any deferred exceptions, if present.
         self._raise_deferred_exc()
@@ -103,7 +103,9 @@ class EngineInitializer(object):
                          native=None,
                          symbol_table_cls=None,
                          build_ignore_patterns=None,
-                         exclude_target_regexps=None):
+                         exclude_target_regexps=None,
+                         rule_graph_cache_dir=None,
+                         use_glob_index=False):
     """Construct and return the components necessary for LegacyBuildGraph construction.
 
     :param list pants_ignore_patterns: A list of path ignore patterns for FileSystemProjectTree,
@@ -115,6 +117,9 @@ class EngineInitializer(object):
     :param list build_ignore_patterns: A list of paths ignore patterns used when searching for BUILD
                                        files, usually taken from the '--build-ignore' global option.
     :param list exclude_target_regexps: A list of regular expressions for excluding targets.
+    :param str rule_graph_cache_dir: A directory in which to record validated rule graphs, or None
+                                     to validate the rule graph on every construction.
+    :param bool use_glob_index: True to expand PathGlobs using a GlobIndex of directory listings.
     :returns: A tuple of (scheduler, engine, symbol_table_cls, build_graph_cls).
     """
 
@@ -143,7 +148,9 @@ class EngineInitializer(object):
     )
 
     # TODO: Do not use the cache yet, as it incurs a high overhead.
-    scheduler = LocalScheduler(dict(), tasks, project_tree, native)
+    scheduler = LocalScheduler(dict(), tasks, project_tree, native,
+                               rule_graph_cache_dir=rule_graph_cache_dir,
+                               use_glob_index=use_glob_index)
     engine = LocalSerialEngine(scheduler, use_cache=False)
     change_calculator = EngineChangeCalculator(engine, scm) if scm else None
 
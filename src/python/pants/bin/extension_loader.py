@@ -13,6 +13,7 @@ from twitter.common.collections import OrderedSet
 
 from pants.base.exceptions import BackendConfigurationError
 from pants.build_graph.build_configuration import BuildConfiguration
+from pants.util.contextutil import Timer
 
 
 class PluginLoadingError(Exception): pass
@@ -24,21 +25,24 @@ class PluginNotFound(PluginLoadingError): pass
 class PluginLoadOrderError(PluginLoadingError): pass
 
 
-def load_backends_and_plugins(plugins, working_set, backends, build_configuration=None):
+def load_backends_and_plugins(plugins, working_set, backends, build_configuration=None,
+                              timings=None):
   """Load named plugins and source backends
 
   :param list<str> plugins: Plugins to load (see `load_plugins`).  Plugins are loaded after
     backends.
   :param WorkingSet working_set: A pkg_resources.WorkingSet to load plugins from.
   :param list<str> backends: Source backends to load (see `load_build_configuration_from_source`).
+  :param dict timings: An optional dict to record the seconds taken to load each backend and
+    plugin in.
   """
   build_configuration = build_configuration or BuildConfiguration()
-  load_build_configuration_from_source(build_configuration, backends)
-  load_plugins(build_configuration, plugins or [], working_set)
+  load_build_configuration_from_source(build_configuration, backends, timings=timings)
+  load_plugins(build_configuration, plugins or [], working_set, timings=timings)
   return build_configuration
 
 
-def load_plugins(build_configuration, plugins, working_set):
+def load_plugins(build_configuration, plugins, working_set, timings=None):
   """Load named plugins from the current working_set into the supplied build_configuration
 
   "Loading" a plugin here refers to calling registration methods -- it is assumed each plugin
@@ -61,43 +65,53 @@ def load_plugins(build_configuration, plugins, working_set):
   :param list<str> plugins: A list of plugin names optionally with versions, in requirement format.
                             eg ['widgetpublish', 'widgetgen==1.2'].
   :param WorkingSet working_set: A pkg_resources.WorkingSet to load plugins from.
+  :param dict timings: An optional dict to record the seconds taken to load each plugin in.
   """
   loaded = {}
   for plugin in plugins:
-    req = Requirement.parse(plugin)
-    dist = working_set.find(req)
+    with Timer() as timer:
+      dist = _load_plugin(build_configuration, plugin, working_set, loaded)
+    loaded[dist.as_requirement().key] = dist
+    if timings is not None:
+      timings['load plugin {}'.format(plugin)] = timer.elapsed
 
-    if not dist:
-      raise PluginNotFound('Could not find plugin: {}'.format(req))
 
-    entries = dist.get_entry_map().get('pantsbuild.plugin', {})
+def _load_plugin(build_configuration, plugin, working_set, loaded):
+  req = Requirement.parse(plugin)
+  dist = working_set.find(req)
 
-    if 'load_after' in entries:
-      deps = entries['load_after'].load()()
-      for dep_name in deps:
-        dep = Requirement.parse(dep_name)
-        if dep.key not in loaded:
-          raise PluginLoadOrderError('Plugin {0} must be loaded after {1}'.format(plugin, dep))
+  if not dist:
+    raise PluginNotFound('Could not find plugin: {}'.format(req))
 
-    if 'build_file_aliases' in entries:
-      aliases = entries['build_file_aliases'].load()()
-      build_configuration.register_aliases(aliases)
+  entries = dist.get_entry_map().get('pantsbuild.plugin', {})
 
-    if 'register_goals' in entries:
-      entries['register_goals'].load()()
+  if 'load_after' in entries:
+    deps = entries['load_after'].load()()
+    for dep_name in deps:
+      dep = Requirement.parse(dep_name)
+      if dep.key not in loaded:
+        raise PluginLoadOrderError('Plugin {0} must be loaded after {1}'.format(plugin, dep))
 
-    if 'global_subsystems' in entries:
-      subsystems = entries['global_subsystems'].load()()
-      build_configuration.register_subsystems(subsystems)
+  if 'build_file_aliases' in entries:
+    aliases = entries['build_file_aliases'].load()()
+    build_configuration.register_aliases(aliases)
 
-    loaded[dist.as_requirement().key] = dist
+  if 'register_goals' in entries:
+    entries['register_goals'].load()()
+
+  if 'global_subsystems' in entries:
+    subsystems = entries['global_subsystems'].load()()
+    build_configuration.register_subsystems(subsystems)
+
+  return dist
 
 
-def load_build_configuration_from_source(build_configuration, backends=None):
+def load_build_configuration_from_source(build_configuration, backends=None, timings=None):
   """Installs pants backend packages to provide BUILD file symbols and cli goals.
 
   :param BuildConfiguration build_configuration: The BuildConfiguration (for adding aliases).
   :param backends: An optional list of additional packages to load backends from.
+  :param dict timings: An optional dict to record the seconds taken to load each backend in.
   :raises: :class:``pants.base.exceptions.BuildConfigurationError`` if there is a problem loading
     the build configuration.
   """
@@ -106,7 +120,10 @@ def load_build_configuration_from_source(build_configuration, backends=None):
   # pants.core_tasks aren't really backends.
   backend_packages = OrderedSet(['pants.build_graph', 'pants.core_tasks'] + (backends or []))
   for backend_package in backend_packages:
-    load_backend(build_configuration, backend_package)
+    with Timer() as timer:
+      load_backend(build_configuration, backend_package)
+    if timings is not None:
+      timings['load backend {}'.format(backend_package)] = timer.elapsed
 
 
 def load_backend(build_configuration, backend_package):
@@ -6,6 +6,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import logging
+import os
 import sys
 
 from pants.base.cmd_line_spec_parser import CmdLineSpecParser
@@ -94,7 +95,10 @@ class GoalRunnerFactory(object):
       graph_helper = graph_helper or EngineInitializer.setup_legacy_graph(
         pants_ignore_patterns,
         build_ignore_patterns=build_ignore_patterns,
-        exclude_target_regexps=exclude_target_regexps)
+        exclude_target_regexps=exclude_target_regexps,
+        rule_graph_cache_dir=os.path.join(self._global_options.pants_workdir,
+                                          'engine',
+                                          'rule_graphs'))
       target_roots = TargetRoots.create(options=self._options,
                                         build_root=self._root_dir,
                                         change_calculator=graph_helper.change_calculator)
@@ -40,9 +40,13 @@ class LocalPantsRunner(object):
     # Bootstrap options and logging.
     options_bootstrapper = self._options_bootstrapper or OptionsBootstrapper(env=self._env,
                                                                              args=self._args)
-    options, build_config = OptionsInitializer(options_bootstrapper, exiter=self._exiter).setup()
+    options_initializer = OptionsInitializer(options_bootstrapper, exiter=self._exiter)
+    options, build_config = options_initializer.setup()
     global_options = options.for_global_scope()
 
+    if global_options.startup_profile:
+      options_initializer.report_startup_profile()
+
     # Apply exiter options.
     self._exiter.apply_options(options)
 
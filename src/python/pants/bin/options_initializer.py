@@ -5,19 +5,23 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import json
 import logging
 import sys
+from collections import OrderedDict
 
 import pkg_resources
 
 from pants.base.build_environment import pants_version
 from pants.base.exceptions import BuildConfigurationError
+from pants.base.hash_utils import hash_all
 from pants.bin.extension_loader import load_backends_and_plugins
 from pants.bin.plugin_resolver import PluginResolver
 from pants.goal.goal import Goal
 from pants.logging.setup import setup_logging
 from pants.option.global_options import GlobalOptionsRegistrar
 from pants.subsystem.subsystem import Subsystem
+from pants.util.contextutil import Timer
 
 
 logger = logging.getLogger(__name__)
@@ -31,8 +35,10 @@ class OptionsInitializer(object):
   plugin loading, which can be expensive and cause issues (double task registration, etc).
   """
 
-  # Class-level cache for the `BuildConfiguration` object.
+  # Class-level cache for the `BuildConfiguration` object, and the fingerprint of the bootstrap
+  # options it was loaded for.
   _build_configuration = None
+  _build_configuration_fingerprint = None
 
   def __init__(self, options_bootstrapper, working_set=None, exiter=sys.exit):
     """
@@ -42,7 +48,13 @@ class OptionsInitializer(object):
     :param func exiter: A function that accepts an exit code value and exits (for tests).
     """
     self._options_bootstrapper = options_bootstrapper
-    self._working_set = working_set or PluginResolver(self._options_bootstrapper).resolve()
+    # The seconds spent in each phase of startup, for `--startup-profile`.
+    self._timings = OrderedDict()
+    if working_set is None:
+      with Timer() as timer:
+        working_set = PluginResolver(self._options_bootstrapper).resolve()
+      self._timings['resolve plugins'] = timer.elapsed
+    self._working_set = working_set
     self._exiter = exiter
 
   @classmethod
@@ -54,13 +66,33 @@ class OptionsInitializer(object):
     return cls._build_configuration
 
   @classmethod
-  def _set_build_configuration(cls, build_configuration):
+  def _set_build_configuration(cls, build_configuration, fingerprint=None):
     cls._build_configuration = build_configuration
+    cls._build_configuration_fingerprint = fingerprint
+
+  @classmethod
+  def loaded_build_configuration_fingerprint(cls):
+    """Returns the fingerprint of the currently loaded `BuildConfiguration`, or None."""
+    return cls._build_configuration_fingerprint
 
   @classmethod
   def reset(cls):
     cls._set_build_configuration(None)
 
+  def build_configuration_fingerprint(self):
+    """Returns a fingerprint of the inputs to backend/plugin loading for this run.
+
+    Two runs with equal fingerprints load identical `BuildConfiguration`s and register identical
+    goals, so a process that has loaded one may reuse it for the other.
+    """
+    global_bootstrap_options = self._options_bootstrapper.get_bootstrap_options().for_global_scope()
+    return hash_all([
+      json.dumps(global_bootstrap_options.pythonpath),
+      json.dumps(global_bootstrap_options.plugins),
+      json.dumps(global_bootstrap_options.backend_packages),
+      json.dumps(sorted(str(dist) for dist in self._working_set)),
+    ])
+
   def _setup_logging(self, quiet, level, log_dir):
     """Initializes logging."""
     # N.B. quiet help says 'Squelches all console output apart from errors'.
@@ -79,16 +111,25 @@ class OptionsInitializer(object):
         pkg_resources.fixup_namespace_packages(path)
 
     # Load plugins and backends.
-    return load_backends_and_plugins(plugins, working_set, backend_packages)
+    return load_backends_and_plugins(plugins, working_set, backend_packages, timings=self._timings)
+
+  def report_startup_profile(self):
+    """Prints the time spent in each phase of startup to stderr."""
+    lines = ['Startup profile:']
+    for phase, elapsed in self._timings.items():
+      lines.append('  {:.3f}s {}'.format(elapsed, phase))
+    lines.append('  {:.3f}s total'.format(sum(self._timings.values())))
+    print('\n'.join(lines), file=sys.stderr)
 
   def _register_options(self, subsystems, options):
     """Registers global options."""
     # Standalone global options.
     GlobalOptionsRegistrar.register_options_on_scope(options)
 
-    # Options for subsystems.
+    # Options for subsystems and tasks are registered on first use of their scopes, so that runs
+    # only pay for the scopes they touch.
     for subsystem in subsystems:
-      subsystem.register_options_on_scope(options)
+      options.register_lazily(subsystem)
 
     # TODO(benjy): Should Goals or the entire goal-running mechanism be a Subsystem?
     for goal in Goal.all():
@@ -119,8 +160,12 @@ class OptionsInitializer(object):
       known_scope_infos.extend(filter(None, goal.known_scope_infos()))
 
     # Now that we have the known scopes we can get the full options.
-    options = options_bootstrapper.get_full_options(known_scope_infos)
-    self._register_options(subsystems, options)
+    with Timer() as timer:
+      options = options_bootstrapper.get_full_options(known_scope_infos)
+    self._timings['parse options'] = timer.elapsed
+    with Timer() as timer:
+      self._register_options(subsystems, options)
+    self._timings['register options for {} scopes'.format(len(known_scope_infos))] = timer.elapsed
 
     # Make the options values available to all subsystems.
     Subsystem.set_options(options)
@@ -153,7 +198,7 @@ class OptionsInitializer(object):
                                                global_bootstrap_options.pythonpath,
                                                global_bootstrap_options.plugins,
                                                global_bootstrap_options.backend_packages)
-      self._set_build_configuration(build_configuration)
+      self._set_build_configuration(build_configuration, self.build_configuration_fingerprint())
     else:
       build_configuration = self._get_build_configuration()
 
@@ -8,6 +8,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import hashlib
 import logging
 import os
+import time
 
 from pex import resolver
 from pex.base import requirement_is_exact
@@ -55,28 +56,46 @@ class PluginResolver(object):
     # Even with a local resolve cache fully up to date, running a resolve to activate a plugin
     # takes ~250ms whereas loading from a pre-cached list takes ~50ms.
     if all(requirement_is_exact(Requirement.parse(req)) for req in self._plugin_requirements):
-      return self._resolve_exact_plugin_locations()
+      return self._resolve_cached_plugin_locations(sorted(self._plugin_requirements))
     else:
-      return (plugin.location for plugin in self._resolve_plugins())
-
-  def _resolve_exact_plugin_locations(self):
+      # Inexact requirements may resolve differently as new distributions are published, so their
+      # cached resolves are keyed by the repos consulted and expire with the resolver cache.
+      key = (['inexact'] + sorted(self._plugin_requirements) +
+             ['repo:{}'.format(repo) for repo in self._python_repos.repos] +
+             ['index:{}'.format(index) for index in self._python_repos.indexes])
+      return self._resolve_cached_plugin_locations(key, ttl=self._python_setup.resolver_cache_ttl)
+
+  def _resolve_cached_plugin_locations(self, key, ttl=None):
     hasher = hashlib.sha1()
-    for req in sorted(self._plugin_requirements):
-      hasher.update(req)
+    for entry in key:
+      hasher.update(entry)
     resolve_hash = hasher.hexdigest()
     resolved_plugins_list = os.path.join(self.plugin_cache_dir,
                                          'plugins-{}.txt'.format(resolve_hash))
 
-    if not os.path.exists(resolved_plugins_list):
-      tmp_plugins_list = resolved_plugins_list + '~'
-      with safe_open(tmp_plugins_list, 'w') as fp:
-        for plugin in self._resolve_plugins():
-          fp.write(plugin.location)
-          fp.write('\n')
-      os.rename(tmp_plugins_list, resolved_plugins_list)
-    with open(resolved_plugins_list) as fp:
-      for plugin_location in fp:
-        yield plugin_location.strip()
+    if self._is_fresh(resolved_plugins_list, ttl):
+      with open(resolved_plugins_list) as fp:
+        plugin_locations = [plugin_location.strip() for plugin_location in fp]
+      # Inexact resolves may have been satisfied by distributions since pruned from the cache.
+      if ttl is None or all(os.path.exists(location) for location in plugin_locations):
+        return plugin_locations
+
+    plugin_locations = [plugin.location for plugin in self._resolve_plugins()]
+    tmp_plugins_list = resolved_plugins_list + '~'
+    with safe_open(tmp_plugins_list, 'w') as fp:
+      for plugin_location in plugin_locations:
+        fp.write(plugin_location)
+        fp.write('\n')
+    os.rename(tmp_plugins_list, resolved_plugins_list)
+    return plugin_locations
+
+  @staticmethod
+  def _is_fresh(path, ttl):
+    try:
+      mtime = os.path.getmtime(path)
+    except OSError:
+      return False
+    return ttl is None or time.time() - mtime < ttl
 
   def _resolve_plugins(self):
     # When bootstrapping plugins without the full pants python backend machinery in-play, we are not
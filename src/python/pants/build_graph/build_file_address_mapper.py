@@ -12,12 +12,11 @@ import traceback
 from collections import defaultdict
 
 import six
-from pathspec import PathSpec
-from pathspec.gitignore import GitIgnorePattern
 from twitter.common.collections import OrderedSet
 
 from pants.base.build_environment import get_buildroot
 from pants.base.build_file import BuildFile
+from pants.base.ignore_path_spec import IgnorePathSpec
 from pants.base.specs import DescendantAddresses, SiblingAddresses, SingleAddress
 from pants.build_graph.address import Address, parse_spec
 from pants.build_graph.address_lookup_error import AddressLookupError
@@ -56,7 +55,7 @@ class BuildFileAddressMapper(AddressMapper):
     self._build_file_parser = build_file_parser
     self._spec_path_to_address_map_map = {}  # {spec_path: {address: addressable}} mapping
     self._project_tree = project_tree
-    self._build_ignore_patterns = PathSpec.from_lines(GitIgnorePattern, build_ignore_patterns or [])
+    self._build_ignore_patterns = IgnorePathSpec.from_gitignore_lines(build_ignore_patterns)
 
     self._exclude_target_regexps = exclude_target_regexps or []
     self._exclude_patterns = [re.compile(pattern) for pattern in self._exclude_target_regexps]
@@ -47,8 +47,7 @@ def filter_buildfile_paths(address_mapper, directory_listing):
 
   build_pattern = address_mapper.build_pattern
   def match(stat):
-    # TODO: Use match_file instead when pathspec 0.4.1 (TBD) is released.
-    ignored = any(True for _ in address_mapper.build_ignore_patterns.match_files([stat.path]))
+    ignored = address_mapper.build_ignore_patterns.match_file(stat.path)
     return (not ignored) and type(stat) is File and fnmatch(basename(stat.path), build_pattern)
   build_files = tuple(Path(stat.path, stat)
                       for stat in directory_listing.dependencies if match(stat))
@@ -0,0 +1,169 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import logging
+import re
+import threading
+from collections import OrderedDict, defaultdict, deque
+from fnmatch import translate
+from os.path import basename, dirname, join, normpath
+
+from twitter.common.collections import OrderedSet
+
+from pants.base.project_tree import Dir, Link
+from pants.engine.fs import (Path, PathGlob, PathGlobs, PathRoot, Paths, PathWildcard,
+                             scan_directory)
+from pants.util.contextutil import Timer
+
+
+logger = logging.getLogger(__name__)
+
+
+class GlobIndex(object):
+  """An index of the directory listings below a ProjectTree, used to expand PathGlobs directly.
+
+  By default the engine expands a PathGlobs via one graph node per directory and wildcard that it
+  visits, filtering each directory listing against one wildcard at a time. For recursive globs over
+  deep trees those nodes dominate the product graph. When installed as the intrinsic for
+  `PathGlobs -> Paths`, this index instead expands all of the wildcards in a PathGlobs in a single
+  walk that visits each directory listing once, and produces the same `Paths` as the node-based
+  expansion would.
+
+  Listings are memoized until they are invalidated via `invalidate`, which pantsd calls (via the
+  scheduler) for every batch of filesystem events it receives. Invalidation reports the PathGlobs
+  whose expansions depended on the dropped listings, so that the scheduler can invalidate them
+  in the product graph as well.
+  """
+
+  def __init__(self, project_tree):
+    """
+    :param project_tree: An instance of ProjectTree for the current build root.
+    """
+    self._project_tree = project_tree
+    self._lock = threading.RLock()
+    # Listings and link destinations by path, and the PathGlobs that consumed them.
+    self._listings = {}
+    self._links = {}
+    self._dependents = defaultdict(set)
+    self._matchers = {}
+    # Statistics.
+    self._expansion_count = 0
+    self._expansion_time = 0.0
+
+  def expand(self, path_globs):
+    """Expands the given PathGlobs into Paths.
+
+    :param PathGlobs path_globs: The globs to expand.
+    :rtype: :class:`pants.engine.fs.Paths`
+    """
+    with self._lock:
+      with Timer() as timer:
+        paths = self._expand(path_globs, path_globs, frozenset())
+      self._expansion_count += 1
+      self._expansion_time += timer.elapsed
+      return paths
+
+  def invalidate(self, filenames):
+    """Drops the index entries that may have been affected by changes to the given paths.
+
+    :param filenames: Changed paths relative to the build root.
+    :returns: The set of PathGlobs whose expansions depended on the dropped entries.
+    """
+    invalidated = set()
+    with self._lock:
+      for filename in filenames:
+        path = normpath(filename)
+        # A changed path may itself be a directory or a link, and its creation or deletion changes
+        # the listing of its parent.
+        for affected in (path, dirname(path)):
+          self._listings.pop(affected, None)
+          self._links.pop(affected, None)
+          invalidated.update(self._dependents.pop(affected, ()))
+    logger.debug('glob index invalidated %d expansions', len(invalidated))
+    return invalidated
+
+  def stats(self):
+    """Returns a dict of statistics about the expansions performed by this index."""
+    with self._lock:
+      return {
+        'expansions': self._expansion_count,
+        'expansion_seconds': self._expansion_time,
+        'indexed_directories': len(self._listings),
+      }
+
+  def _matcher(self, wildcard):
+    matcher = self._matchers.get(wildcard)
+    if matcher is None:
+      matcher = self._matchers[wildcard] = re.compile(translate(wildcard)).match
+    return matcher
+
+  def _listing(self, directory, root):
+    # Any path that was consulted during an expansion is recorded, so that changes to it can be
+    # mapped back to the affected PathGlobs.
+    self._dependents[directory.path].add(root)
+    listing = self._listings.get(directory.path)
+    if listing is None:
+      listing = self._listings[directory.path] = scan_directory(self._project_tree,
+                                                                directory).dependencies
+    return listing
+
+  def _readlink(self, link, root):
+    self._dependents[link.path].add(root)
+    destination = self._links.get(link.path)
+    if destination is None:
+      destination = self._links[link.path] = self._project_tree.readlink(link.path)
+    return destination
+
+  def _resolve_dir_link(self, link, root, resolving):
+    """Returns the Dir that the given Link (transitively) points to, or None."""
+    if link.path in resolving:
+      return None
+    resolving = resolving | {link.path}
+    destination = PathGlobs.create_from_specs('', [self._readlink(link, root)])
+    for path in self._expand(destination, root, resolving).dependencies:
+      if type(path.stat) is Dir:
+        return path.stat
+      elif type(path.stat) is Link:
+        return self._resolve_dir_link(path.stat, root, resolving)
+    return None
+
+  def _expand(self, path_globs, root, resolving):
+    merged = OrderedSet()
+    pending = deque(path_globs.dependencies)
+    while pending:
+      # Group the pending globs by the directory they are relative to, so that each listing is
+      # scanned once for all of the wildcards that apply to it.
+      by_directory = OrderedDict()
+      while pending:
+        path_glob = pending.popleft()
+        if type(path_glob) is PathRoot:
+          merged.update(path_glob.paths.dependencies)
+        else:
+          by_directory.setdefault(path_glob.canonical_stat, []).append(path_glob)
+
+      for directory, directory_globs in by_directory.items():
+        matchers = [(self._matcher(g.wildcard), g) for g in directory_globs]
+        for stat in self._listing(directory, root):
+          name = basename(stat.path)
+          for matches, path_glob in matchers:
+            if not matches(name):
+              continue
+            if type(path_glob) is PathWildcard:
+              merged.add(Path(normpath(join(path_glob.symbolic_path, name)), stat))
+              continue
+            # A PathDirWildcard: recurse into matching directories, including linked directories.
+            if type(stat) is Link:
+              canonical_dir = self._resolve_dir_link(stat, root, resolving)
+            elif type(stat) is Dir:
+              canonical_dir = stat
+            else:
+              canonical_dir = None
+            if canonical_dir is not None:
+              pending.extend(PathGlob.create_from_spec(canonical_dir,
+                                                       join(path_glob.symbolic_path, name),
+                                                       path_glob.remainder))
+    return Paths(tuple(merged))
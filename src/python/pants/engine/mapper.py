@@ -9,9 +9,7 @@ import os
 import re
 from collections import OrderedDict
 
-from pathspec import PathSpec
-from pathspec.gitignore import GitIgnorePattern
-
+from pants.base.ignore_path_spec import IgnorePathSpec
 from pants.build_graph.address import Address
 from pants.engine.objects import Serializable
 from pants.util.memo import memoized_property
@@ -199,7 +197,7 @@ class AddressMapper(object):
     self.parser_cls = parser_cls
     self.build_pattern = build_pattern or 'BUILD*'
 
-    self.build_ignore_patterns = PathSpec.from_lines(GitIgnorePattern, build_ignore_patterns or [])
+    self.build_ignore_patterns = IgnorePathSpec.from_gitignore_lines(build_ignore_patterns)
     self._exclude_target_regexps = exclude_target_regexps or []
     self.exclude_patterns = [re.compile(pattern) for pattern in self._exclude_target_regexps]
 
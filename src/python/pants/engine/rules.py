@@ -5,17 +5,21 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import inspect
 import logging
+import os
 from abc import abstractproperty
 from collections import OrderedDict, defaultdict, deque
 from textwrap import dedent
 
 from twitter.common.collections import OrderedSet
 
+from pants.base.hash_utils import hash_all, hash_file
 from pants.engine.addressable import Exactly
 from pants.engine.isolated_process import SnapshottedProcess, SnapshottedProcessRequest
 from pants.engine.selectors import (Select, SelectDependencies, SelectLiteral, SelectProjection,
                                     SelectVariant, type_or_constraint_repr)
+from pants.util.dirutil import safe_mkdir, touch
 from pants.util.meta import AbstractClass
 from pants.util.objects import datatype
 
@@ -110,6 +114,76 @@ class RulesetValidator(object):
           'no task for product used by goal "{}": {}'.format(goal, goal_product.__name__))
 
 
+class RulesetValidationCache(object):
+  """Records the fingerprints of rule sets that have already passed validation.
+
+  Validating a rule set requires constructing the full RuleGraph, which is expensive for large
+  rule sets and is otherwise repeated by every pants process that constructs a scheduler. The
+  outcome of validation depends only on the declared rules, the sources of their functions, the
+  goals and the root subject types, so a successful validation is recorded on disk under a
+  fingerprint of those inputs and skipped when the same fingerprint is seen again.
+  """
+
+  def __init__(self, cache_dir):
+    """
+    :param string cache_dir: A directory in which to record validated fingerprints.
+    """
+    self._cache_dir = cache_dir
+
+  @staticmethod
+  def _type_repr(typ):
+    if isinstance(typ, type):
+      return '{}.{}'.format(typ.__module__, typ.__name__)
+    return repr(typ)
+
+  @staticmethod
+  def _source_file(func):
+    # Unwrap `functools.partial` and bound methods to find the function that was declared.
+    func = getattr(func, 'func', func)
+    func = getattr(func, '__func__', func)
+    try:
+      return inspect.getsourcefile(func)
+    except TypeError:
+      return None
+
+  def fingerprint(self, rule_index, goal_to_product, root_subject_fns):
+    """Returns a fingerprint of the given rule set and the sources of its functions.
+
+    :param RuleIndex rule_index: The indexed rules to fingerprint.
+    :param dict goal_to_product: A dict from goal name to product type.
+    :param dict root_subject_fns: A dict from root subject types to selector factories.
+    :returns: A hex digest string.
+    """
+    source_digests = {}
+
+    def source_digest(func):
+      path = self._source_file(func)
+      if path is None or not os.path.isfile(path):
+        return ''
+      if path not in source_digests:
+        source_digests[path] = hash_file(path)
+      return source_digests[path]
+
+    rule_strs = sorted('{}:{}'.format(rule, source_digest(rule.func))
+                       for rule in rule_index.all_rules())
+    goal_strs = sorted('{}={}'.format(goal, self._type_repr(product))
+                       for goal, product in goal_to_product.items())
+    root_strs = sorted(self._type_repr(subject_type) for subject_type in root_subject_fns)
+    return hash_all(s.encode('utf-8') for s in rule_strs + goal_strs + root_strs)
+
+  def _marker(self, fingerprint):
+    return os.path.join(self._cache_dir, fingerprint)
+
+  def is_validated(self, fingerprint):
+    """Returns True if a rule set with the given fingerprint was previously validated."""
+    return os.path.exists(self._marker(fingerprint))
+
+  def mark_validated(self, fingerprint):
+    """Records that the rule set with the given fingerprint has passed validation."""
+    safe_mkdir(self._cache_dir)
+    touch(self._marker(fingerprint))
+
+
 class SingletonRule(datatype('SingletonRule', ['product_type', 'func']), Rule):
   """A default rule for a product, which is thus a singleton for that product."""
 
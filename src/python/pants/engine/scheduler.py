@@ -9,21 +9,23 @@ import logging
 import os
 import threading
 import time
+from collections import OrderedDict
 from contextlib import contextmanager
 
 from pants.base.specs import (AscendantAddresses, DescendantAddresses, SiblingAddresses,
                               SingleAddress)
 from pants.build_graph.address import Address
 from pants.engine.addressable import SubclassesOf
-from pants.engine.fs import PathGlobs, create_fs_intrinsics, generate_fs_subjects
+from pants.engine.fs import PathGlobs, Paths, create_fs_intrinsics, generate_fs_subjects
+from pants.engine.glob_index import GlobIndex
 from pants.engine.isolated_process import create_snapshot_intrinsics, create_snapshot_singletons
 from pants.engine.nodes import Return, Throw
-from pants.engine.rules import RuleIndex, RulesetValidator
+from pants.engine.rules import RuleIndex, RulesetValidationCache, RulesetValidator
 from pants.engine.selectors import (Select, SelectDependencies, SelectLiteral, SelectProjection,
                                     SelectVariant, constraint_for)
 from pants.engine.struct import HasProducts, Variants
 from pants.engine.subsystem.native import Function, TypeConstraint, TypeId
-from pants.util.contextutil import temporary_file_path
+from pants.util.contextutil import Timer, temporary_file_path
 from pants.util.objects import datatype
 
 
@@ -49,7 +51,9 @@ class LocalScheduler(object):
                tasks,
                project_tree,
                native,
-               graph_lock=None):
+               graph_lock=None,
+               rule_graph_cache_dir=None,
+               use_glob_index=False):
     """
     :param goals: A dict from a goal name to a product type. A goal is just an alias for a
            particular (possibly synthetic) product.
@@ -59,20 +63,29 @@ class LocalScheduler(object):
     :param native: An instance of engine.subsystem.native.Native.
     :param graph_lock: A re-entrant lock to use for guarding access to the internal product Graph
                        instance. Defaults to creating a new threading.RLock().
+    :param rule_graph_cache_dir: An optional directory in which to record the fingerprints of rule
+                                 sets that have passed validation, allowing validation to be
+                                 skipped by later processes that construct an identical scheduler.
+    :param use_glob_index: True to expand PathGlobs via a GlobIndex of directory listings (which
+                           is maintained by `invalidate_files`), rather than via one graph node per
+                           directory visited.
     """
     self._products_by_goal = goals
     self._project_tree = project_tree
     self._native = native
     self._product_graph_lock = graph_lock or threading.RLock()
     self._run_count = 0
+    self._construction_timings = OrderedDict()
+    self._glob_index = GlobIndex(project_tree) if use_glob_index else None
 
     # TODO: The only (?) case where we use inheritance rather than exact type unions.
     has_products_constraint = SubclassesOf(HasProducts)
 
     # Create the ExternContext, and the native Scheduler.
-    self._scheduler = native.new_scheduler(has_products_constraint,
-                                           constraint_for(Address),
-                                           constraint_for(Variants))
+    with self._timed('native_scheduler_create'):
+      self._scheduler = native.new_scheduler(has_products_constraint,
+                                             constraint_for(Address),
+                                             constraint_for(Variants))
     self._execution_request = None
 
     # Validate and register all provided and intrinsic tasks.
@@ -88,13 +101,50 @@ class LocalScheduler(object):
       SiblingAddresses: select_product,
       SingleAddress: select_product,
     }
-    intrinsics = create_fs_intrinsics(project_tree) + create_snapshot_intrinsics(project_tree)
-    singletons = create_snapshot_singletons(project_tree)
-    rule_index = RuleIndex.create(tasks, intrinsics, singletons)
-    RulesetValidator(rule_index, goals, root_selector_fns).validate()
-    self._register_tasks(rule_index.tasks)
-    self._register_intrinsics(rule_index.intrinsics)
-    self._register_singletons(rule_index.singletons)
+    with self._timed('rule_index_create'):
+      intrinsics = create_fs_intrinsics(project_tree) + create_snapshot_intrinsics(project_tree)
+      if self._glob_index:
+        intrinsics.append((Paths, PathGlobs, self._glob_index.expand))
+      singletons = create_snapshot_singletons(project_tree)
+      rule_index = RuleIndex.create(tasks, intrinsics, singletons)
+    self._validate(rule_index, goals, root_selector_fns, rule_graph_cache_dir)
+    with self._timed('rule_registration'):
+      self._register_tasks(rule_index.tasks)
+      self._register_intrinsics(rule_index.intrinsics)
+      self._register_singletons(rule_index.singletons)
+
+    logger.debug('constructed scheduler in %f seconds: %s',
+                 sum(self._construction_timings.values()),
+                 ', '.join('{}={:f}'.format(phase, elapsed)
+                           for phase, elapsed in self._construction_timings.items()))
+
+  @contextmanager
+  def _timed(self, phase):
+    with Timer() as timer:
+      yield
+    self._construction_timings[phase] = timer.elapsed
+
+  @property
+  def construction_timings(self):
+    """Returns an ordered dict of construction phase name to elapsed seconds for this scheduler."""
+    return self._construction_timings
+
+  def _validate(self, rule_index, goals, root_selector_fns, rule_graph_cache_dir):
+    """Validates the rule index, skipping validation of rule sets recorded as already valid."""
+    if rule_graph_cache_dir is None:
+      with self._timed('rule_graph_validate'):
+        RulesetValidator(rule_index, goals, root_selector_fns).validate()
+      return
+
+    cache = RulesetValidationCache(rule_graph_cache_dir)
+    with self._timed('rule_graph_fingerprint'):
+      fingerprint = cache.fingerprint(rule_index, goals, root_selector_fns)
+    if cache.is_validated(fingerprint):
+      logger.debug('skipping validation of previously validated rule graph %s', fingerprint)
+      return
+    with self._timed('rule_graph_validate'):
+      RulesetValidator(rule_index, goals, root_selector_fns).validate()
+    cache.mark_validated(fingerprint)
 
   def _to_value(self, obj):
     return self._native.context.to_value(obj)
@@ -144,8 +194,17 @@ class LocalScheduler(object):
   def _register_tasks(self, tasks):
     """Register the given tasks dict with the native scheduler."""
     registered = set()
+    # Many selectors share product types, so convert each type to a constraint only once.
+    constraints = {}
+
+    def to_constraint(type_or_constraint):
+      constraint = constraints.get(type_or_constraint)
+      if constraint is None:
+        constraint = constraints[type_or_constraint] = self._to_constraint(type_or_constraint)
+      return constraint
+
     for output_type, rules in tasks.items():
-      output_constraint = self._to_constraint(output_type)
+      output_constraint = to_constraint(output_type)
       for rule in rules:
         # TODO: The task map has heterogeneous keys, so we normalize them to type constraints
         # and dedupe them before registering to the native engine:
@@ -159,7 +218,7 @@ class LocalScheduler(object):
         self._native.lib.task_add(self._scheduler, Function(self._to_id(func)), output_constraint)
         for selector in input_selects:
           selector_type = type(selector)
-          product_constraint = self._to_constraint(selector.product)
+          product_constraint = to_constraint(selector.product)
           if selector_type is Select:
             self._native.lib.task_add_select(self._scheduler,
                                              product_constraint)
@@ -176,7 +235,7 @@ class LocalScheduler(object):
           elif selector_type is SelectDependencies:
             self._native.lib.task_add_select_dependencies(self._scheduler,
                                                           product_constraint,
-                                                          self._to_constraint(selector.dep_product),
+                                                          to_constraint(selector.dep_product),
                                                           self._to_key(selector.field),
                                                           selector.transitive)
           elif selector_type is SelectProjection:
@@ -184,10 +243,10 @@ class LocalScheduler(object):
               raise ValueError("TODO: remove support for projecting multiple fields at once.")
             field = selector.fields[0]
             self._native.lib.task_add_select_projection(self._scheduler,
-                                                        self._to_constraint(selector.product),
+                                                        to_constraint(selector.product),
                                                         TypeId(self._to_id(selector.projected_subject)),
                                                         self._to_key(field),
-                                                        self._to_constraint(selector.input_product))
+                                                        to_constraint(selector.input_product))
           else:
             raise ValueError('Unrecognized Selector type: {}'.format(selector))
         self._native.lib.task_end(self._scheduler)
@@ -285,8 +344,10 @@ class LocalScheduler(object):
   def invalidate_files(self, filenames):
     """Calls `Graph.invalidate_files()` against an internal product Graph instance."""
     subjects = set(generate_fs_subjects(filenames))
-    subject_keys = list(self._to_key(subject) for subject in subjects)
     with self._product_graph_lock:
+      if self._glob_index:
+        subjects.update(self._glob_index.invalidate(filenames))
+      subject_keys = list(self._to_key(subject) for subject in subjects)
       invalidated = self._native.lib.graph_invalidate(self._scheduler,
                                                       subject_keys,
                                                       len(subject_keys))
@@ -347,3 +408,5 @@ class LocalScheduler(object):
         time.time() - start_time,
         self._native.lib.graph_len(self._scheduler)
       )
+      if self._glob_index:
+        logger.debug('glob index stats: %s', self._glob_index.stats())
@@ -121,8 +121,9 @@ class _Goal(object):
     return ''
 
   def register_options(self, options):
+    """Registers the options of this goal's tasks, deferred until each task's scope is used."""
     for task_type in sorted(self.task_types(), key=lambda cls: cls.options_scope):
-      task_type.register_options_on_scope(options)
+      options.register_lazily(task_type)
 
   def install(self, task_registrar, first=False, replace=False, before=None, after=None):
     """Installs the given task in this goal.
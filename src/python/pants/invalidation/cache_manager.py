@@ -182,8 +182,7 @@ class VersionedTarget(VersionedTargetSet):
     task_version = self._cache_manager.task_version
     # TODO: Shorten cache_key hashes in general?
     return os.path.join(
-        root_dir,
-        sha1(task_version).hexdigest()[:12],
+        InvalidationCacheManager.results_dir_root(root_dir, task_version),
         key.id,
         self._STABLE_DIR_NAME if stable else sha1(key.hash).hexdigest()[:12]
     )
@@ -320,6 +319,15 @@ class InvalidationCacheManager(object):
   def task_version(self):
     return self._task_version
 
+  @staticmethod
+  def results_dir_root(root_dir, task_version):
+    """Returns the dir under root_dir that holds the results dirs of a version of a task.
+
+    :param string root_dir: The dir that results dirs are created under.
+    :param string task_version: The implementation version of the task.
+    """
+    return os.path.join(root_dir, sha1(task_version).hexdigest()[:12])
+
   def wrap_targets(self, targets, topological_order=False):
     """Wrap targets and their computed cache keys in VersionedTargets.
 
@@ -5,7 +5,9 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import hashlib
 import itertools
+import json
 import logging
 import os
 import pkgutil
@@ -21,6 +23,7 @@ from pants.base.revision import Revision
 from pants.java.util import execute_java, execute_java_async
 from pants.subsystem.subsystem import Subsystem
 from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_concurrent_creation, safe_mkdir
 from pants.util.memo import memoized_method, memoized_property
 from pants.util.meta import AbstractClass
 from pants.util.osutil import OS_ALIASES, normalize_os_name
@@ -45,6 +48,74 @@ def _parse_java_version(name, version):
   return version
 
 
+class SystemPropertiesCache(object):
+  """A persistent cache of the system properties reported by java binaries.
+
+  Discovering a distribution's version and home requires launching its `java` binary, and locating
+  a distribution may validate several candidates in turn. This cache stores the properties of each
+  binary on disk, keyed by its real path, so that they are shared by all pants runs using the same
+  cache dir. An entry is only used while the binary's size, modification time and inode are those
+  it had when the entry was written; otherwise the binary is launched again.
+
+  Entries are written atomically, so concurrent runs may safely share a cache dir.
+  """
+
+  def __init__(self, cache_dir):
+    """
+    :param string cache_dir: The directory to store cache entries in.
+    """
+    self._cache_dir = cache_dir
+
+  @property
+  def cache_dir(self):
+    return self._cache_dir
+
+  def _entry_path(self, real_java):
+    return os.path.join(self._cache_dir,
+                        '{}.json'.format(hashlib.sha1(real_java.encode('utf-8')).hexdigest()))
+
+  @staticmethod
+  def _stamp(real_java):
+    stat = os.stat(real_java)
+    return [stat.st_size, stat.st_mtime, stat.st_ino]
+
+  def get(self, java):
+    """Returns the cached system properties of the given java binary.
+
+    :param string java: The path to a java binary.
+    :returns: The system properties, or None if there is no up to date entry for the binary.
+    :rtype: dict
+    """
+    real_java = os.path.realpath(java)
+    try:
+      stamp = self._stamp(real_java)
+      with open(self._entry_path(real_java), 'rb') as fp:
+        entry = json.load(fp)
+      if entry['java'] == real_java and entry['stamp'] == stamp:
+        return entry['properties']
+    except (IOError, OSError, KeyError, TypeError, ValueError):
+      pass
+    return None
+
+  def put(self, java, properties):
+    """Stores the system properties of the given java binary.
+
+    Failures to write the entry are logged and otherwise ignored.
+
+    :param string java: The path to a java binary.
+    :param dict properties: The system properties the binary reported.
+    """
+    real_java = os.path.realpath(java)
+    try:
+      entry = dict(java=real_java, stamp=self._stamp(real_java), properties=properties)
+      safe_mkdir(self._cache_dir)
+      with safe_concurrent_creation(self._entry_path(real_java)) as tmp_path:
+        with open(tmp_path, 'wb') as fp:
+          json.dump(entry, fp)
+    except (IOError, OSError) as e:
+      logger.debug('Failed to cache the system properties of {}: {}'.format(java, e))
+
+
 class Distribution(object):
   """Represents a java distribution - either a JRE or a JDK installed on the local system.
 
@@ -66,7 +137,7 @@ class Distribution(object):
     return os.path.isfile(path) and os.access(path, os.X_OK)
 
   def __init__(self, home_path=None, bin_path=None, minimum_version=None, maximum_version=None,
-               jdk=False):
+               jdk=False, system_properties_cache=None):
     """Creates a distribution wrapping the given `home_path` or `bin_path`.
 
     Only one of `home_path` or `bin_path` should be supplied.
@@ -76,6 +147,8 @@ class Distribution(object):
     :param minimum_version: a modified semantic version string or else a Revision object
     :param maximum_version: a modified semantic version string or else a Revision object
     :param bool jdk: ``True`` to require the distribution be a JDK vs a JRE
+    :param system_properties_cache: an optional persistent cache of java system properties
+    :type system_properties_cache: :class:`SystemPropertiesCache`
     """
     if home_path and not os.path.isdir(home_path):
       raise ValueError('The specified java home path is invalid: {}'.format(home_path))
@@ -93,6 +166,7 @@ class Distribution(object):
     self._jdk = jdk
     self._is_jdk = False
     self._system_properties = None
+    self._system_properties_cache = system_properties_cache
     self._validated_binaries = {}
 
   @property
@@ -233,24 +307,34 @@ class Distribution(object):
 
   def _get_system_properties(self, java):
     if not self._system_properties:
-      with temporary_dir() as classpath:
-        with open(os.path.join(classpath, 'SystemProperties.class'), 'w+') as fp:
-          fp.write(pkgutil.get_data(__name__, 'SystemProperties.class'))
-        cmd = [java, '-cp', classpath, 'SystemProperties']
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        stdout, stderr = process.communicate()
-        if process.returncode != 0:
-          raise self.Error('Failed to determine java system properties for {} with {} - exit code'
-                           ' {}: {}'.format(java, ' '.join(cmd), process.returncode, stderr))
-
-      props = {}
-      for line in stdout.split(os.linesep):
-        key, _, val = line.partition('=')
-        props[key] = val
+      props = None
+      if self._system_properties_cache:
+        props = self._system_properties_cache.get(java)
+      if props is None:
+        props = self._launch_system_properties(java)
+        if self._system_properties_cache:
+          self._system_properties_cache.put(java, props)
       self._system_properties = props
 
     return self._system_properties
 
+  def _launch_system_properties(self, java):
+    with temporary_dir() as classpath:
+      with open(os.path.join(classpath, 'SystemProperties.class'), 'w+') as fp:
+        fp.write(pkgutil.get_data(__name__, 'SystemProperties.class'))
+      cmd = [java, '-cp', classpath, 'SystemProperties']
+      process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+      stdout, stderr = process.communicate()
+      if process.returncode != 0:
+        raise self.Error('Failed to determine java system properties for {} with {} - exit code'
+                         ' {}: {}'.format(java, ' '.join(cmd), process.returncode, stderr))
+
+    props = {}
+    for line in stdout.split(os.linesep):
+      key, _, val = line.partition('=')
+      props[key] = val
+    return props
+
   def _validate_executable(self, name):
     def bin_paths():
       yield self._bin_path
@@ -426,11 +510,13 @@ class _Locator(object):
   class Error(Distribution.Error):
     """Error locating a java distribution."""
 
-  def __init__(self, distribution_environment, minimum_version=None, maximum_version=None):
+  def __init__(self, distribution_environment, minimum_version=None, maximum_version=None,
+               system_properties_cache=None):
     self._cache = {}
     self._distribution_environment = distribution_environment
     self._minimum_version = minimum_version
     self._maximum_version = maximum_version
+    self._system_properties_cache = system_properties_cache
 
   def _scan_constraint_match(self, minimum_version, maximum_version, jdk):
     """Finds a cached version matching the specified constraints
@@ -511,7 +597,8 @@ class _Locator(object):
                             bin_path=location.bin_path,
                             minimum_version=minimum_version,
                             maximum_version=maximum_version,
-                            jdk=jdk)
+                            jdk=jdk,
+                            system_properties_cache=self._system_properties_cache)
         dist.validate()
         logger.debug('Located {} for constraints: minimum_version {}, maximum_version {}, jdk {}'
                      .format(dist, minimum_version, maximum_version, jdk))
@@ -589,6 +676,11 @@ class DistributionLocator(Subsystem):
                   'aliases, according to this map: {}'.format(human_readable_os_aliases))
     register('--minimum-version', advanced=True, help='Minimum version of the JVM pants will use')
     register('--maximum-version', advanced=True, help='Maximum version of the JVM pants will use')
+    register('--system-properties-cache-dir', advanced=True,
+             default=os.path.join(register.bootstrap.pants_bootstrapdir, 'jvm-distributions'),
+             help='Cache the system properties of the java binaries of discovered distributions '
+                  'in this dir, so that they are only launched again when they change. An empty '
+                  'value disables the cache.')
 
   def all_jdk_paths(self):
     """Get all explicitly configured JDK paths.
@@ -634,6 +726,8 @@ class DistributionLocator(Subsystem):
             _OSXEnvironment.standard()
         )
     )
+    cache_dir = self.get_options().system_properties_cache_dir
     return _Locator(environment,
                     self.get_options().minimum_version,
-                    self.get_options().maximum_version)
+                    self.get_options().maximum_version,
+                    system_properties_cache=SystemPropertiesCache(cache_dir) if cache_dir else None)
@@ -13,6 +13,7 @@ import sys
 
 from pants.java.nailgun_io import NailgunStreamReader
 from pants.java.nailgun_protocol import ChunkType, NailgunProtocol
+from pants.util.contextutil import Timer
 from pants.util.socket import RecvBufferedSocket
 
 
@@ -104,6 +105,8 @@ class NailgunClient(object):
     self._stderr = err or sys.stderr
     self._workdir = workdir or os.path.abspath(os.path.curdir)
     self._session = None
+    # The seconds spent connecting to the server for the most recent command.
+    self.last_connect_seconds = None
 
   def try_connect(self):
     """Creates a socket, connects it to the nailgun and returns the connected socket.
@@ -140,7 +143,9 @@ class NailgunClient(object):
     cwd = cwd or self._workdir
 
     # N.B. This can throw NailgunConnectionError (catchable via NailgunError).
-    sock = self.try_connect()
+    with Timer() as connect_timer:
+      sock = self.try_connect()
+    self.last_connect_seconds = connect_timer.elapsed
 
     self._session = NailgunClientSession(sock, self._stdin, self._stdout, self._stderr)
     try:
@@ -5,6 +5,8 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import errno
+import fcntl
 import hashlib
 import logging
 import os
@@ -12,7 +14,8 @@ import re
 import select
 import threading
 import time
-from contextlib import closing
+from collections import defaultdict
+from contextlib import closing, contextmanager
 
 from six import string_types
 from twitter.common.collections import maybe_list
@@ -20,8 +23,10 @@ from twitter.common.collections import maybe_list
 from pants.base.build_environment import get_buildroot
 from pants.java.executor import Executor, SubprocessExecutor
 from pants.java.nailgun_client import NailgunClient
-from pants.pantsd.process_manager import ProcessGroup, ProcessManager
+from pants.pantsd.process_manager import ProcessGroup, ProcessManager, swallow_psutil_exceptions
+from pants.util.contextutil import Timer
 from pants.util.dirutil import safe_file_dump, safe_open
+from pants.util.objects import datatype
 
 
 logger = logging.getLogger(__name__)
@@ -30,6 +35,35 @@ logger = logging.getLogger(__name__)
 class NailgunProcessGroup(ProcessGroup):
   _NAILGUN_KILL_LOCK = threading.Lock()
 
+  # The number of commands in flight in this process for each pooled server, by identity and slot.
+  _LEASE_LOCK = threading.Lock()
+  _leases = defaultdict(int)
+
+  @classmethod
+  @contextmanager
+  def lease(cls, identity, pool_size, on_idle=None):
+    """Leases the least loaded server slot in the pool of servers for the given identity.
+
+    Slots are numbered from 0 to `pool_size - 1`, and ties go to the lowest slot, so additional
+    servers are only used (and spawned) when commands for the identity run concurrently.
+
+    :param string identity: The identity of the pool.
+    :param int pool_size: The maximum number of servers in the pool.
+    :param func on_idle: An optional callable that is passed the leased slot if it was idle in this
+                         process. It is called before the slot can be leased again.
+    :returns: The leased slot.
+    """
+    with cls._LEASE_LOCK:
+      slot = min(range(max(pool_size, 1)), key=lambda s: (cls._leases[(identity, s)], s))
+      if on_idle and cls._leases[(identity, slot)] == 0:
+        on_idle(slot)
+      cls._leases[(identity, slot)] += 1
+    try:
+      yield slot
+    finally:
+      with cls._LEASE_LOCK:
+        cls._leases[(identity, slot)] -= 1
+
   def __init__(self, metadata_base_dir=None):
     super(NailgunProcessGroup, self).__init__(name='nailgun', metadata_base_dir=metadata_base_dir)
     # TODO: this should enumerate the .pids dir first, then fallback to ps enumeration (& warn).
@@ -55,6 +89,16 @@ class NailgunProcessGroup(ProcessGroup):
       for proc in self._iter_nailgun_instances(everywhere):
         logger.info('killing nailgun server pid={pid}'.format(pid=proc.pid))
         proc.terminate()
+      NailgunExecutor._verified_servers.clear()
+
+
+class NailgunLatency(datatype('NailgunLatency', ['queue', 'connect', 'run'])):
+  """The seconds spent in each phase of a single command run via a nailgun server.
+
+  :param float queue: Waiting for (and if necessary, spawning) a server that matches the command.
+  :param float connect: Connecting to the server.
+  :param float run: Sending the command and processing its output until it exits.
+  """
 
 
 # TODO: Once we integrate standard logging into our reporting framework, we can consider making
@@ -79,8 +123,22 @@ class NailgunExecutor(Executor, ProcessManager):
   _SELECT_WAIT = 1
   _PROCESS_NAME = b'java'
 
+  # The (fingerprint, java, port) of servers already verified as running by this process, by
+  # metadata directory and identity. Commands with a matching fingerprint connect directly to a
+  # verified server, rather than re-inspecting the server process and its metadata on every run.
+  _verified_servers = {}
+
   def __init__(self, identity, workdir, nailgun_classpath, distribution, ins=None,
-               connect_timeout=10, connect_attempts=5, metadata_base_dir=None):
+               connect_timeout=10, connect_attempts=5, metadata_base_dir=None,
+               latency_observer=None, pool_size=1, max_rss_bytes=None):
+    """
+    :param func latency_observer: An optional callable that is passed a `NailgunLatency` for each
+                                  command run via this executor.
+    :param int pool_size: The maximum number of servers to run for this identity. Commands are
+                          dispatched to the least loaded server in the pool.
+    :param int max_rss_bytes: If set, idle servers whose resident memory exceeds this size are
+                              restarted before running the next command.
+    """
     Executor.__init__(self, distribution=distribution)
     ProcessManager.__init__(self,
                             name=identity,
@@ -98,6 +156,10 @@ class NailgunExecutor(Executor, ProcessManager):
     self._ins = ins
     self._connect_timeout = connect_timeout
     self._connect_attempts = connect_attempts
+    self._latency_observer = latency_observer
+    self._pool_size = pool_size
+    self._max_rss_bytes = max_rss_bytes
+    self._server_key = (self._metadata_base_dir, identity)
 
   def __str__(self):
     return 'NailgunExecutor({identity}, dist={dist}, pid={pid} socket={socket})'.format(
@@ -151,17 +213,104 @@ class NailgunExecutor(Executor, ProcessManager):
         return list(command)
 
       def run(this, stdout=None, stderr=None, cwd=None):
-        nailgun = self._get_nailgun_client(jvm_options, classpath, stdout, stderr)
-        try:
-          logger.debug('Executing via {ng_desc}: {cmd}'.format(ng_desc=nailgun, cmd=this.cmd))
-          return nailgun.execute(main, cwd, *args)
-        except nailgun.NailgunError as e:
-          self.terminate()
-          raise self.Error('Problem launching via {ng_desc} command {main} {args}: {msg}'
-                           .format(ng_desc=nailgun, main=main, args=' '.join(args), msg=e))
+        def recycle_if_oversized(slot):
+          self._pool_member(slot)._recycle_if_oversized()
+
+        with NailgunProcessGroup.lease(self._identity, self._pool_size,
+                                       on_idle=recycle_if_oversized) as slot:
+          member = self._pool_member(slot)
+          with member._server_lock():
+            return member._run_via_nailgun(this.cmd, jvm_options, classpath, main, args, cwd,
+                                           stdout, stderr)
 
     return Runner()
 
+  def _pool_member(self, slot):
+    """Returns an executor for the server in the given slot of this executor's pool.
+
+    Slot 0 is this executor itself, so that a pool of one behaves exactly as an unpooled executor.
+    """
+    if slot == 0:
+      return self
+    return NailgunExecutor('{}_{}'.format(self._identity, slot),
+                           os.path.join(self._workdir, 'pool', str(slot)),
+                           self._nailgun_classpath,
+                           self._distribution,
+                           ins=self._ins,
+                           connect_timeout=self._connect_timeout,
+                           connect_attempts=self._connect_attempts,
+                           metadata_base_dir=self._metadata_base_dir,
+                           latency_observer=self._latency_observer,
+                           max_rss_bytes=self._max_rss_bytes)
+
+  @contextmanager
+  def _server_lock(self, exclusive=False):
+    """Holds a lock on this executor's server that is visible to all pants processes.
+
+    Commands hold the lock shared while they run on the server, so that it is only exclusively
+    locked while no command from any process is using it.
+
+    :param bool exclusive: Whether to lock exclusively, which is only done if the lock is free.
+    :returns: Whether the lock was acquired.
+    """
+    with safe_open(os.path.join(self._workdir, 'server.lock'), 'a') as lock_file:
+      try:
+        fcntl.flock(lock_file, (fcntl.LOCK_EX | fcntl.LOCK_NB) if exclusive else fcntl.LOCK_SH)
+        acquired = True
+      except IOError as e:
+        if not exclusive or e.errno not in (errno.EAGAIN, errno.EACCES):
+          raise
+        acquired = False
+      # Closing the file releases the lock.
+      yield acquired
+
+  def _recycle_if_oversized(self):
+    """Terminates this executor's server if its resident memory exceeds the configured limit.
+
+    The server is only terminated if no command is running on it in any process.
+    """
+    if not self._max_rss_bytes:
+      return
+    with self._server_lock(exclusive=True) as idle:
+      if not idle:
+        return
+      with self._NAILGUN_SPAWN_LOCK, swallow_psutil_exceptions():
+        if not self.is_alive():
+          return
+        rss = self._as_process().memory_info().rss
+        if rss > self._max_rss_bytes:
+          logger.debug('Recycling nailgun server {server} using {rss} bytes of memory.'
+                       .format(server=self._identity, rss=rss))
+          self._verified_servers.pop(self._server_key, None)
+          self.terminate()
+
+  def _run_via_nailgun(self, cmd, jvm_options, classpath, main, args, cwd, stdout, stderr,
+                       retry=True):
+    with Timer() as queue_timer:
+      nailgun = self._get_nailgun_client(jvm_options, classpath, stdout, stderr)
+    try:
+      logger.debug('Executing via {ng_desc}: {cmd}'.format(ng_desc=nailgun, cmd=cmd))
+      with Timer() as execute_timer:
+        result = nailgun.execute(main, cwd, *args)
+    except nailgun.NailgunError as e:
+      verified = self._verified_servers.pop(self._server_key, None)
+      if retry and verified and isinstance(e, nailgun.NailgunConnectionError):
+        # A previously verified server may since have been killed or replaced (e.g. by another
+        # pants run), so re-verify it. Nothing has been sent yet, so the command is safe to retry.
+        logger.debug('Failed to connect to verified {ng_desc}, retrying.'.format(ng_desc=nailgun))
+        return self._run_via_nailgun(cmd, jvm_options, classpath, main, args, cwd, stdout, stderr,
+                                     retry=False)
+      self.terminate()
+      raise self.Error('Problem launching via {ng_desc} command {main} {args}: {msg}'
+                       .format(ng_desc=nailgun, main=main, args=' '.join(args), msg=e))
+
+    if self._latency_observer:
+      connect = nailgun.last_connect_seconds
+      self._latency_observer(NailgunLatency(queue=queue_timer.elapsed,
+                                            connect=connect,
+                                            run=execute_timer.elapsed - connect))
+    return result
+
   def _check_nailgun_state(self, new_fingerprint):
     running = self.is_alive()
     updated = running and (self.fingerprint != new_fingerprint or
@@ -180,6 +329,10 @@ class NailgunExecutor(Executor, ProcessManager):
     new_fingerprint = self._fingerprint(jvm_options, classpath, self._distribution.version)
 
     with self._NAILGUN_SPAWN_LOCK:
+      verified = self._verified_servers.get(self._server_key)
+      if verified and verified[:2] == (new_fingerprint, self._distribution.java):
+        return self._create_ngclient(verified[2], stdout, stderr)
+
       running, updated = self._check_nailgun_state(new_fingerprint)
 
       if running and updated:
@@ -188,9 +341,14 @@ class NailgunExecutor(Executor, ProcessManager):
         self.terminate()
 
       if (not running) or (running and updated):
-        return self._spawn_nailgun_server(new_fingerprint, jvm_options, classpath, stdout, stderr)
-
-    return self._create_ngclient(self.socket, stdout, stderr)
+        client = self._spawn_nailgun_server(new_fingerprint, jvm_options, classpath, stdout, stderr)
+      else:
+        client = self._create_ngclient(self.socket, stdout, stderr)
+
+      self._verified_servers[self._server_key] = (new_fingerprint,
+                                                  self._distribution.java,
+                                                  self.socket)
+      return client
 
   def _await_socket(self, timeout):
     """Blocks for the nailgun subprocess to bind and emit a listening port in the nailgun stdout."""
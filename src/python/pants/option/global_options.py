@@ -112,6 +112,10 @@ class GlobalOptionsRegistrar(Optionable):
     # registration and not so that their values can be interpolated in configs.
     register('-d', '--logdir', advanced=True, metavar='<dir>',
              help='Write logs to files under this directory.')
+    # Registered in the bootstrap phase so that it can cover backend and plugin loading.
+    register('--startup-profile', advanced=True, type=bool,
+             help='Print a breakdown of the time spent resolving plugins, loading backends and '
+                  'registering options at startup.')
 
     # This facilitates bootstrap-time configuration of pantsd usage such that we can
     # determine whether or not to use the Pailgun client to invoke a given pants run
@@ -152,6 +152,8 @@ class Options(object):
     self._bootstrap_option_values = bootstrap_option_values
     self._known_scope_to_info = known_scope_to_info
     self._option_tracker = option_tracker
+    # Memoized results of `get_fingerprintable_for_scope`, cleared by any new registration.
+    self._fingerprintable_by_scope = {}
 
   @property
   def tracker(self):
@@ -240,11 +242,33 @@ class Options(object):
 
   def register(self, scope, *args, **kwargs):
     """Register an option in the given scope."""
+    self._fingerprintable_by_scope.clear()
     self.get_parser(scope).register(*args, **kwargs)
     deprecated_scope = self.known_scope_to_info[scope].deprecated_scope
     if deprecated_scope:
       self.get_parser(deprecated_scope).register(*args, **kwargs)
 
+  def register_lazily(self, optionable_class):
+    """Defers registration of the given optionable's options until its scope is first used.
+
+    Registration happens the first time the optionable's scope (or a scope it encloses, or its
+    deprecated scope) is parsed, fingerprinted or has its parser requested, so that runs only pay
+    for registering the scopes that they actually use.
+    """
+    self._fingerprintable_by_scope.clear()
+    registered = []
+
+    def register():
+      if not registered:
+        registered.append(optionable_class)
+        optionable_class.register_options_on_scope(self)
+
+    scope = optionable_class.options_scope
+    self._parser_hierarchy.register_lazily(scope, register)
+    deprecated_scope = self.known_scope_to_info[scope].deprecated_scope
+    if deprecated_scope:
+      self._parser_hierarchy.register_lazily(deprecated_scope, register)
+
   def registration_function_for_optionable(self, optionable_class):
     """Returns a function for registering options on the given scope."""
     # TODO(benjy): Make this an instance of a class that implements __call__, so we can
@@ -324,6 +348,12 @@ class Options(object):
 
     :API: public
     """
+    pairs = self._fingerprintable_by_scope.get(scope)
+    if pairs is None:
+      pairs = self._fingerprintable_by_scope[scope] = self._compute_fingerprintable_for_scope(scope)
+    return list(pairs)
+
+  def _compute_fingerprintable_for_scope(self, scope):
     pairs = []
     # Note that we iterate over options registered at `scope` and at all enclosing scopes, since
     # option-using code can read those values indirectly via its own OptionValueContainer, so
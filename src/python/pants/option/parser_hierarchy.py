@@ -27,6 +27,8 @@ class ParserHierarchy(object):
     # Sorting ensures that ancestors precede descendants.
     scope_infos = sorted(set(list(scope_infos)), key=lambda si: si.scope)
     self._parser_by_scope = {}
+    # Registration functions that have not yet been invoked, by scope.
+    self._deferred_registrations = {}
     for scope_info in scope_infos:
       scope = scope_info.scope
       parent_parser = (None if scope == GLOBAL_SCOPE else
@@ -34,12 +36,36 @@ class ParserHierarchy(object):
       self._parser_by_scope[scope] = Parser(env, config, scope_info, parent_parser,
                                             option_tracker=option_tracker)
 
+  def register_lazily(self, scope, registration_function):
+    """Defers a call to `registration_function` until the parser for `scope` is first requested.
+
+    Deferred registrations for a scope run after those for all of its enclosing scopes, so options
+    are registered in the same outer-to-inner order as they would be if registered eagerly.
+    """
+    self.get_parser_by_scope(scope)
+    self._deferred_registrations.setdefault(scope, []).append(registration_function)
+
   def get_parser_by_scope(self, scope):
     try:
-      return self._parser_by_scope[scope]
+      parser = self._parser_by_scope[scope]
     except KeyError:
       raise Config.ConfigValidationError('No such options scope: {}'.format(scope))
+    if self._deferred_registrations:
+      self._run_deferred_registrations(scope)
+    return parser
+
+  def _run_deferred_registrations(self, scope):
+    enclosing_scopes = [scope]
+    while scope != GLOBAL_SCOPE:
+      scope = enclosing_scope(scope)
+      enclosing_scopes.append(scope)
+    for scope in reversed(enclosing_scopes):
+      # Pop the registration functions before invoking them, since they request this parser.
+      for registration_function in self._deferred_registrations.pop(scope, ()):
+        registration_function()
 
   def walk(self, callback):
     """Invoke callback on each parser, in pre-order depth-first order."""
+    while self._deferred_registrations:
+      self._run_deferred_registrations(min(self._deferred_registrations))
     self._parser_by_scope[GLOBAL_SCOPE].walk(callback)
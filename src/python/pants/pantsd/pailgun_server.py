@@ -7,6 +7,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import logging
 import socket
+import threading
 import traceback
 
 from six.moves.socketserver import BaseRequestHandler, BaseServer, TCPServer
@@ -55,7 +56,9 @@ class PailgunHandler(PailgunHandlerBase):
   def _run_pants(self, sock, arguments, environment):
     """Execute a given run with a pants runner."""
     runner = self.server.runner_factory(sock, arguments, environment)
-    runner.run()
+    # Fork the run under the context_lock.
+    with self.server.context_lock():
+      runner.run()
 
   def handle(self):
     """Request handler for a single Pailgun request."""
@@ -88,7 +91,11 @@ class PailgunHandler(PailgunHandlerBase):
 
 
 class PailgunServer(TCPServer):
-  """A (forking) pants nailgun server."""
+  """A (forking) pants nailgun server.
+
+  Each request is handled on its own thread, so that a long-running request (e.g. one that warms
+  the product graph) does not prevent other requests from being accepted.
+  """
 
   def __init__(self, server_address, runner_factory, context_lock,
                handler_class=None, bind_and_activate=True):
@@ -98,7 +105,7 @@ class PailgunServer(TCPServer):
 
     :param tuple server_address: An address tuple of (hostname, port) for socket.bind().
     :param class runner_factory: A factory function for creating a DaemonPantsRunner for each run.
-    :param func context_lock: A contextmgr that will be used as a lock during request handling/forking.
+    :param func context_lock: A contextmgr that will be used as a lock during forking.
     :param class handler_class: The request handler class to use for each request. (Optional)
     :param bool bind_and_activate: If True, binds and activates networking at __init__ time.
                                    (Optional)
@@ -109,7 +116,7 @@ class PailgunServer(TCPServer):
     self.runner_factory = runner_factory
     self.allow_reuse_address = True           # Allow quick reuse of TCP_WAIT sockets.
     self.server_port = None                   # Set during server_bind() once the port is bound.
-    self._context_lock = context_lock
+    self.context_lock = context_lock
 
     if bind_and_activate:
       try:
@@ -125,15 +132,24 @@ class PailgunServer(TCPServer):
     _, self.server_port = self.socket.getsockname()[:2]
 
   def process_request(self, request, client_address):
-    """Override of TCPServer.process_request() that provides for forking request handlers and
-    delegates error handling to the request handler."""
+    """Override of TCPServer.process_request() that handles each request on a new thread."""
+    thread = threading.Thread(target=self.process_request_thread,
+                              args=(request, client_address),
+                              name='pailgun-request-{}:{}'.format(*client_address[:2]))
+    thread.daemon = True
+    thread.start()
+
+  def process_request_thread(self, request, client_address):
+    """Provides for forking request handlers and delegates error handling to the request handler.
+
+    N.B. This follows the naming of `SocketServer.ThreadingMixIn`.
+    """
     # Instantiate the request handler.
     handler = self.RequestHandlerClass(request, client_address, self)
 
     try:
-      # Attempt to handle a request with the handler under the context_lock.
-      with self._context_lock():
-        handler.handle_request()
+      # Attempt to handle a request with the handler, which forks under the context_lock.
+      handler.handle_request()
     except Exception as e:
       # If that fails, (synchronously) handle the error with the error handler sans-fork.
       try:
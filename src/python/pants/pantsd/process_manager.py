@@ -34,6 +34,30 @@ def swallow_psutil_exceptions():
     pass
 
 
+def fork_with_logging_locks():
+  """Forks, holding the locks of the logging module and its handlers across only the fork itself.
+
+  Python 2's logging has no at-fork handling: a fork while another thread holds one of its locks
+  would leave that lock held forever in the child, which would then deadlock on its first log
+  call. The forking thread instead takes every lock just before the fork, and releases them again
+  right after it, in both the parent and the child (where it continues as the only thread).
+
+  :returns: The result of `os.fork`.
+  """
+  logging._acquireLock()
+  try:
+    handlers = [handler for handler in (ref() for ref in logging._handlerList) if handler]
+    for handler in handlers:
+      handler.acquire()
+    try:
+      return os.fork()
+    finally:
+      for handler in reversed(handlers):
+        handler.release()
+  finally:
+    logging._releaseLock()
+
+
 class ProcessGroup(object):
   """Wraps a logical group of processes and provides convenient access to ProcessManager objects."""
 
@@ -423,10 +447,10 @@ class ProcessManager(ProcessMetadataManager):
     self.purge_metadata()
     self.pre_fork(**pre_fork_opts or {})
     logger.debug('forking %s', self)
-    pid = os.fork()
+    pid = fork_with_logging_locks()
     if pid == 0:
       os.setsid()
-      second_pid = os.fork()
+      second_pid = fork_with_logging_locks()
       if second_pid == 0:
         try:
           os.chdir(self._buildroot)
@@ -457,7 +481,7 @@ class ProcessManager(ProcessMetadataManager):
     """
     self.purge_metadata()
     self.pre_fork(**pre_fork_opts or {})
-    pid = os.fork()
+    pid = fork_with_logging_locks()
     if pid == 0:
       try:
         os.setsid()
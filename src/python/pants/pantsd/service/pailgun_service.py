@@ -8,17 +8,24 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import logging
 import select
 import sys
+import threading
 import traceback
 from contextlib import contextmanager
 
+from pants.bin.options_initializer import OptionsInitializer
+from pants.option.options_bootstrapper import OptionsBootstrapper
 from pants.pantsd.pailgun_server import PailgunServer
 from pants.pantsd.service.pants_service import PantsService
+from pants.pantsd.util import clean_global_runtime_state
+from pants.util.contextutil import Timer
+from pants.util.rwlock import ReadWriteLock
 
 
 class PailgunService(PantsService):
   """A service that runs the Pailgun server."""
 
-  def __init__(self, bind_addr, exiter_class, runner_class, target_roots_class, scheduler_service):
+  def __init__(self, bind_addr, exiter_class, runner_class, target_roots_class, scheduler_service,
+               read_only_goals=()):
     """
     :param tuple bind_addr: The (hostname, port) tuple to bind the Pailgun server to.
     :param class exiter_class: The `Exiter` class to be used for Pailgun runs.
@@ -26,6 +33,9 @@ class PailgunService(PantsService):
     :param class target_roots_class: The `TargetRoots` class to be used for target root parsing.
     :param SchedulerService scheduler_service: The SchedulerService instance for access to the
                                                resident scheduler.
+    :param iterable read_only_goals: Goals that only read the build graph. Runs of only these goals
+                                     skip warming the resident product graph, and so only need
+                                     shared access to it.
     """
     super(PailgunService, self).__init__()
     self._bind_addr = bind_addr
@@ -33,9 +43,17 @@ class PailgunService(PantsService):
     self._runner_class = runner_class
     self._target_roots_class = target_roots_class
     self._scheduler_service = scheduler_service
+    self._read_only_goals = frozenset(read_only_goals)
 
     self._logger = logging.getLogger(__name__)
     self._pailgun = None
+    # Per-request state, for requests that are each handled on their own thread.
+    self._request_state = threading.local()
+    # Guards the daemon's loaded backends, plugins and goals: held for writing while they are
+    # (re)loaded, and for reading while forking runs that inherit them.
+    self._build_configuration_lock = ReadWriteLock()
+    # Serializes forks: only the work that precedes them runs concurrently.
+    self._fork_lock = threading.Lock()
 
   @property
   def pailgun(self):
@@ -47,6 +65,72 @@ class PailgunService(PantsService):
   def pailgun_port(self):
     return self.pailgun.server_port
 
+  def _is_read_only(self, arguments):
+    """Returns True if the given pants arguments request only read-only goals.
+
+    Goals are conservatively taken to be all arguments that are neither flags nor specs, so an
+    argument that cannot be identified causes the run to be treated as mutating.
+    """
+    goals = set()
+    for arg in arguments[1:]:
+      if arg == '--':
+        break
+      elif arg.startswith('-') or ':' in arg or '/' in arg:
+        continue
+      goals.add(arg)
+    return bool(goals) and goals.issubset(self._read_only_goals)
+
+  def _warm_build_configuration(self, arguments, environment):
+    """Ensures that the daemon has loaded the backends, plugins and goals for the given run.
+
+    Forked runs inherit the daemon's loaded `BuildConfiguration` and registered goals, which saves
+    each of them from re-importing and re-registering every backend. The daemon's state is keyed by
+    the fingerprint of the bootstrap options that affect loading, and is reloaded whenever a run
+    with a different fingerprint arrives.
+
+    Another request may reload the daemon's state before this run forks, so the fork must check
+    that the returned fingerprint is still the loaded one (see `DaemonPantsRunner.run`).
+
+    :returns: A tuple of the `OptionsInitializer` for the run, with its plugins resolved, and the
+              fingerprint of the state loaded for the run; or (None, None) if it could not be
+              loaded.
+    """
+    try:
+      initializer = OptionsInitializer(OptionsBootstrapper(env=environment, args=arguments))
+      fingerprint = initializer.build_configuration_fingerprint()
+      if fingerprint == OptionsInitializer.loaded_build_configuration_fingerprint():
+        return initializer, fingerprint
+
+      with self._build_configuration_lock.write_locked(), Timer() as timer:
+        if fingerprint != OptionsInitializer.loaded_build_configuration_fingerprint():
+          clean_global_runtime_state(reset_runtracker=False, reset_subsystem=True)
+          initializer.setup(init_logging=False)
+      self._logger.info('loaded backends and plugins for fingerprint {} in {:.3f} seconds'
+                        .format(fingerprint, timer.elapsed))
+      return initializer, fingerprint
+    except Exception:
+      # Leave it to the forked run to load (and report failures for) its own configuration.
+      self._logger.warning('failed to load backends and plugins for reuse:\n%s',
+                           traceback.format_exc())
+      return None, None
+
+  def _create_target_roots(self, arguments, initializer, build_configuration_fingerprint):
+    """Creates the target roots of the given run.
+
+    N.B. The caller must hold the build configuration for reading, so that options are parsed
+    against the backends and goals that the run will fork with.
+    """
+    options = None
+    loaded_fingerprint = OptionsInitializer.loaded_build_configuration_fingerprint()
+    if initializer and build_configuration_fingerprint == loaded_fingerprint:
+      # Reuse the plugins resolved by the warm step, rather than resolving them again.
+      options, _ = initializer.setup(init_logging=False)
+    return self._target_roots_class.create(
+      options=options,
+      args=arguments,
+      change_calculator=self._scheduler_service.change_calculator
+    )
+
   def _setup_pailgun(self):
     """Sets up a PailgunServer instance."""
     # Constructs and returns a runnable PantsRunner.
@@ -54,40 +138,61 @@ class PailgunService(PantsService):
       exiter = self._exiter_class(sock)
       graph_helper = None
       deferred_exc = None
+      self._request_state.command = ' '.join(arguments)
+      self._request_state.waited = 0.0
 
       self._logger.debug('execution commandline: %s', arguments)
-      if self._scheduler_service:
-        # N.B. This parses sys.argv by way of OptionsInitializer/OptionsBootstrapper prior to
-        # the main pants run to derive target roots for caching in the underlying product graph.
-        target_roots = self._target_roots_class.create(
-          args=arguments,
-          change_calculator=self._scheduler_service.change_calculator
-        )
-        try:
-          self._logger.debug('warming the product graph via %s', self._scheduler_service)
-          # N.B. This call is made in the pre-fork daemon context for reach and reuse of the
-          # resident scheduler.
-          graph_helper = self._scheduler_service.warm_product_graph(target_roots)
-        except Exception:
-          deferred_exc = sys.exc_info()
-          self._logger.warning(
-            'encountered exception during SchedulerService.warm_product_graph(), deferring:\n%s',
-            ''.join(traceback.format_exception(*deferred_exc))
-          )
-
-      return self._runner_class(sock, exiter, arguments, environment, graph_helper, deferred_exc)
+      initializer, build_configuration_fingerprint = self._warm_build_configuration(arguments,
+                                                                                    environment)
+      if self._scheduler_service and self._is_read_only(arguments):
+        # Read-only runs construct their graph post-fork from the resident product graph, without
+        # warming (and thus mutating) it.
+        graph_helper = self._scheduler_service.graph_helper
+      elif self._scheduler_service:
+        with self._build_configuration_lock.read_locked():
+          with self._scheduler_service.write_locked() as waited:
+            self._request_state.waited += waited
+            # N.B. This parses the run's options prior to the main pants run to derive target roots
+            # for caching in the underlying product graph.
+            target_roots = self._create_target_roots(arguments, initializer,
+                                                     build_configuration_fingerprint)
+            try:
+              self._logger.debug('warming the product graph via %s', self._scheduler_service)
+              # N.B. This call is made in the pre-fork daemon context for reach and reuse of the
+              # resident scheduler.
+              graph_helper = self._scheduler_service.warm_product_graph(target_roots)
+            except Exception:
+              deferred_exc = sys.exc_info()
+              self._logger.warning(
+                'encountered exception during SchedulerService.warm_product_graph(), '
+                'deferring:\n%s',
+                ''.join(traceback.format_exception(*deferred_exc))
+              )
+
+      return self._runner_class(sock, exiter, arguments, environment, graph_helper, deferred_exc,
+                                build_configuration_fingerprint=build_configuration_fingerprint)
 
     @contextmanager
     def context_lock():
       """This lock is used to safeguard Pailgun request handling against a fork() with the
       scheduler lock held by another thread (e.g. the FSEventService thread), which can
       lead to a pailgun deadlock.
+
+      Forking only reads the product graph and the loaded backends and plugins, so it need only
+      exclude writers of them; the forks themselves are serialized by the fork lock.
       """
-      if self._scheduler_service:
-        with self._scheduler_service.locked():
-          yield
-      else:
-        yield
+      with self._build_configuration_lock.read_locked():
+        if self._scheduler_service:
+          with self._scheduler_service.read_locked() as waited:
+            self._request_state.waited = getattr(self._request_state, 'waited', 0.0) + waited
+            self._logger.info('request `{}` waited {:.3f} seconds for the product graph'
+                              .format(getattr(self._request_state, 'command', ''),
+                                      self._request_state.waited))
+            with self._fork_lock:
+              yield
+        else:
+          with self._fork_lock:
+            yield
 
     return PailgunServer(self._bind_addr, runner_factory, context_lock)
 
@@ -8,7 +8,9 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import logging
 import Queue
 
+from pants.base.project_tree_factory import create_caching_project_tree
 from pants.pantsd.service.pants_service import PantsService
+from pants.util.rwlock import ReadWriteLock
 
 
 class SchedulerService(PantsService):
@@ -17,28 +19,47 @@ class SchedulerService(PantsService):
   This service holds an online Scheduler instance that is primed via watchman filesystem events.
   This provides for a quick fork of pants runs (via the pailgun) with a fully primed ProductGraph
   in memory.
+
+  Access to the product graph is guarded by a reader/writer lock: anything that executes against
+  or invalidates the scheduler must hold it for writing, while forking a pants run from the
+  resident graph only requires it for reading, so many runs may fork concurrently.
   """
 
-  def __init__(self, fs_event_service, legacy_graph_helper):
+  def __init__(self, fs_event_service, legacy_graph_helper, build_root, pants_ignore_patterns):
     """
     :param FSEventService fs_event_service: An unstarted FSEventService instance for setting up
                                             filesystem event handlers.
     :param LegacyGraphHelper legacy_graph_helper: The LegacyGraphHelper instance for graph
                                                   construction.
+    :param string build_root: The build root that filesystem events are relative to.
+    :param list pants_ignore_patterns: The ignore patterns of the project tree that is cached for
+                                       the runs that the daemon forks.
     """
     super(SchedulerService, self).__init__()
     self._fs_event_service = fs_event_service
     self._graph_helper = legacy_graph_helper
     self._scheduler = legacy_graph_helper.scheduler
     self._engine = legacy_graph_helper.engine
+    self._build_root = build_root
+    self._pants_ignore_patterns = pants_ignore_patterns
+    self._project_tree = None
 
     self._logger = logging.getLogger(__name__)
     self._event_queue = Queue.Queue(maxsize=64)
+    self._graph_lock = ReadWriteLock()
+
+  def read_locked(self):
+    """A contextmanager that holds the product graph for reading, yielding the time waited."""
+    return self._graph_lock.read_locked()
+
+  def write_locked(self):
+    """A contextmanager that holds the product graph for writing, yielding the time waited."""
+    return self._graph_lock.write_locked()
 
   @property
-  def locked(self):
-    """Surfaces the scheduler's `locked` method as part of the service's public API."""
-    return self._scheduler.locked
+  def graph_helper(self):
+    """Surfaces the `LegacyGraphHelper` for runs that do not warm the product graph."""
+    return self._graph_helper
 
   @property
   def change_calculator(self):
@@ -47,6 +68,9 @@ class SchedulerService(PantsService):
 
   def setup(self):
     """Service setup."""
+    # Created in the daemon, so that forked runs inherit its stats and listings, and invalidated
+    # with the scheduler.
+    self._project_tree = create_caching_project_tree(self._build_root, self._pants_ignore_patterns)
     # Register filesystem event handlers on an FSEventService instance.
     self._fs_event_service.register_all_files_handler(self._enqueue_fs_event)
 
@@ -58,11 +82,14 @@ class SchedulerService(PantsService):
 
   def _handle_batch_event(self, files):
     self._logger.debug('handling change event for: %s', files)
+    if self._project_tree:
+      self._project_tree.invalidate(files)
     if not self._scheduler:
       self._logger.debug('no scheduler. ignoring event.')
       return
 
-    self._scheduler.invalidate_files(files)
+    with self.write_locked():
+      self._scheduler.invalidate_files(files)
 
   def _process_event_queue(self):
     """File event notification queue processor."""
@@ -89,6 +116,8 @@ class SchedulerService(PantsService):
   def warm_product_graph(self, spec_roots):
     """Runs an execution request against the captive scheduler given a set of input specs to warm.
 
+    N.B. The caller must hold the product graph via `write_locked`.
+
     :returns: A `LegacyGraphHelper` instance for graph construction.
     """
     self._graph_helper.warm_product_graph(spec_roots)
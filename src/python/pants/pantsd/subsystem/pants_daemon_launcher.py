@@ -40,6 +40,15 @@ class PantsDaemonLauncher(object):
       register('--fs-event-workers', advanced=True, type=int, default=4,
                help='The number of workers to use for the filesystem event service executor pool.'
                     ' Experimental.')
+      register('--glob-index', advanced=True, type=bool,
+               help='Expand globs using an index of directory listings that is invalidated by '
+                    'filesystem events, rather than via one graph node per directory visited. '
+                    'Requires --fs-event-detection. Experimental.')
+      register('--read-only-goals', advanced=True, type=list,
+               default=['dependees', 'export', 'filedeps', 'list'],
+               help='Goals that only read the build graph. Runs of only these goals do not warm '
+                    'the resident product graph, and so may be served concurrently with each '
+                    'other and without waiting on other runs to warm it.')
 
     @classmethod
     def subsystem_dependencies(cls):
@@ -62,6 +71,8 @@ class PantsDaemonLauncher(object):
                                  pailgun_port=options.pailgun_port,
                                  fs_event_enabled=options.fs_event_detection,
                                  fs_event_workers=options.fs_event_workers,
+                                 glob_index_enabled=options.glob_index,
+                                 read_only_goals=options.read_only_goals,
                                  pants_ignore_patterns=options.pants_ignore)
 
   def __init__(self,
@@ -74,7 +85,9 @@ class PantsDaemonLauncher(object):
                pailgun_port,
                fs_event_enabled,
                fs_event_workers,
-               pants_ignore_patterns):
+               pants_ignore_patterns,
+               glob_index_enabled,
+               read_only_goals):
     """
     :param str build_root: The path of the build root.
     :param str pants_workdir: The path of the pants workdir.
@@ -87,6 +100,8 @@ class PantsDaemonLauncher(object):
                                   invalidation.
     :param int fs_event_workers: The number of workers to use for processing the fs event queue.
     :param list pants_ignore_patterns: A list of path ignore patterns for filesystem operations.
+    :param bool glob_index_enabled: Whether or not to expand globs using a GlobIndex.
+    :param list read_only_goals: Goals that only read the build graph.
     """
     self._build_root = build_root
     self._pants_workdir = pants_workdir
@@ -98,6 +113,8 @@ class PantsDaemonLauncher(object):
     self._fs_event_enabled = fs_event_enabled
     self._fs_event_workers = fs_event_workers
     self._pants_ignore_patterns = pants_ignore_patterns
+    self._glob_index_enabled = glob_index_enabled
+    self._read_only_goals = read_only_goals
     # TODO(kwlzn): Thread filesystem path ignores here to Watchman's subscription registration.
 
     lock_location = os.path.join(self._build_root, '.pantsd.startup')
@@ -127,15 +144,20 @@ class PantsDaemonLauncher(object):
     if self._fs_event_enabled:
       fs_event_service = FSEventService(watchman, self._build_root, self._fs_event_workers)
 
-      legacy_graph_helper = self._engine_initializer.setup_legacy_graph(self._pants_ignore_patterns)
-      scheduler_service = SchedulerService(fs_event_service, legacy_graph_helper)
+      legacy_graph_helper = self._engine_initializer.setup_legacy_graph(
+        self._pants_ignore_patterns,
+        rule_graph_cache_dir=os.path.join(self._pants_workdir, 'engine', 'rule_graphs'),
+        use_glob_index=self._glob_index_enabled)
+      scheduler_service = SchedulerService(fs_event_service, legacy_graph_helper, self._build_root,
+                                           self._pants_ignore_patterns)
       services.extend((fs_event_service, scheduler_service))
 
     pailgun_service = PailgunService(bind_addr=(self._pailgun_host, self._pailgun_port),
                                      exiter_class=DaemonExiter,
                                      runner_class=DaemonPantsRunner,
                                      target_roots_class=TargetRoots,
-                                     scheduler_service=scheduler_service)
+                                     scheduler_service=scheduler_service,
+                                     read_only_goals=self._read_only_goals)
     services.append(pailgun_service)
 
     # Construct a mapping of named ports used by the daemon's services. In the default case these
@@ -12,11 +12,14 @@ from pants.goal.run_tracker import RunTracker
 from pants.subsystem.subsystem import Subsystem
 
 
-def clean_global_runtime_state(reset_runtracker=True, reset_subsystem=False):
+def clean_global_runtime_state(reset_runtracker=True, reset_subsystem=False,
+                               reset_build_configuration=True):
   """Resets the global runtime state of a pants runtime for cleaner forking.
 
   :param bool reset_runtracker: Whether or not to clean RunTracker global state.
   :param bool reset_subsystem: Whether or not to clean Subsystem global state.
+  :param bool reset_build_configuration: Whether or not to clean the registered goals and the
+                                         loaded backend/plugin state.
   """
   if reset_runtracker:
     # Reset RunTracker state.
@@ -29,8 +32,9 @@ def clean_global_runtime_state(reset_runtracker=True, reset_subsystem=False):
   #TODO: Think of an alternative for IntermediateTargetFactoryBase._targets to avoid this call
   IntermediateTargetFactoryBase.reset()
 
-  # Reset Goals and Tasks.
-  Goal.clear()
+  if reset_build_configuration:
+    # Reset Goals and Tasks.
+    Goal.clear()
 
-  # Reset backend/plugins state.
-  OptionsInitializer.reset()
+    # Reset backend/plugins state.
+    OptionsInitializer.reset()
@@ -7,6 +7,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import logging
 import os
+import posixpath
 import StringIO
 import subprocess
 import traceback
@@ -308,6 +309,9 @@ class GitRepositoryReader(object):
     self._cat_file_process = None
     # Trees is a dict from path to [list of Dir, Symlink or File objects]
     self._trees = {}
+    # Parsed trees by the spec they were read with, which is a sha for all but top-level trees, so
+    # that identical trees appearing at multiple paths are only read and parsed once.
+    self._trees_by_spec = {}
     self._realpath_cache = {'.': './', '': './'}
 
   def _maybe_start_cat_file_process(self):
@@ -431,6 +435,28 @@ class GitRepositoryReader(object):
       self.name = name
       self.sha = sha
 
+  def prefetch(self, relpath='.'):
+    """Reads and caches every tree below the given directory.
+
+    Trees are read a level at a time, with all of the trees at each level requested from git in a
+    single pipelined batch, so that subsequent walks of the directory do not wait on git for each
+    tree in turn.
+
+    :param string relpath: The directory to prefetch, relative to the repository root.
+    """
+    path = self._safe_realpath(relpath)
+    if not path or not path.endswith('/') or path.startswith('../') or path[0] == '/':
+      return
+
+    # Tree entry names are bytes, so build their paths as bytes as well.
+    level = [ensure_binary(self._fixup_dot_relative(path[:-1]))]
+    while level:
+      self._read_trees(level)
+      level = [posixpath.join(parent, name)
+               for parent in level
+               for name, obj in self._trees[parent].items()
+               if isinstance(obj, self.Dir)]
+
   def listdir(self, relpath):
     """Like os.listdir, but reads from the git repository.
 
@@ -556,53 +582,103 @@ class GitRepositoryReader(object):
 
     :returns: a dict from filename -> [list of Symlink, Dir, and File objects]
     """
-
     path = self._fixup_dot_relative(path)
-
     tree = self._trees.get(path)
-    if tree:
-      return tree
+    if tree is None:
+      self._read_trees([path])
+      tree = self._trees[path]
+    return tree
+
+  def _read_trees(self, paths):
+    """Reads and caches the trees at the given (dot-fixed) paths, in a single batch."""
+    paths = [path for path in paths if path not in self._trees]
+    # Trees below an already-read parent are requested by sha, which saves git from resolving
+    # the path from the root of the revision for each one, and may hit the sha cache entirely.
+    specs = {path: self._tree_spec(path) for path in paths}
+    missing = list({spec for spec in specs.values() if spec not in self._trees_by_spec})
+    for spec, (object_type, tree_data) in zip(missing, self._read_objects_from_repo(missing)):
+      assert object_type == 'tree'
+      self._trees_by_spec[spec] = self._parse_tree(tree_data)
+    for path in paths:
+      self._trees[path] = self._trees_by_spec[specs[path]]
+
+  def _tree_spec(self, path):
+    """Returns the sha of the tree at the given path if its parent has been read.
+
+    Otherwise returns a `rev:path` spec for the tree.
+    """
+    if path:
+      parent_tree = self._trees.get(posixpath.dirname(path))
+      if parent_tree is not None:
+        obj = parent_tree.get(posixpath.basename(path))
+        if isinstance(obj, self.Dir):
+          return obj.sha
+    return '{}:{}'.format(self.rev, path)
+
+  def _parse_tree(self, tree_data):
     tree = {}
-    object_type, tree_data = self._read_object_from_repo(rev=self.rev, relpath=path)
-    assert object_type == 'tree'
     # The tree data here is (mode ' ' filename \0 20-byte-sha)*
     i = 0
     while i < len(tree_data):
-      start = i
-      while tree_data[i] != ' ':
-        i += 1
-      mode = tree_data[start:i]
-      i += 1  # skip space
-      start = i
-      while tree_data[i] != NUL:
-        i += 1
-      name = tree_data[start:i]
-      sha = tree_data[i + 1:i + 1 + GIT_HASH_LENGTH].encode('hex')
-      i += 1 + GIT_HASH_LENGTH
+      space = tree_data.index(SPACE, i)
+      nul = tree_data.index(NUL, space)
+      mode = tree_data[i:space]
+      name = tree_data[space + 1:nul]
+      sha = tree_data[nul + 1:nul + 1 + GIT_HASH_LENGTH].encode('hex')
+      i = nul + 1 + GIT_HASH_LENGTH
       if mode == '120000':
         tree[name] = self.Symlink(name, sha)
       elif mode == '40000':
         tree[name] = self.Dir(name, sha)
       else:
         tree[name] = self.File(name, sha)
-    self._trees[path] = tree
     return tree
 
+  # The most object requests written to git at once. Each request is a short line, so a batch
+  # fits in the pipe buffer and the write cannot block on git blocking on its unread output.
+  _MAX_BATCH_SIZE = 64
+
   def _read_object_from_repo(self, rev=None, relpath=None, sha=None):
     """Read an object from the git repo.
     This is implemented via a pipe to git cat-file --batch
     """
     if sha:
-      spec = sha + '\n'
+      spec = sha
     else:
       assert rev is not None
       assert relpath is not None
       relpath = self._fixup_dot_relative(relpath)
-      spec = '{}:{}\n'.format(rev, relpath)
+      spec = '{}:{}'.format(rev, relpath)
+
+    try:
+      return self._read_objects_from_repo([spec])[0]
+    except self.MissingFileException:
+      raise self.MissingFileException(rev, relpath)
 
+  def _read_objects_from_repo(self, specs):
+    """Read the objects with the given specs (shas or rev:path) from the git repo.
+
+    Requests are pipelined: up to `_MAX_BATCH_SIZE` of them are written to git cat-file --batch
+    before any of the responses are read.
+
+    :returns: A list of (object type, data) tuples, in the order of the given specs.
+    """
     self._maybe_start_cat_file_process()
-    self._cat_file_process.stdin.write(spec)
-    self._cat_file_process.stdin.flush()
+    results = []
+    for start in range(0, len(specs), self._MAX_BATCH_SIZE):
+      batch = specs[start:start + self._MAX_BATCH_SIZE]
+      self._cat_file_process.stdin.write(''.join('{}\n'.format(spec) for spec in batch))
+      self._cat_file_process.stdin.flush()
+      # All responses in the batch are read even if one is missing, to keep the pipe in sync.
+      batch_results = [self._read_object_response(spec) for spec in batch]
+      for spec, result in zip(batch, batch_results):
+        if result is None:
+          raise self.MissingFileException(self.rev, spec)
+      results.extend(batch_results)
+    return results
+
+  def _read_object_response(self, spec):
+    """Reads the response to one request, returning None if the object was missing."""
     header = None
     while not header:
       header = self._cat_file_process.stdout.readline()
@@ -613,7 +689,7 @@ class GitRepositoryReader(object):
     parts = header.rsplit(SPACE, 2)
     if len(parts) == 2:
       assert parts[1] == 'missing'
-      raise self.MissingFileException(rev, relpath)
+      return None
 
     _, object_type, object_len = parts
 
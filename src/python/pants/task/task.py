@@ -14,7 +14,7 @@ from itertools import repeat
 
 from pants.base.exceptions import TaskError
 from pants.base.fingerprint_strategy import TaskIdentityFingerprintStrategy
-from pants.base.worker_pool import Work
+from pants.base.worker_pool import Work, WorkerPool
 from pants.cache.artifact_cache import UnreadableArtifact, call_insert, call_use_cached_files
 from pants.cache.cache_setup import CacheSetup
 from pants.invalidation.build_invalidator import BuildInvalidator, CacheKeyGenerator
@@ -448,6 +448,15 @@ class TaskBase(SubsystemClientMixin, Optionable, AbstractClass):
       self.artifact_cache_writes_enabled()
     )
 
+  @property
+  def results_dir_root(self):
+    """The dir under the workdir that holds the results dirs of this version of the task.
+
+    :API: public
+    """
+    return InvalidationCacheManager.results_dir_root(self.workdir,
+                                                     self.implementation_version_str())
+
   def _maybe_create_results_dirs(self, vts):
     """If `cache_target_dirs`, create results_dirs for the given versioned targets."""
     if self.create_target_dirs:
@@ -509,6 +518,48 @@ class TaskBase(SubsystemClientMixin, Optionable, AbstractClass):
       vt.update()
     return cached_vts, uncached_vts, uncached_causes
 
+  def fetch_cached_artifact(self, cache_key, results_dir=None):
+    """Restores the artifact with the given key from the artifact cache, if we're configured to.
+
+    Unlike `check_artifact_cache`, this is for artifacts that are not keyed by versioned targets.
+
+    :API: public
+
+    :param cache_key: The CacheKey of the artifact.
+    :param string results_dir: The dir to restore the artifact into, or None to restore it to the
+      paths it was stored from.
+    :returns: True if the artifact was restored.
+    """
+    if not self.artifact_cache_reads_enabled():
+      return False
+    read_cache = self._cache_factory.get_read_cache()
+    was_in_cache = call_use_cached_files((read_cache, cache_key, results_dir))
+    if isinstance(was_in_cache, UnreadableArtifact):
+      self._cache_key_errors.add(was_in_cache.key)
+    return bool(was_in_cache)
+
+  def update_artifact_cache_for_keys(self, cache_keys_and_artifactfiles, overwrite=False):
+    """Writes artifacts to the artifact cache under the given keys, if we're configured to.
+
+    Unlike `update_artifact_cache`, this is for artifacts that are not keyed by versioned targets.
+
+    :API: public
+
+    :param cache_keys_and_artifactfiles: A list of pairs of a CacheKey and the list of absolute
+      paths of the artifacts to store under it.
+    :param bool overwrite: True to replace any existing artifacts under the keys.
+    """
+    cache = self._cache_factory.get_write_cache()
+    if not cache or not cache_keys_and_artifactfiles:
+      return
+    overwrite = overwrite or self._cache_factory.overwrite()
+    args_tuples = [(cache, cache_key, artifactfiles,
+                    overwrite or cache_key in self._cache_key_errors)
+                   for cache_key, artifactfiles in cache_keys_and_artifactfiles]
+    self.context.submit_background_work_chain(
+      [Work(lambda x: self.context.subproc_map(call_insert, x), [(args_tuples,)], 'insert')],
+      parent_workunit_name='cache')
+
   def update_artifact_cache(self, vts_artifactfiles_pairs):
     """Write to the artifact cache, if we're configured to.
 
@@ -556,6 +607,43 @@ class TaskBase(SubsystemClientMixin, Optionable, AbstractClass):
     else:
       return None
 
+  @contextmanager
+  def worker_pool(self, name, worker_count):
+    """Yields a pool of the given number of workers, which is shut down when the context exits.
+
+    :API: public
+
+    :param string name: A name for the pool, used to label the workunit that bootstraps it.
+    :param int worker_count: The number of workers in the pool.
+    """
+    with self.context.new_workunit('{}-pool-bootstrap'.format(name)) as workunit:
+      # The pool's workunits are parented to the current workunit rather than to the bootstrap
+      # workunit, so that the workunits of successive pools are reported in order.
+      worker_pool = WorkerPool(workunit.parent, self.context.run_tracker, worker_count)
+    try:
+      yield worker_pool
+    finally:
+      worker_pool.shutdown()
+
+  def map_concurrently(self, name, func, args_tuples, worker_count):
+    """Calls func with each of the given tuples of args, on a pool of up to worker_count workers.
+
+    When there is no more than one worker's worth of work, func is called in the calling thread.
+
+    :API: public
+
+    :param string name: A name for the pool, used to label the workunit that bootstraps it.
+    :param func: The function to call.
+    :param list args_tuples: A tuple of args for each call.
+    :param int worker_count: The maximum number of calls to make concurrently.
+    :returns: The return values of the calls, in the order of their args.
+    """
+    worker_count = min(worker_count, len(args_tuples))
+    if worker_count <= 1:
+      return [func(*args) for args in args_tuples]
+    with self.worker_pool(name, worker_count) as worker_pool:
+      return worker_pool.submit_work_and_wait(Work(func, args_tuples))
+
   def _report_targets(self, prefix, targets, suffix, logger=None):
     logger = logger or self.context.log.info
     logger(
@@ -0,0 +1,91 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class ReadWriteLock(object):
+  """A lock that may be held by many readers at once, or by exactly one writer.
+
+  Writers are preferred: once a writer is waiting, new readers wait behind it, so that a steady
+  stream of readers cannot starve writers. The lock is not re-entrant.
+
+  Example usage:
+    >>> lock = ReadWriteLock()
+    >>> with lock.read_locked() as waited:
+    ...   print('waited {} seconds for the lock'.format(waited))
+  """
+
+  def __init__(self, clock=time):
+    self._clock = clock
+    self._condition = threading.Condition(threading.Lock())
+    self._readers = 0
+    self._writer = False
+    self._waiting_writers = 0
+
+  def acquire_read(self):
+    """Blocks until the lock is held for reading.
+
+    :returns: The number of seconds spent waiting for the lock.
+    """
+    start = self._clock.time()
+    with self._condition:
+      while self._writer or self._waiting_writers:
+        self._condition.wait()
+      self._readers += 1
+    return self._clock.time() - start
+
+  def release_read(self):
+    with self._condition:
+      if self._readers <= 0:
+        raise RuntimeError('Cannot release a read lock that is not held.')
+      self._readers -= 1
+      if not self._readers:
+        self._condition.notify_all()
+
+  def acquire_write(self):
+    """Blocks until the lock is held for writing.
+
+    :returns: The number of seconds spent waiting for the lock.
+    """
+    start = self._clock.time()
+    with self._condition:
+      self._waiting_writers += 1
+      try:
+        while self._writer or self._readers:
+          self._condition.wait()
+      finally:
+        self._waiting_writers -= 1
+      self._writer = True
+    return self._clock.time() - start
+
+  def release_write(self):
+    with self._condition:
+      if not self._writer:
+        raise RuntimeError('Cannot release a write lock that is not held.')
+      self._writer = False
+      self._condition.notify_all()
+
+  @contextmanager
+  def read_locked(self):
+    """Holds the lock for reading for the duration of the context, yielding the time waited."""
+    waited = self.acquire_read()
+    try:
+      yield waited
+    finally:
+      self.release_read()
+
+  @contextmanager
+  def write_locked(self):
+    """Holds the lock for writing for the duration of the context, yielding the time waited."""
+    waited = self.acquire_write()
+    try:
+      yield waited
+    finally:
+      self.release_write()
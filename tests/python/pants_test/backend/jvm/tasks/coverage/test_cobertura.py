@@ -0,0 +1,166 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+from contextlib import contextmanager
+
+from pants.backend.jvm.targets.java_library import JavaLibrary
+from pants.backend.jvm.tasks.classpath_products import ClasspathProducts
+from pants.backend.jvm.tasks.coverage.cobertura import Cobertura, CoberturaTaskSettings
+from pants.task.task import Task
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump, safe_mkdir, touch
+from pants_test.backend.jvm.tasks.coverage.test_base import attrdict, fake_log
+from pants_test.base_test import BaseTest
+from pants_test.tasks.task_test_base import TaskTestBase
+
+
+class FakeVersionedTarget(object):
+  def __init__(self, target, valid, results_dir):
+    self.target = target
+    self.valid = valid
+    self.results_dir = results_dir
+
+
+class FakeInvalidationCheck(object):
+  def __init__(self, all_vts):
+    self.all_vts = all_vts
+    self.invalid_vts = [vt for vt in all_vts if not vt.valid]
+
+
+class TestCobertura(BaseTest):
+
+  def setUp(self):
+    super(TestCobertura, self).setUp()
+    self.valid_target = self.make_target(spec='//foo:valid', target_type=JavaLibrary, sources=[])
+    self.invalid_target = self.make_target(spec='//foo:invalid', target_type=JavaLibrary,
+                                           sources=[])
+    self.java_calls = []
+
+  def _execute_java(self, targets, classpath, main, jvm_options, args, **kwargs):
+    self.java_calls.append((targets, main, args))
+    return 0
+
+  def test_instrumentation_cached_per_target(self):
+    with temporary_dir() as workdir:
+      classes_dirs = {}
+      for target in (self.valid_target, self.invalid_target):
+        classes_dirs[target] = os.path.join(workdir, 'classes', target.id)
+        touch(os.path.join(classes_dirs[target], 'Foo.class'))
+      results_dirs = {target: os.path.join(workdir, 'results', target.id)
+                      for target in (self.valid_target, self.invalid_target)}
+      # The valid target was instrumented by a previous run.
+      touch(os.path.join(results_dirs[self.valid_target], '0', 'Foo.class'))
+      safe_mkdir(results_dirs[self.invalid_target])
+
+      context = self.context(target_roots=[self.valid_target, self.invalid_target])
+      runtime_classpath = context.products.get_data('runtime_classpath',
+                                                    ClasspathProducts.init_func(workdir))
+      for target, classes_dir in classes_dirs.items():
+        runtime_classpath.add_for_target(target, [('default', classes_dir)])
+
+      vts = [FakeVersionedTarget(self.valid_target, True, results_dirs[self.valid_target]),
+             FakeVersionedTarget(self.invalid_target, False, results_dirs[self.invalid_target])]
+
+      @contextmanager
+      def invalidated(targets, invalidate_dependents=False, fingerprint_strategy=None):
+        self.assertEqual({self.valid_target, self.invalid_target}, set(targets))
+        self.assertTrue(invalidate_dependents)
+        self.assertIsNotNone(fingerprint_strategy)
+        yield FakeInvalidationCheck(vts)
+
+      options = attrdict(coverage=True, coverage_jvm_options=[],
+                         coverage_cobertura_include_classes=[],
+                         coverage_cobertura_exclude_classes=[])
+      settings = CoberturaTaskSettings(options, context, workdir,
+                                       tool_classpath=lambda name: [name], confs=None,
+                                       log=fake_log(), invalidated=invalidated,
+                                       task_fingerprint='fingerprint')
+      cobertura = Cobertura(settings)
+      cobertura.instrument([self.valid_target, self.invalid_target], None, self._execute_java)
+
+      # Only the invalid target was copied and instrumented.
+      self.assertTrue(os.path.isfile(os.path.join(results_dirs[self.invalid_target], '0',
+                                                  'Foo.class')))
+      instrument_calls = [call for call in self.java_calls if call[1].endswith('InstrumentMain')]
+      self.assertEqual(1, len(instrument_calls))
+      self.assertEqual([self.invalid_target], instrument_calls[0][0])
+
+      # The datafiles of both targets were merged into the datafile of the run.
+      merge_calls = [call for call in self.java_calls if call[1].endswith('MergeMain')]
+      self.assertEqual(1, len(merge_calls))
+      self.assertEqual(['--datafile', os.path.join(workdir, 'coverage', 'cobertura.ser'),
+                        os.path.join(results_dirs[self.valid_target], 'cobertura.ser'),
+                        os.path.join(results_dirs[self.invalid_target], 'cobertura.ser')],
+                       merge_calls[0][2])
+
+      instrument_classpath = context.products.get_data('instrument_classpath')
+      for target in (self.valid_target, self.invalid_target):
+        self.assertEqual([('default', os.path.join(results_dirs[target], '0'))],
+                         instrument_classpath.get_for_target(target))
+
+
+class InstrumentingTask(Task):
+  """A task whose invalidation Cobertura instruments targets through."""
+
+  @property
+  def cache_target_dirs(self):
+    return True
+
+  def execute(self):
+    pass
+
+
+class TestCoberturaInvalidation(TaskTestBase):
+
+  @classmethod
+  def task_type(cls):
+    return InstrumentingTask
+
+  def setUp(self):
+    super(TestCoberturaInvalidation, self).setUp()
+    self.target = self.make_target(spec='//foo:foo', target_type=JavaLibrary, sources=[])
+    self.classes_dir = os.path.join(self.pants_workdir, 'classes')
+    self.instrumented = []
+
+  def _execute_java(self, targets, classpath, main, jvm_options, args, **kwargs):
+    if main.endswith('InstrumentMain'):
+      self.instrumented.append(targets)
+    return 0
+
+  def _instrument(self):
+    del self.instrumented[:]
+    context = self.context(target_roots=[self.target])
+    runtime_classpath = context.products.get_data('runtime_classpath',
+                                                  ClasspathProducts.init_func(self.pants_workdir))
+    runtime_classpath.add_for_target(self.target, [('default', self.classes_dir)])
+    task = self.create_task(context)
+    options = attrdict(coverage=True, coverage_jvm_options=[],
+                       coverage_cobertura_include_classes=[],
+                       coverage_cobertura_exclude_classes=[])
+    with temporary_dir() as workdir:
+      settings = CoberturaTaskSettings(options, context, workdir,
+                                       tool_classpath=lambda name: [name], confs=None,
+                                       log=fake_log(), invalidated=task.invalidated,
+                                       task_fingerprint=task.fingerprint)
+      Cobertura(settings).instrument([self.target], None, self._execute_java)
+    instrument_classpath = context.products.get_data('instrument_classpath')
+    (_, instrumented_dir), = instrument_classpath.get_for_target(self.target)
+    with open(os.path.join(instrumented_dir, 'Foo.class')) as fp:
+      return self.instrumented, fp.read()
+
+  def test_cache_hit_and_invalidation(self):
+    safe_file_dump(os.path.join(self.classes_dir, 'Foo.class'), 'v1')
+    self.assertEqual(([[self.target]], 'v1'), self._instrument())
+
+    # The classes are unchanged, so their instrumentation is reused.
+    self.assertEqual(([], 'v1'), self._instrument())
+
+    # Changing the compiled classes of the target invalidates its instrumentation.
+    safe_file_dump(os.path.join(self.classes_dir, 'Foo.class'), 'v2')
+    self.assertEqual(([[self.target]], 'v2'), self._instrument())
+    self.assertEqual(([], 'v2'), self._instrument())
@@ -0,0 +1,75 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+
+from pants.backend.jvm.tasks.jvm_compile.classes_by_source import (ClassesBySource,
+                                                                   ClassesBySourceIndex)
+from pants.util.contextutil import temporary_dir
+
+
+class ClassesBySourceIndexTest(unittest.TestCase):
+  def test_lookup(self):
+    with temporary_dir() as workdir:
+      classes_dir = os.path.join(workdir, 'classes')
+      index = ClassesBySourceIndex(os.path.join(workdir, 'index'))
+      self.assertIsNone(index.lookup(['a/A.java'], 'stamp'))
+
+      index.write({'a/A.java': [os.path.join(classes_dir, 'a/A.class'),
+                                os.path.join(classes_dir, 'a/A$1.class')],
+                   'a/AB.java': [os.path.join(classes_dir, 'a/AB.class')],
+                   'b/B.java': []},
+                  classes_dir,
+                  'stamp')
+
+      self.assertEqual({'a/A.java': ['a/A.class', 'a/A$1.class'],
+                        'b/B.java': [],
+                        'c/C.java': []},
+                       index.lookup(['a/A.java', 'b/B.java', 'c/C.java'], 'stamp'))
+      self.assertIsNone(index.lookup(['a/A.java'], 'other-stamp'))
+
+  def test_lookup_many(self):
+    with temporary_dir() as workdir:
+      classes_dir = os.path.join(workdir, 'classes')
+      index = ClassesBySourceIndex(os.path.join(workdir, 'index'))
+      classes_by_source = {'s/S{}.java'.format(i): [os.path.join(classes_dir,
+                                                                  's/S{}.class'.format(i))]
+                           for i in range(0, 200, 2)}
+      index.write(classes_by_source, classes_dir, 'stamp')
+
+      sources = ['s/S{}.java'.format(i) for i in range(-1, 201)] + ['a.java', 't.java', 's/S1']
+      expected = {source: [os.path.relpath(cls, classes_dir)
+                           for cls in classes_by_source.get(source, [])]
+                  for source in sources}
+      self.assertEqual(expected, index.lookup(sources, 'stamp'))
+
+
+class ClassesBySourceTest(unittest.TestCase):
+  def test_loads_lazily(self):
+    lookups = []
+
+    def lookup(sources):
+      lookups.append(sorted(sources))
+      return {'a/A.java': ['a/A.class']}
+
+    classes_by_source = ClassesBySource()
+    classes_by_source.add_index(['a/A.java', 'a/B.java'], '/classes', lookup)
+    classes_by_source['c/C.java'].add_rel_paths('/other', ['c/C.class'])
+    self.assertEqual([], lookups)
+
+    self.assertIn('a/A.java', classes_by_source)
+    self.assertEqual([], lookups)
+
+    self.assertEqual([('/classes', ['a/A.class'])],
+                     list(classes_by_source.get('a/A.java').rel_paths()))
+    self.assertEqual([['a/A.java']], lookups)
+
+    self.assertEqual({'a/A.java', 'a/B.java', 'c/C.java'}, set(classes_by_source.keys()))
+    self.assertEqual([['a/A.java'], ['a/B.java']], lookups)
+    self.assertFalse(classes_by_source['a/B.java'])
+    self.assertIsNone(classes_by_source.get('d/D.java'))
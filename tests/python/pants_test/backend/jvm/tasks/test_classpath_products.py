@@ -72,6 +72,22 @@ class ClasspathProductsTest(BaseTest):
     self.assertEqual([('default', self.path('a/path')), ('default', self.path('b/path'))],
                      copied.get_for_targets(a_closure))
 
+  def test_entries_interned(self):
+    b = self.make_target('b', JvmTarget)
+    a = self.make_target('a', JvmTarget, dependencies=[b])
+
+    classpath_product = ClasspathProducts(self.pants_workdir)
+    self.add_jar_classpath_element_for_path(classpath_product, a, self._example_jar_path())
+    classpath_product.add_for_target(a, [('default', self.path('shared/path'))])
+    copied = classpath_product.copy()
+    copied.add_for_target(b, [('default', self.path('shared/path'))])
+    self.add_jar_classpath_element_for_path(copied, b, self._example_jar_path())
+
+    (_, a_jar), (_, a_dir) = copied.get_classpath_entries_for_targets([a])
+    (_, b_dir), (_, b_jar) = copied.get_classpath_entries_for_targets([b])
+    self.assertIs(a_jar, b_jar)
+    self.assertIs(a_dir, b_dir)
+
   def test_fails_if_paths_outside_buildroot(self):
     a = self.make_target('a', JvmTarget)
 
@@ -263,6 +279,26 @@ class ClasspathProductsTest(BaseTest):
 
     self.assertEqual([('default', example_jar_path)], classpath)
 
+  def test_custom_classpath_entry_excludes(self):
+    class ExcludableClasspathEntry(ClasspathEntry):
+      def is_excluded_by(self, excludes):
+        return any(exclude.org == 'com.example' for exclude in excludes)
+
+    b = self.make_target('b', JvmTarget, excludes=[Exclude('com.example')])
+    a = self.make_target('a', JvmTarget, dependencies=[b])
+
+    classpath_product = ClasspathProducts(self.pants_workdir)
+    classpath_product.add_excludes_for_targets([a, b])
+    classpath_product._add_elements_for_target(
+      a, [('default', ExcludableClasspathEntry(self.path('a/excluded.jar'))),
+          ('default', ClasspathEntry(self.path('a/included.jar')))])
+
+    self.assertEqual([('default', self.path('a/included.jar'))],
+                     classpath_product.get_for_target(a))
+    self.assertEqual([self.path('a/excluded.jar'), self.path('a/included.jar')],
+                     [entry.path for _, entry in classpath_product.get_classpath_entries_for_targets(
+                       [a], respect_excludes=False)])
+
   def test_jar_missing_pants_path_fails_adding(self):
     b = self.make_target('b', JvmTarget)
 
@@ -87,7 +87,7 @@ class TestConsolidateClasspath(JvmBinaryTaskTestBase):
     )
     found_files = [os.path.basename(f) for f in self.iter_files(task_dir)]
     self.assertEquals(
-      sorted(['output-0.jar', 'Foo.class', 'foo.txt', 'file']),
+      sorted(['output-0.jar', 'output-0.jar.index', 'Foo.class', 'foo.txt', 'file']),
       sorted(found_files)
     )
 
@@ -112,7 +112,7 @@ class TestConsolidateClasspath(JvmBinaryTaskTestBase):
     )
     found_files = [os.path.basename(f) for f in self.iter_files(task_dir)]
     self.assertEquals(
-      sorted(['output-0.jar', 'Foo.class', 'foo.txt', 'file']),
+      sorted(['output-0.jar', 'output-0.jar.index', 'Foo.class', 'foo.txt', 'file']),
       sorted(found_files)
     )
 
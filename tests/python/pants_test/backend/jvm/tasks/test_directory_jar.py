@@ -0,0 +1,120 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import re
+import unittest
+import zipfile
+
+from pants.backend.jvm.tasks.directory_jar import DirectoryJar
+from pants.util.contextutil import open_zip, temporary_dir
+from pants.util.dirutil import safe_delete, safe_file_dump, touch
+
+
+class DirectoryJarTest(unittest.TestCase):
+
+  def setUp(self):
+    self.classes_dir = self._temporary_dir()
+    self.jar_path = os.path.join(self._temporary_dir(), 'z.jar')
+    self.directory_jar = DirectoryJar(self.classes_dir, self.jar_path)
+
+  def _temporary_dir(self):
+    context = temporary_dir()
+    path = context.__enter__()
+    self.addCleanup(context.__exit__, None, None, None)
+    return path
+
+  def _write_class(self, relpath, content, mtime):
+    path = os.path.join(self.classes_dir, relpath)
+    safe_file_dump(path, content)
+    touch(path, (mtime, mtime))
+
+  def _jar_contents(self):
+    with open_zip(self.jar_path, 'r') as jar:
+      self.assertIsNone(jar.testzip())
+      self.assertEqual({zipfile.ZIP_STORED}, {info.compress_type for info in jar.infolist()})
+      return {name: jar.read(name) for name in jar.namelist()}
+
+  def test_update(self):
+    self._write_class('org/pantsbuild/A.class', 'A', 1500000000)
+    self._write_class('org/pantsbuild/B.class', 'B', 1500000000)
+
+    self.assertEqual(2, self.directory_jar.update())
+    self.assertEqual({'org/': b'',
+                      'org/pantsbuild/': b'',
+                      'org/pantsbuild/A.class': b'A',
+                      'org/pantsbuild/B.class': b'B'},
+                     self._jar_contents())
+
+  def test_update_incremental(self):
+    self._write_class('org/pantsbuild/A.class', 'A', 1500000000)
+    self._write_class('org/pantsbuild/B.class', 'B', 1500000000)
+    self._write_class('org/pantsbuild/C.class', 'C', 1500000000)
+    self.directory_jar.update()
+
+    self.assertEqual(0, self.directory_jar.update())
+
+    self._write_class('org/pantsbuild/A.class', 'A2', 1500000100)
+    safe_delete(os.path.join(self.classes_dir, 'org/pantsbuild/B.class'))
+    self._write_class('org/pantsbuild/D.class', 'D', 1500000100)
+
+    self.assertEqual(2, self.directory_jar.update())
+    self.assertEqual({'org/': b'',
+                      'org/pantsbuild/': b'',
+                      'org/pantsbuild/A.class': b'A2',
+                      'org/pantsbuild/C.class': b'C',
+                      'org/pantsbuild/D.class': b'D'},
+                     self._jar_contents())
+
+  def test_update_rereads_all_without_index(self):
+    self._write_class('org/pantsbuild/A.class', 'A', 1500000000)
+    self.directory_jar.update()
+    safe_delete('{}.index'.format(self.jar_path))
+
+    self.assertEqual(1, self.directory_jar.update())
+    self.assertEqual(b'A', self._jar_contents()['org/pantsbuild/A.class'])
+
+  def test_update_rereads_all_with_corrupt_jar(self):
+    self._write_class('org/pantsbuild/A.class', 'A', 1500000000)
+    self.directory_jar.update()
+    safe_file_dump(self.jar_path, 'not a jar')
+
+    self.assertEqual(1, self.directory_jar.update())
+    self.assertEqual(b'A', self._jar_contents()['org/pantsbuild/A.class'])
+
+  def test_skip_patterns(self):
+    self._write_class('org/pantsbuild/A.class', 'A', 1500000000)
+    self._write_class('META-INF/SIGNED.SF', 'signature', 1500000000)
+    directory_jar = DirectoryJar(self.classes_dir, self.jar_path,
+                                 skip_patterns=[re.compile(r'^META-INF/[^/]+\.SF$')])
+
+    self.assertEqual(1, directory_jar.update())
+    self.assertEqual({'META-INF/': b'',
+                      'org/': b'',
+                      'org/pantsbuild/': b'',
+                      'org/pantsbuild/A.class': b'A'},
+                     self._jar_contents())
+
+  def test_default_manifest(self):
+    self._write_class('org/pantsbuild/A.class', 'A', 1500000000)
+    DirectoryJar(self.classes_dir, self.jar_path, write_manifest=True).update()
+
+    with open_zip(self.jar_path, 'r') as jar:
+      self.assertEqual('META-INF/MANIFEST.MF', jar.namelist()[0])
+    self.assertEqual(b'Manifest-Version: 1.0\nCreated-By: pants\n',
+                     self._jar_contents()['META-INF/MANIFEST.MF'])
+
+  def test_directory_manifest(self):
+    self._write_class('META-INF/MANIFEST.MF', 'Created-By: me\nMain-Class: org.pantsbuild.A\n\n'
+                                              'Name: org/pantsbuild/A.class\nManifest-Version: 2\n',
+                      1500000000)
+    directory_jar = DirectoryJar(self.classes_dir, self.jar_path, write_manifest=True)
+
+    self.assertEqual(0, directory_jar.update())
+    self.assertEqual(b'Manifest-Version: 1.0\nCreated-By: me\nMain-Class: org.pantsbuild.A\n\n'
+                     b'Name: org/pantsbuild/A.class\nManifest-Version: 2\n',
+                     self._jar_contents()['META-INF/MANIFEST.MF'])
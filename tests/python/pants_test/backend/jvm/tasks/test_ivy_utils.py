@@ -5,26 +5,32 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import hashlib
 import json
 import os
+import unittest
 import xml.etree.ElementTree as ET
 from collections import namedtuple
 from textwrap import dedent
 
 from twitter.common.collections import OrderedSet
 
-from pants.backend.jvm.ivy_utils import (FrozenResolution, IvyFetchStep, IvyInfo, IvyModule,
-                                         IvyModuleRef, IvyResolveMappingError, IvyResolveResult,
-                                         IvyResolveStep, IvyUtils)
+from pants.backend.jvm.ivy_utils import (FrozenResolution, IvyArtifactFetcher, IvyFetchStep,
+                                         IvyInfo, IvyModule, IvyModuleRef, IvyResolutionCache,
+                                         IvyResolveMappingError, IvyResolveResult, IvyResolveStep,
+                                         IvyUtils)
 from pants.backend.jvm.jar_dependency_utils import M2Coordinate
 from pants.backend.jvm.register import build_file_aliases as register_jvm
-from pants.backend.jvm.subsystems.jar_dependency_management import JarDependencyManagement
+from pants.backend.jvm.subsystems.jar_dependency_management import (JarDependencyManagement,
+                                                                    PinnedJarArtifactSet)
 from pants.backend.jvm.targets.exclude import Exclude
 from pants.backend.jvm.targets.jar_dependency import JarDependency
 from pants.backend.jvm.targets.jar_library import JarLibrary
 from pants.build_graph.register import build_file_aliases as register_core
 from pants.ivy.ivy_subsystem import IvySubsystem
+from pants.net.http.fetcher import Fetcher
 from pants.util.contextutil import temporary_dir, temporary_file, temporary_file_path
+from pants.util.dirutil import safe_file_dump
 from pants_test.base_test import BaseTest
 from pants_test.subsystem.subsystem_util import init_subsystem
 
@@ -633,6 +639,145 @@ class IvyUtilsResolveStepsTest(BaseTest):
     return os.path.join('tests/python/pants_test/backend/jvm/tasks', rel_path)
 
 
+class IvyResolutionCacheTest(BaseTest):
+  def key_for(self, jars, excludes=(), confs=('default',)):
+    return IvyResolutionCache.key_for(jars, excludes, confs, None, None, 'ivy_cache_dir', 'id')
+
+  def test_key_normalizes_excludes_and_confs(self):
+    jars = [JarDependency('org1', 'name1', rev='1.0')]
+    excludes = [Exclude('org2', 'name2'), Exclude('org3', 'name3')]
+    self.assertEqual(self.key_for(jars, excludes, ('default', 'sources')),
+                     self.key_for(jars, reversed(excludes), ('sources', 'default')))
+    self.assertNotEqual(self.key_for(jars, excludes), self.key_for(jars))
+    self.assertNotEqual(self.key_for(jars), self.key_for(jars, confs=('default', 'sources')))
+    self.assertNotEqual(self.key_for(jars),
+                        self.key_for([JarDependency('org1', 'name1', rev='1.1')]))
+
+  def test_no_key_for_mutable_or_dynamic_jars(self):
+    for rev in ('1.0-SNAPSHOT', 'latest.integration', '1.+', '[1.0,2.0)', ']1.0,2.0]', None):
+      self.assertIsNone(self.key_for([JarDependency('org1', 'name1', rev=rev)]), rev)
+    self.assertIsNone(self.key_for([JarDependency('org1', 'name1', rev='1.0', mutable=True)]))
+    self.assertIsNotNone(self.key_for([JarDependency('org1', 'name1', rev='1.0')]))
+
+  def test_no_key_for_dynamic_pinned_revs(self):
+    jars = [JarDependency('org1', 'name1')]
+
+    def key_for(pinned_rev):
+      pinned = PinnedJarArtifactSet([M2Coordinate('org1', 'name1', rev=pinned_rev)])
+      return IvyResolutionCache.key_for(jars, (), ('default',), pinned, None, 'ivy_cache_dir', 'id')
+
+    self.assertIsNotNone(key_for('1.0'))
+    self.assertIsNone(key_for('1.0-SNAPSHOT'))
+
+  def test_store_and_restore(self):
+    with temporary_dir() as workdir:
+      cache = IvyResolutionCache(os.path.join(workdir, 'resolution-cache'))
+      first = IvyResolveStep(['default'], 'first', None, False, 'ivy_cache_dir', workdir)
+      safe_file_dump(first.ivy_cache_classpath_filename, 'a.jar:b.jar')
+      safe_file_dump(first.resolve_report_path('default'), '<ivy-report/>')
+      cache.store('key', first)
+
+      second = IvyResolveStep(['default'], 'second', None, False, 'ivy_cache_dir', workdir)
+      self.assertFalse(cache.restore('other-key', second))
+      self.assertTrue(cache.restore('key', second))
+      self.assertTrue(second.required_load_files_exist())
+      with open(second.ivy_cache_classpath_filename) as fp:
+        self.assertEqual('a.jar:b.jar', fp.read())
+
+      self.assertFalse(cache.restore('key', IvyResolveStep(['default', 'sources'], 'third', None,
+                                                           False, 'ivy_cache_dir', workdir)))
+
+
+class IvyArtifactFetcherTest(unittest.TestCase):
+  class FakeFetcher(Fetcher):
+    def __init__(self, contents):
+      super(IvyArtifactFetcherTest.FakeFetcher, self).__init__('/')
+      self.contents = contents
+
+    def fetch(self, url, listener, chunk_size_bytes=None, timeout_secs=None):
+      if url not in self.contents:
+        raise self.PermanentError('Not found: {}'.format(url), response_code=404)
+      listener.status(200)
+      listener.recv_chunk(self.contents[url])
+      listener.finished()
+
+  def write_report(self, path, artifacts):
+    artifact_elements = ''.join(
+      dedent('''
+        <module organisation="org" name="{name}">
+          <revision name="1.0">
+            <artifacts>
+              <artifact location="{location}">
+                <origin-location is-local="false" location="{url}"/>
+              </artifact>
+            </artifacts>
+          </revision>
+        </module>
+        ''').format(name=name, location=location, url=url)
+      for name, location, url in artifacts)
+    safe_file_dump(path, '<ivy-report><dependencies>{}</dependencies></ivy-report>'
+                         .format(artifact_elements))
+
+  def test_fetch_missing(self):
+    with temporary_dir() as cache_dir:
+      present = os.path.join(cache_dir, 'present.jar')
+      safe_file_dump(present, 'present')
+      verified = os.path.join(cache_dir, 'verified.jar')
+      unverified = os.path.join(cache_dir, 'unverified.jar')
+      corrupt = os.path.join(cache_dir, 'corrupt.jar')
+      unavailable = os.path.join(cache_dir, 'unavailable.jar')
+      report = os.path.join(cache_dir, 'report.xml')
+      self.write_report(report, [
+        ('present', present, 'http://repo/present.jar'),
+        ('verified', verified, 'http://repo/verified.jar'),
+        ('unverified', unverified, 'http://repo/unverified.jar'),
+        ('corrupt', corrupt, 'http://repo/corrupt.jar'),
+        ('unavailable', unavailable, 'http://repo/unavailable.jar'),
+      ])
+      fetcher = self.FakeFetcher({
+        'http://repo/verified.jar': b'verified',
+        'http://repo/verified.jar.sha1': hashlib.sha1(b'verified').hexdigest().encode('utf-8'),
+        'http://repo/unverified.jar': b'unverified',
+        'http://repo/corrupt.jar': b'corrupt',
+        'http://repo/corrupt.jar.sha1': hashlib.sha1(b'other').hexdigest().encode('utf-8'),
+      })
+
+      self.assertEqual([verified, unverified, corrupt, unavailable],
+                       list(IvyArtifactFetcher.missing_artifacts([report])))
+      artifacts_dir = os.path.join(cache_dir, 'fetched')
+      artifact_fetcher = IvyArtifactFetcher(4, artifacts_dir, fetcher=fetcher)
+      fetched = artifact_fetcher.fetch_missing([report])
+      self.assertEqual([verified, unverified], list(fetched))
+      with open(fetched[verified], 'rb') as fp:
+        self.assertEqual(b'verified', fp.read())
+      self.assertTrue(os.path.isfile(fetched[unverified]))
+      self.assertTrue(all(path.startswith(artifacts_dir) for path in fetched.values()))
+
+      # Nothing is written to the ivy cache, and fetched artifacts are not fetched again.
+      self.assertFalse(any(os.path.exists(path)
+                           for path in (verified, unverified, corrupt, unavailable)))
+      self.assertEqual(fetched, IvyArtifactFetcher(4, artifacts_dir, fetcher=self.FakeFetcher({}))
+                       .fetch_missing([report]))
+
+  def test_relocate(self):
+    with temporary_dir() as cache_dir:
+      moved = os.path.join(cache_dir, 'moved.jar')
+      kept = os.path.join(cache_dir, 'kept.jar')
+      report = os.path.join(cache_dir, 'report.xml')
+      self.write_report(report, [('moved', moved, 'http://repo/moved.jar'),
+                                 ('kept', kept, 'http://repo/kept.jar')])
+      classpath = os.path.join(cache_dir, 'classpath.raw')
+      safe_file_dump(classpath, os.pathsep.join([moved, kept]))
+
+      IvyArtifactFetcher.relocate({moved: '/fetched/moved.jar'}, [report], classpath)
+
+      self.assertEqual(['/fetched/moved.jar', kept],
+                       IvyUtils._load_classpath_from_cachepath(classpath))
+      locations = [artifact.get('location') for artifact in
+                   ET.parse(report).getroot().iter('artifact')]
+      self.assertEqual(['/fetched/moved.jar', kept], locations)
+
+
 class IvyFrozenResolutionTest(BaseTest):
 
   def test_spec_without_a_real_target(self):
@@ -7,13 +7,14 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import os
 import subprocess
+import unittest
 from textwrap import dedent
 
 from mock import patch
 
 from pants.backend.jvm.subsystems.junit import JUnit
 from pants.backend.jvm.targets.junit_tests import JUnitTests
-from pants.backend.jvm.tasks.junit_run import JUnitRun
+from pants.backend.jvm.tasks.junit_run import JUnitRun, _TestBatchQueue
 from pants.backend.python.targets.python_tests import PythonTests
 from pants.base.exceptions import TargetDefinitionException, TaskError
 from pants.build_graph.build_file_aliases import BuildFileAliases
@@ -410,3 +411,31 @@ class JUnitRunnerTest(JvmToolTaskTestBase):
     self.set_options(max_subprocess_args=max_subprocess_args)
 
     self._execute_junit_runner(list_of_filename_content_tuples, target_name='foo:foo_test')
+
+
+class TestBatchQueueTest(unittest.TestCase):
+
+  def _drain(self, queue):
+    return list(iter(queue.next_batch, None))
+
+  def test_batches_shrink_as_queue_drains(self):
+    queue = _TestBatchQueue([('props', range(20))], worker_count=2, max_batch_size=100)
+    self.assertEqual(20, queue.test_count)
+    batches = self._drain(queue)
+    self.assertEqual([5, 4, 3, 2, 2, 1, 1, 1, 1], [len(tests) for _, tests in batches])
+    self.assertEqual(range(20), [test for _, tests in batches for test in tests])
+
+  def test_max_batch_size(self):
+    queue = _TestBatchQueue([('props', range(20))], worker_count=1, max_batch_size=3)
+    self.assertTrue(all(len(tests) <= 3 for _, tests in self._drain(queue)))
+
+  def test_batches_do_not_mix_properties(self):
+    queue = _TestBatchQueue([('a', range(3)), ('b', []), ('c', range(3, 5))],
+                            worker_count=1, max_batch_size=100)
+    self.assertEqual([('a', [0, 1, 2]), ('c', [3]), ('c', [4])], self._drain(queue))
+
+  def test_close(self):
+    queue = _TestBatchQueue([('props', range(20))], worker_count=2, max_batch_size=100)
+    self.assertIsNotNone(queue.next_batch())
+    queue.close()
+    self.assertIsNone(queue.next_batch())
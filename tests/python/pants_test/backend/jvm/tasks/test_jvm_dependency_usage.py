@@ -5,8 +5,11 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import json
 import os
 
+import mock
+
 from pants.backend.jvm.targets.java_library import JavaLibrary
 from pants.backend.jvm.tasks.classpath_products import ClasspathProducts
 from pants.backend.jvm.tasks.jvm_dependency_analyzer import JvmDependencyAnalyzer
@@ -193,3 +196,74 @@ class TestJvmDependencyUsage(TaskTestBase):
     product_deps_by_src[t2] = {'b.java': ['a.class']}
 
     dep_usage.create_dep_usage_graph([t1, t2])
+
+  def _setup_incremental(self):
+    t1 = self.make_java_target(spec=':t1', sources=['a.java'])
+    self.create_file('a.java')
+    t2 = self.make_java_target(spec=':t2', sources=['b.java'], dependencies=[t1])
+    self.create_file('b.java')
+    self.set_options(size_estimator='filecount')
+    dep_usage, product_deps_by_src = self._setup({
+        t1: ['a.class'],
+        t2: ['b.class'],
+      })
+    product_deps_by_src[t1] = {}
+    product_deps_by_src[t2] = {'b.java': ['a.class']}
+    return dep_usage, t1, t2
+
+  def test_valid_nodes_reused(self):
+    dep_usage, t1, t2 = self._setup_incremental()
+    graph = dep_usage.create_dep_usage_graph([t1, t2])
+    self.assertEqual(1, len(graph._nodes[t2].dep_edges[t1].products_used))
+
+    with mock.patch.object(JvmDependencyUsage, 'create_dep_usage_node') as create_dep_usage_node:
+      graph = dep_usage.create_dep_usage_graph([t1, t2])
+      self.assertFalse(create_dep_usage_node.called)
+    self.assertEqual(1, graph._nodes[t1].products_total)
+    self.assertTrue(graph._nodes[t2].dep_edges[t1].is_declared)
+    self.assertEqual(1, len(graph._nodes[t2].dep_edges[t1].products_used))
+
+  def _recompute(self, dep_usage, targets):
+    """Creates the graph for the given targets, returning the targets whose nodes were computed."""
+    computed = []
+    create_dep_usage_node = dep_usage.create_dep_usage_node
+    def recording_create_dep_usage_node(target, *args):
+      computed.append(target)
+      return create_dep_usage_node(target, *args)
+    with mock.patch.object(dep_usage, 'create_dep_usage_node', recording_create_dep_usage_node):
+      dep_usage.create_dep_usage_graph(targets)
+    return set(computed)
+
+  def test_missing_nodes_recomputed(self):
+    dep_usage, t1, t2 = self._setup_incremental()
+    dep_usage.create_dep_usage_graph([t1, t2])
+
+    for root, _, files in os.walk(dep_usage.workdir):
+      if 'node.json' in files:
+        with open(os.path.join(root, 'node.json')) as fp:
+          if json.load(fp)['target'] == t1.address.spec:
+            os.unlink(os.path.join(root, 'node.json'))
+    self.assertEqual({t1}, self._recompute(dep_usage, [t1, t2]))
+
+  def test_nodes_recomputed_when_resolved_jars_change(self):
+    dep_usage, t1, t2 = self._setup_incremental()
+    dep_usage.create_dep_usage_graph([t1, t2])
+
+    with mock.patch.object(dep_usage, '_resolved_jars_fingerprint', return_value='changed'):
+      self.assertEqual({t1, t2}, self._recompute(dep_usage, [t1, t2]))
+
+  def test_to_json(self):
+    dep_usage, t1, t2 = self._setup_incremental()
+    graph = dep_usage.create_dep_usage_graph([t1, t2])
+    chunks = list(graph.to_json())
+    # A chunk per node, plus the opening and closing chunks.
+    self.assertEqual(4, len(chunks))
+    output = json.loads(''.join(chunks))
+    self.assertEqual({t1.address.spec, t2.address.spec}, set(output))
+    self.assertEqual(1, output[t1.address.spec]['products_total'])
+    self.assertEqual([{'aliases': [],
+                       'dependency_type': 'declared',
+                       'products_used': 1,
+                       'products_used_ratio': 1.0,
+                       'target': t1.address.spec}],
+                     output[t2.address.spec]['dependencies'])
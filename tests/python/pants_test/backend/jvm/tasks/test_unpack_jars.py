@@ -10,12 +10,15 @@ import os
 import unittest
 from contextlib import contextmanager
 
+import mock
+
 from pants.backend.jvm.jar_dependency_utils import M2Coordinate
 from pants.backend.jvm.targets.jar_dependency import JarDependency
 from pants.backend.jvm.targets.jar_library import JarLibrary
 from pants.backend.jvm.targets.unpacked_jars import UnpackedJars
 from pants.backend.jvm.tasks.jar_import_products import JarImportProducts
 from pants.backend.jvm.tasks.unpack_jars import UnpackJars, UnpackJarsFingerprintStrategy
+from pants.fs.archive import ZIP
 from pants.util.contextutil import open_zip, temporary_dir
 from pants.util.dirutil import safe_walk
 from pants_test.tasks.task_test_base import TaskTestBase
@@ -168,3 +171,80 @@ class UnpackJarsTest(TaskTestBase):
       self.assertEquals([foo_target], unpacked_targets)
 
       # TODO(Eric Ayers) Check the 'unpacked_archives' product
+
+  def test_combined_patterns(self):
+    unpack_filter = UnpackJars.calculate_unpack_filter(includes=['**/*.java', 'a/*.proto'],
+                                                       excludes=['**/Foo*', 'b/**'])
+    self.assertTrue(unpack_filter('c/Bar.java'))
+    self.assertTrue(unpack_filter('a/bar.proto'))
+    self.assertFalse(unpack_filter('a/b/bar.proto'))
+    self.assertFalse(unpack_filter('c/Foo.java'))
+    self.assertFalse(unpack_filter('b/Bar.java'))
+
+  def test_shared_extraction(self):
+    with self.sample_jarfile() as jar_filename:
+      coord = self._make_coord(rev='0.0.1')
+      jar_library = self._make_jar_library(coord)
+
+      def make_unpacked_jars(name, include_patterns):
+        return self.make_target(spec='unpack:{}'.format(name),
+                                target_type=UnpackedJars,
+                                libraries=[jar_library.address.spec],
+                                include_patterns=include_patterns)
+
+      protos = make_unpacked_jars('protos', ['**/*.proto'])
+      more_protos = make_unpacked_jars('more_protos', ['**/*.proto'])
+      texts = make_unpacked_jars('texts', ['**/*.txt'])
+
+      unpack_task = self.create_task(self.context(target_roots=[protos, more_protos, texts]))
+      for target in (protos, more_protos, texts):
+        self._add_dummy_product(unpack_task, target, jar_filename, coord)
+      with mock.patch.object(ZIP, 'extract', wraps=ZIP.extract) as extract:
+        self.assertEquals({protos, more_protos, texts}, set(unpack_task.execute()))
+        # The jar is extracted once, whatever the patterns of the targets that import it.
+        self.assertEquals(1, extract.call_count)
+
+      unpacked_archives = unpack_task.context.products.get_data('unpacked_archives')
+      self.assertEquals([['a/b/c/foo.proto'], os.path.relpath(unpack_task._unpack_dir(protos),
+                                                              self.build_root)],
+                        unpacked_archives[protos])
+      self.assertEquals(['a/b/c/foo.proto'], unpacked_archives[more_protos][0])
+      self.assertEquals(['a/b/c/data.txt'], unpacked_archives[texts][0])
+      with open(os.path.join(unpack_task._unpack_dir(texts), 'a/b/c/data.txt')) as fp:
+        self.assertEquals('Foo text', fp.read())
+
+      # The whole jar is extracted into the cache, and the unpacked files are copies.
+      extracted_files = [os.path.join(root, f)
+                         for root, _, files in safe_walk(unpack_task._extracted_jars_dir)
+                         for f in files]
+      self.assertEquals(['data.txt', 'foo.proto'],
+                        sorted(os.path.basename(f) for f in extracted_files))
+      unpacked_proto = os.path.join(unpack_task._unpack_dir(protos), 'a/b/c/foo.proto')
+      extracted_proto = [f for f in extracted_files if f.endswith('.proto')][0]
+      self.assertFalse(os.path.samefile(unpacked_proto, extracted_proto))
+
+  def test_has_collisions(self):
+    self.assertFalse(UnpackJars._has_collisions([]))
+    self.assertFalse(UnpackJars._has_collisions(['a/B.class', 'a/C.class', 'LICENSE']))
+    self.assertTrue(UnpackJars._has_collisions(['LICENSE', 'LICENSE/NOTICE']))
+    self.assertTrue(UnpackJars._has_collisions(['license/NOTICE', 'LICENSE']))
+    self.assertTrue(UnpackJars._has_collisions(['a/Foo.class', 'a/foo.class']))
+    self.assertTrue(UnpackJars._has_collisions(['A/b.class', 'a/c.class']))
+
+  def test_extract_skips_colliding_entries(self):
+    with temporary_dir() as temp_dir:
+      jar_name = os.path.join(temp_dir, 'license.jar')
+      with open_zip(jar_name, 'w') as jarfile:
+        jarfile.writestr('LICENSE', 'license')
+        jarfile.writestr('license/NOTICE', 'notice')
+        jarfile.writestr('a/A.proto', 'message A {}')
+      coord = self._make_coord(rev='0.0.1')
+      target = self._make_unpacked_jar(coord, include_patterns=['**/*.proto'])
+      unpack_task = self.create_task(self.context(target_roots=[target]))
+      self._add_dummy_product(unpack_task, target, jar_name, coord)
+
+      self.assertEquals([target], unpack_task.execute())
+      unpacked_archives = unpack_task.context.products.get_data('unpacked_archives')
+      self.assertEquals(['a/A.proto'], unpacked_archives[target][0])
+      # The jar is not extracted into the cache.
+      self.assertFalse(os.path.exists(unpack_task._extracted_jars_dir))
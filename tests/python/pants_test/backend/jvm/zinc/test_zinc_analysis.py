@@ -11,7 +11,7 @@ import unittest
 
 from pants.backend.jvm.tasks.jvm_compile.analysis_tools import AnalysisTools
 from pants.backend.jvm.zinc.zinc_analysis_element import ZincAnalysisElement
-from pants.backend.jvm.zinc.zinc_analysis_parser import ZincAnalysisParser
+from pants.backend.jvm.zinc.zinc_analysis_parser import ZincAnalysisParser, _Rebaser
 from pants.util.contextutil import environment_as
 
 
@@ -53,6 +53,26 @@ class ZincAnalysisTestSimple(unittest.TestCase):
           'org/pantsbuild/example/hello/welcome/WelcomeEverybody$.class',
         ])
 
+  def test_localize(self):
+    def get_analysis_text(name):
+      with open(os.path.join(os.path.dirname(__file__), 'testdata', 'simple', name), 'rb') as fp:
+        return fp.read()
+
+    def localize(analysis_file):
+      rebase_mappings = {AnalysisTools._PANTS_BUILDROOT_PLACEHOLDER: b'/src/pants',
+                         AnalysisTools._PANTS_WORKDIR_PLACEHOLDER: b'/src/pants/.pants.d'}
+      buf = StringIO.StringIO()
+      ZincAnalysisParser().rebase(iter(get_analysis_text(analysis_file).splitlines(True)), buf,
+                                  rebase_mappings)
+      return buf.getvalue()
+
+    # Localizing undoes relativizing.
+    self.assertEqual(get_analysis_text('simple.analysis'), localize('simple.rebased.analysis'))
+
+    # Except for the java home entries that were filtered out.
+    self.assertEqual(get_analysis_text('simple.localized.filtered.analysis'),
+                     localize('simple.rebased.filtered.analysis'))
+
 
 class ZincAnalysisTestSorting(unittest.TestCase):
   class FakeElement(ZincAnalysisElement):
@@ -80,3 +100,28 @@ class ZincAnalysisTestSorting(unittest.TestCase):
     with environment_as(ZINCUTILS_SORTED_ANALYSIS='1'):
       unsorted_elem = self.FakeElement([unsorted_arg])
       do_test(unsorted_elem)
+
+
+class ZincAnalysisTestRebaser(unittest.TestCase):
+
+  def test_rebase_anywhere(self):
+    rebaser = _Rebaser({b'/src/pants': b'/BUILDROOT', b'/src/pants/.pants.d': b'/WORKDIR'})
+    self.assertEqual(b'/WORKDIR/a -> /BUILDROOT/b\nx:/BUILDROOT/c\n',
+                     rebaser.rebase_anywhere(b'/src/pants/.pants.d/a -> /src/pants/b\n'
+                                             b'x:/src/pants/c\n'))
+
+  def test_rebase_prefix(self):
+    rebaser = _Rebaser({b'/src/pants': b'/BUILDROOT', b'/src/pants/.pants.d': b'/WORKDIR'})
+    self.assertEqual(b'/WORKDIR/a -> /src/pants/b\nx:/src/pants/c\n/BUILDROOT/d\n',
+                     rebaser.rebase_prefix(b'/src/pants/.pants.d/a -> /src/pants/b\n'
+                                           b'x:/src/pants/c\n/src/pants/d\n'))
+
+  def test_rebase_prefix_replaces_first_match_only(self):
+    # The new base of the longer prefix starts with the shorter prefix, which must not then be
+    # replaced too.
+    rebaser = _Rebaser({b'/a/b': b'/a/x', b'/a': b'/z'})
+    self.assertEqual(b'/a/x/c\n/z/d\nq/a\n', rebaser.rebase_prefix(b'/a/b/c\n/a/d\nq/a\n'))
+
+  def test_newlines_rejected(self):
+    with self.assertRaises(ValueError):
+      _Rebaser({b'/a\n': b'/b'})
@@ -5,10 +5,12 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import os
 import subprocess
 from contextlib import contextmanager
 from textwrap import dedent
 
+from pants.backend.python.python_requirement import PythonRequirement
 from pants.backend.python.tasks.python_task import PythonTask
 from pants.util.contextutil import temporary_file_path
 from pants_test.backend.python.tasks.python_task_test_base import PythonTaskTestBase
@@ -52,14 +54,15 @@ class PythonTaskTest(PythonTaskTestBase):
     self.binary = self.target('src/python/bin')
 
   @contextmanager
-  def cached_chroot(self):
+  def cached_chroot(self, extra_requirements=None):
     python_task = self.create_task(self.context(target_roots=[self.binary]))
 
     interpreter = python_task.select_interpreter_for_targets(self.binary.closure())
     pex_info = self.binary.pexinfo
     platforms = self.binary.platforms
 
-    chroot = python_task.cached_chroot(interpreter, pex_info, [self.binary], platforms)
+    chroot = python_task.cached_chroot(interpreter, pex_info, [self.binary], platforms,
+                                       extra_requirements=extra_requirements)
     with temporary_file_path() as pex:
       chroot.dump()
       chroot.package_pex(pex)
@@ -102,3 +105,41 @@ class PythonTaskTest(PythonTaskTestBase):
         # Adding an unused requests dep does not change the behavior of the binary despite
         # invalidating the chroot
         self.assertEqual(subprocess.check_output(pex1), subprocess.check_output(pex2))
+
+  def test_cached_chroot_links_unchanged_requirements_from_previous_chroot(self):
+    with self.cached_chroot() as (chroot1, pex1):
+      self.rebind_targets()
+      self.create_file('src/python/lib/lib.py', mode='ab',
+                       contents="  six.print_('Mad River Glen!')")
+      with self.cached_chroot() as (chroot2, pex2):
+        self.assertNotEqual(chroot1.path(), chroot2.path())
+        self.assertFalse(os.path.samefile(os.path.join(chroot1.path(), 'lib', 'lib.py'),
+                                          os.path.join(chroot2.path(), 'lib', 'lib.py')))
+
+        deps = os.path.join(chroot1.path(), '.deps')
+        six_dist = next(dist for dist in os.listdir(deps) if dist.startswith('six'))
+        self.assertTrue(os.path.samefile(os.path.join(deps, six_dist, 'six.py'),
+                                         os.path.join(chroot2.path(), '.deps', six_dist, 'six.py')))
+        self.assertNotEqual(subprocess.check_output(pex1), subprocess.check_output(pex2))
+
+  def test_cached_chroot_links_unchanged_sources_with_unpinned_requirements(self):
+    # Like the requirements that pytest runs add to their chroots by default.
+    def testing_reqs():
+      return [PythonRequirement('pytest>=2.6,<2.7'), PythonRequirement('pytest-timeout<1.0.0')]
+
+    with self.cached_chroot(extra_requirements=testing_reqs()) as (chroot1, pex1):
+      self.rebind_targets()
+      self.create_file('src/python/lib/lib.py', mode='ab',
+                       contents="  six.print_('Mad River Glen!')")
+      with self.cached_chroot(extra_requirements=testing_reqs()) as (chroot2, pex2):
+        self.assertNotEqual(chroot1.path(), chroot2.path())
+        self.assertTrue(os.path.samefile(os.path.join(chroot1.path(), 'lib', '__init__.py'),
+                                         os.path.join(chroot2.path(), 'lib', '__init__.py')))
+        self.assertFalse(os.path.samefile(os.path.join(chroot1.path(), 'lib', 'lib.py'),
+                                          os.path.join(chroot2.path(), 'lib', 'lib.py')))
+
+        # The requirements are resolved again, but to the same distributions, which are linked.
+        deps = os.path.join(chroot1.path(), '.deps')
+        six_dist = next(dist for dist in os.listdir(deps) if dist.startswith('six'))
+        self.assertTrue(os.path.samefile(os.path.join(deps, six_dist, 'six.py'),
+                                         os.path.join(chroot2.path(), '.deps', six_dist, 'six.py')))
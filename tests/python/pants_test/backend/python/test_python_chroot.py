@@ -16,7 +16,7 @@ from pex.platforms import Platform
 from pants.backend.codegen.antlr.python.python_antlr_library import PythonAntlrLibrary
 from pants.backend.codegen.thrift.python.python_thrift_library import PythonThriftLibrary
 from pants.backend.python.interpreter_cache import PythonInterpreterCache
-from pants.backend.python.python_chroot import PythonChroot
+from pants.backend.python.python_chroot import ChrootManifest, PythonChroot
 from pants.backend.python.python_requirement import PythonRequirement
 from pants.backend.python.python_setup import PythonRepos, PythonSetup
 from pants.backend.python.targets.python_binary import PythonBinary
@@ -37,6 +37,32 @@ def test_get_current_platform():
   assert set(expected_platforms) == set(PythonChroot.get_platforms(['current', 'linux-x86_64']))
 
 
+def test_chroot_manifest_round_trip():
+  manifest = ChrootManifest(path='/chroots/abc',
+                            sources_key='ghi',
+                            sources={'a/b.py': ('source', '123'), 'a/c.txt': ('resource', '456')},
+                            requirements_fingerprint='def',
+                            distributions={'six-1.9.0-py2.py3-none-any.whl': '789'})
+  with temporary_dir() as tmpdir:
+    manifest_path = os.path.join(tmpdir, 'manifests', 'def')
+    assert ChrootManifest.load(manifest_path) is None
+    manifest.save(manifest_path)
+    assert manifest == ChrootManifest.load(manifest_path)
+
+    with open(manifest_path, 'wb') as fp:
+      fp.write(b'{"path": ')
+    assert ChrootManifest.load(manifest_path) is None
+
+
+def test_only_pinned_requirements_are_reusable():
+  assert PythonChroot._is_pinned(PythonRequirement('six==1.9.0'))
+  assert PythonChroot._is_pinned(PythonRequirement('six===1.9.0'))
+  assert not PythonChroot._is_pinned(PythonRequirement('six'))
+  assert not PythonChroot._is_pinned(PythonRequirement('six>=1.9.0'))
+  assert not PythonChroot._is_pinned(PythonRequirement('six==1.*'))
+  assert not PythonChroot._is_pinned(PythonRequirement('six>=1.9.0,==1.9.0'))
+
+
 class PythonChrootTest(BaseTest):
 
   def setUp(self):
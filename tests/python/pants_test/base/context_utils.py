@@ -40,6 +40,8 @@ class TestContext(Context):
    or "closing".
    """
 
+    parent = None
+
     def output(self, name):
       return sys.stderr
 
@@ -55,6 +57,8 @@ class TestContext(Context):
 
     artifact_cache_stats = DummyArtifactCacheStats()
 
+    def register_thread(self, parent_workunit): pass
+
   @contextmanager
   def new_workunit(self, name, labels=None, cmd='', log_config=None):
     """
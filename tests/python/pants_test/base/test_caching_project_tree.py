@@ -0,0 +1,80 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import pickle
+import unittest
+
+from pants.base.caching_project_tree import CachingProjectTree
+from pants.base.file_system_project_tree import FileSystemProjectTree
+from pants.base.project_tree import Dir, File, Link
+from pants_test.base.pants_ignore_test_base import PantsIgnoreTestBase
+
+
+class CachingProjectTreeTest(unittest.TestCase, PantsIgnoreTestBase):
+  """
+  Common test cases are defined in PantsIgnoreTestBase.
+  Caching specific test cases are defined here.
+  """
+
+  def mk_project_tree(self, build_root, ignore_patterns=None):
+    return CachingProjectTree(FileSystemProjectTree(build_root, ignore_patterns))
+
+  def setUp(self):
+    super(CachingProjectTreeTest, self).setUp()
+    self.prepare()
+
+  def tearDown(self):
+    super(CachingProjectTreeTest, self).tearDown()
+    self.cleanup()
+
+  def test_cached_until_invalidated(self):
+    self._project_tree = self.mk_project_tree(self.root_dir)
+    self.assertFalse(self._project_tree.isfile('fruit/kiwi'))
+    self.assertNotIn('fruit/kiwi', self._walk_tree())
+
+    self.touch('fruit/kiwi')
+    self.assertFalse(self._project_tree.isfile('fruit/kiwi'))
+    self.assertNotIn('fruit/kiwi', self._walk_tree())
+
+    self._project_tree.invalidate(['fruit/kiwi'])
+    self.assertTrue(self._project_tree.isfile('fruit/kiwi'))
+    self.assertIn('fruit/kiwi', self._walk_tree())
+    self.assertIn(File('fruit/kiwi'), self._project_tree.scandir('fruit'))
+
+  def test_invalidate_new_directory(self):
+    self._project_tree = self.mk_project_tree(self.root_dir)
+    self._walk_tree()
+
+    self.touch('grocery/vegetables/kale')
+    self._project_tree.invalidate(['grocery/vegetables'])
+    self.assertIn('grocery/vegetables/kale', self._walk_tree())
+    self.assertIn(Dir('grocery/vegetables'), self._project_tree.scandir('grocery'))
+
+  def test_walk_does_not_follow_links(self):
+    os.symlink('fruit', os.path.join(self.root_dir, 'fruit.ln'))
+    self._project_tree = self.mk_project_tree(self.root_dir)
+    uncached = FileSystemProjectTree(self.root_dir)
+    for topdown in (True, False):
+      self.assertEquals(list(uncached.walk('', topdown=topdown)),
+                        list(self._project_tree.walk('', topdown=topdown)))
+    self.assertIn(Link('fruit.ln'), self._project_tree.scandir(''))
+
+  def test_walk_pruned(self):
+    self._project_tree = self.mk_project_tree(self.root_dir)
+    visited = []
+    for root, dirs, files in self._project_tree.walk(''):
+      visited.append(root)
+      dirs[:] = [d for d in dirs if d != 'fruit']
+    self.assertEquals(['', 'grocery'], visited)
+
+  def test_pickle(self):
+    self._project_tree = self.mk_project_tree(self.root_dir)
+    files = self._walk_tree()
+    self._project_tree = pickle.loads(pickle.dumps(self._project_tree))
+    self.assertEquals(self.mk_project_tree(self.root_dir), self._project_tree)
+    self.assertEquals(files, self._walk_tree())
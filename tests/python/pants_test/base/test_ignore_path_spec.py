@@ -0,0 +1,92 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import unittest
+
+from pathspec import PathSpec
+from pathspec.gitignore import GitIgnorePattern
+
+from pants.base.ignore_path_spec import IgnorePathSpec
+
+
+class IgnorePathSpecTest(unittest.TestCase):
+
+  PATHS = [
+    '',
+    'BUILD',
+    'dist',
+    'dist/',
+    'dist/a.pex',
+    'src/dist/a.pex',
+    '.pants.d/',
+    '.pants.d/compile/zinc',
+    'src/.hidden',
+    'src/python/pants/BUILD',
+    'src/python/pants/base/',
+    'src/python/pants/base/project_tree.pyc',
+    'build-support/pants_dev_deps.venv/',
+    'build-support/pants_dev_deps.venv/bin/python',
+    'build-support/virtualenv',
+    'node_modules/',
+    'web/node_modules/left-pad/index.js',
+    'a.egg-info/',
+    'a/b',
+    'a/x/y/b',
+    'a/x/y/b/c',
+    'ab/b',
+    'foo/bar',
+    'foo/bar/baz',
+    'foo/keep',
+    'd[ist]/x',
+    'd+ist/x',
+  ]
+
+  def assert_same_matches(self, patterns):
+    expected = PathSpec.from_lines(GitIgnorePattern, patterns)
+    actual = IgnorePathSpec.from_gitignore_lines(patterns)
+    self.assertEquals(set(expected.match_files(self.PATHS)), set(actual.match_files(self.PATHS)))
+    for path in self.PATHS:
+      self.assertEquals(path in set(expected.match_files([path])), actual.match_file(path),
+                        'Mismatch for {!r} against {!r}'.format(path, patterns))
+
+  def test_empty(self):
+    self.assert_same_matches([])
+    self.assert_same_matches(['', '# comment'])
+
+  def test_defaults(self):
+    self.assert_same_matches(['.*', '/dist/', 'bower_components', 'node_modules', '*.egg-info'])
+
+  def test_anchored(self):
+    self.assert_same_matches(['/dist', 'build-support/*.venv/', 'src/python/pants/BUILD'])
+    self.assert_same_matches(['a/**/b', '/foo/bar/'])
+
+  def test_escaped_literals(self):
+    self.assert_same_matches(['/d+ist/', '/d[ist]/', 'd\\[ist\\]/'])
+
+  def test_negation(self):
+    self.assert_same_matches(['foo/', '!foo/keep'])
+    self.assert_same_matches(['/foo/*', '!/foo/keep', '/foo/keep'])
+    self.assert_same_matches(['!dist', '*.pyc', '/dist/', '!src/dist/a.pex', 'src/'])
+
+  def test_many_patterns(self):
+    unanchored = ['*.pyc', '*.pex', '*~', '.*', 'node_modules/', 'bin/', 'b/', '*.egg-info/']
+    anchored = ['/{}/{}/'.format(area, project)
+                for area in ('src', 'tests', 'a', 'foo', 'web', 'build-support')
+                for project in ('python', 'dist', 'x', 'bar', 'node_modules', 'keep', 'legacy',
+                                'scratch', 'tmp', 'generated', 'fixtures', 'sandbox', 'vendor',
+                                'old', 'dev', 'ci', 'docs', 'release', 'tools', 'data', 'assets')]
+    negated = ['!/src/python/pants/base/', '!foo/keep', '!a.egg-info/']
+    self.assert_same_matches(unanchored + anchored + negated)
+
+  def test_match_files_original_paths(self):
+    spec = IgnorePathSpec.from_gitignore_lines(['/dist/'])
+    self.assertEquals(['dist/a.pex'], list(spec.match_files(['dist/a.pex', 'src/a.pex'])))
+
+  def test_is_path_spec(self):
+    spec = IgnorePathSpec.from_gitignore_lines(['a', '', 'b'])
+    self.assertIsInstance(spec, PathSpec)
+    self.assertEquals(2, len(spec))
@@ -0,0 +1,42 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import unittest
+
+import mock
+
+from pants.bin.daemon_pants_runner import DaemonPantsRunner
+from pants.pantsd.subsystem.subprocess import Subprocess
+from pants.subsystem.subsystem import Subsystem
+from pants_test.subsystem.subsystem_util import init_subsystem
+
+
+class DaemonPantsRunnerTest(unittest.TestCase):
+
+  def setUp(self):
+    init_subsystem(Subprocess.Factory)
+    self.addCleanup(Subsystem.reset)
+
+  def run_with_loaded(self, fingerprint, loaded_fingerprint):
+    runner = DaemonPantsRunner(mock.Mock(), mock.Mock(), ['./pants', 'list'], {}, None,
+                               build_configuration_fingerprint=fingerprint)
+    with mock.patch('pants.bin.daemon_pants_runner.OptionsInitializer') as mock_initializer, \
+         mock.patch.object(DaemonPantsRunner, 'daemonize') as mock_daemonize:
+      mock_initializer.loaded_build_configuration_fingerprint.return_value = loaded_fingerprint
+      runner.run()
+    mock_daemonize.assert_called_once_with(write_pid=False)
+    return runner._reuse_build_configuration
+
+  def test_reuses_loaded_build_configuration(self):
+    self.assertTrue(self.run_with_loaded('fp1', 'fp1'))
+
+  def test_does_not_reuse_reloaded_build_configuration(self):
+    # Another request reloaded the daemon's backends and plugins before this run forked.
+    self.assertFalse(self.run_with_loaded('fp1', 'fp2'))
+
+  def test_does_not_reuse_unloaded_build_configuration(self):
+    self.assertFalse(self.run_with_loaded(None, None))
@@ -306,3 +306,16 @@ class LoaderTest(unittest.TestCase):
     # the plugin will override the alias registered by the backend
     registered_aliases = self.build_configuration.registered_aliases()
     self.assertEqual(DummyTarget2, registered_aliases.target_types['override-alias'])
+
+  def test_timings(self):
+    self.working_set.add(self.get_mock_plugin('timed', '0.0.1'))
+    timings = {}
+    with self.create_register() as backend_module:
+      load_backends_and_plugins(['timed'], self.working_set, [backend_module],
+                                build_configuration=self.build_configuration,
+                                timings=timings)
+    self.assertEqual({'load backend pants.build_graph',
+                      'load backend pants.core_tasks',
+                      'load backend {}'.format(backend_module),
+                      'load plugin timed'},
+                     set(timings))
@@ -5,13 +5,18 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import sys
 import unittest
+from StringIO import StringIO
 
 from pkg_resources import WorkingSet
 
 from pants.base.exceptions import BuildConfigurationError
 from pants.bin.options_initializer import OptionsInitializer
+from pants.goal.goal import Goal
 from pants.option.options_bootstrapper import OptionsBootstrapper
+from pants.subsystem.subsystem import Subsystem
+from pants.util.contextutil import stdio_as
 
 
 class OptionsInitializerTest(unittest.TestCase):
@@ -21,3 +26,30 @@ class OptionsInitializerTest(unittest.TestCase):
 
     with self.assertRaises(BuildConfigurationError):
       initializer.setup()
+
+  def test_build_configuration_fingerprint(self):
+    def fingerprint(*args):
+      options_bootstrapper = OptionsBootstrapper(args=['./pants'] + list(args))
+      return OptionsInitializer(options_bootstrapper, WorkingSet()).build_configuration_fingerprint()
+
+    self.assertEqual(fingerprint(), fingerprint())
+    self.assertEqual(fingerprint(), fingerprint('-ldebug'))
+    self.assertNotEqual(fingerprint(), fingerprint('--backend-packages=+["pants.contrib.go"]'))
+    self.assertNotEqual(fingerprint(), fingerprint('--plugins=["some.plugin==1.0"]'))
+
+  def test_startup_profile(self):
+    OptionsInitializer.reset()
+    self.addCleanup(OptionsInitializer.reset)
+    self.addCleanup(Goal.clear)
+    self.addCleanup(Subsystem.reset)
+    options_bootstrapper = OptionsBootstrapper(args=['./pants', '--backend-packages=[]'])
+    initializer = OptionsInitializer(options_bootstrapper, WorkingSet())
+    initializer.setup(init_logging=False)
+
+    stderr = StringIO()
+    with stdio_as(stdout=sys.stdout, stderr=stderr):
+      initializer.report_startup_profile()
+    profile = stderr.getvalue()
+    self.assertIn('load backend pants.core_tasks', profile)
+    self.assertIn('parse options', profile)
+    self.assertIn('total', profile)
@@ -0,0 +1,85 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import shutil
+import unittest
+
+from pants.base.file_system_project_tree import FileSystemProjectTree
+from pants.base.project_tree import Dir, File, Link
+from pants.engine.fs import PathGlobs
+from pants.engine.glob_index import GlobIndex
+from pants.util.dirutil import safe_mkdtemp, safe_rmtree, touch
+
+
+class GlobIndexTest(unittest.TestCase):
+
+  _original_src = os.path.join(os.path.dirname(__file__), 'examples/fs_test')
+
+  def setUp(self):
+    work_dir = safe_mkdtemp()
+    self.addCleanup(safe_rmtree, work_dir)
+    self.build_root = os.path.join(work_dir, 'build_root')
+    shutil.copytree(self._original_src, self.build_root, symlinks=True)
+    self.index = GlobIndex(FileSystemProjectTree(self.build_root))
+
+  def expand(self, *filespecs):
+    return self.index.expand(PathGlobs.create_from_specs('', filespecs))
+
+  def assert_paths(self, filespecs, expected):
+    paths = self.expand(*filespecs).dependencies
+    self.assertEquals(sorted(expected), sorted((p.path, type(p.stat)) for p in paths))
+
+  def test_literal(self):
+    self.assert_paths(['4.txt'], [('4.txt', File)])
+    self.assert_paths(['a/b/1.txt', 'a/b/2'], [('a/b/1.txt', File), ('a/b/2', File)])
+    self.assert_paths(['z.txt'], [])
+    self.assert_paths(['.'], [('', Dir)])
+
+  def test_literal_through_links(self):
+    self.assert_paths(['c.ln/2'], [('c.ln/2', File)])
+    self.assert_paths(['d.ln/b/1.txt'], [('d.ln/b/1.txt', File)])
+    self.assert_paths(['a/4.txt.ln'], [('a/4.txt.ln', Link)])
+
+  def test_siblings(self):
+    self.assert_paths(['*'], [('4.txt', File), ('a', Dir), ('c.ln', Link), ('d.ln', Link)])
+    self.assert_paths(['c.ln/*.txt'], [('c.ln/1.txt', File)])
+
+  def test_recursive(self):
+    self.assert_paths(['**/*.txt'], [('4.txt', File),
+                                     ('a/3.txt', File),
+                                     ('a/b/1.txt', File),
+                                     ('c.ln/1.txt', File),
+                                     ('d.ln/3.txt', File),
+                                     ('d.ln/b/1.txt', File)])
+    self.assert_paths(['a/**/2'], [('a/b/2', File)])
+
+  def test_multiple_patterns_deduped(self):
+    self.assert_paths(['**/*.txt', 'a/b/1.txt', '4.txt'], [('4.txt', File),
+                                                           ('a/3.txt', File),
+                                                           ('a/b/1.txt', File),
+                                                           ('c.ln/1.txt', File),
+                                                           ('d.ln/3.txt', File),
+                                                           ('d.ln/b/1.txt', File)])
+
+  def test_listings_are_memoized(self):
+    self.expand('**')
+    # The root, `a` and `a/b`: linked directories share the listings of their destinations.
+    self.assertEquals(3, self.index.stats()['indexed_directories'])
+    touch(os.path.join(self.build_root, 'a/b/5.txt'))
+    self.assert_paths(['a/b/*.txt'], [('a/b/1.txt', File)])
+
+  def test_invalidate(self):
+    recursive = PathGlobs.create_from_specs('', ['**/*.txt'])
+    literal = PathGlobs.create_from_specs('', ['4.txt'])
+    self.index.expand(recursive)
+    self.index.expand(literal)
+
+    touch(os.path.join(self.build_root, 'a/b/5.txt'))
+    self.assertEquals({recursive}, self.index.invalidate(['a/b/5.txt']))
+    self.assertIn('c.ln/5.txt', [p.path for p in self.index.expand(recursive).dependencies])
+    self.assertEquals({recursive, literal}, self.index.invalidate(['6.txt']))
@@ -16,8 +16,10 @@ from pants.engine.addressable import Exactly
 from pants.engine.build_files import create_graph_tasks
 from pants.engine.fs import PathGlobs, create_fs_intrinsics, create_fs_tasks
 from pants.engine.mapper import AddressMapper
-from pants.engine.rules import GraphMaker, Rule, RuleIndex, RulesetValidator
+from pants.engine.rules import (GraphMaker, Rule, RuleIndex, RulesetValidationCache,
+                                RulesetValidator)
 from pants.engine.selectors import Select, SelectDependencies, SelectLiteral, SelectProjection
+from pants.util.contextutil import temporary_dir
 from pants_test.engine.examples.parsers import JsonParser
 from pants_test.engine.examples.planners import Goal
 from pants_test.engine.test_mapper import TargetTable
@@ -302,6 +304,35 @@ class RulesetValidatorTest(unittest.TestCase):
 # no because it may be that there are some subgraphs particular to a particular root subject.
 
 
+class RulesetValidationCacheTest(unittest.TestCase):
+  def _fingerprint(self, cache, rules, goals=None):
+    return cache.fingerprint(RuleIndex.create(rules, tuple()),
+                             goal_to_product=goals or {},
+                             root_subject_fns={k: lambda p: Select(p) for k in (SubA,)})
+
+  def test_fingerprint_is_stable(self):
+    cache = RulesetValidationCache('unused')
+    rules = [(A, (Select(SubA),), noop), (B, (Select(A),), noop)]
+    self.assertEquals(self._fingerprint(cache, rules),
+                      self._fingerprint(cache, list(reversed(rules))))
+
+  def test_fingerprint_changes_with_rules_and_goals(self):
+    cache = RulesetValidationCache('unused')
+    rules = [(A, (Select(SubA),), noop)]
+    fingerprint = self._fingerprint(cache, rules)
+    self.assertNotEquals(fingerprint, self._fingerprint(cache, rules + [(B, (Select(A),), noop)]))
+    self.assertNotEquals(fingerprint, self._fingerprint(cache, rules, goals={'goal-name': A}))
+
+  def test_mark_validated(self):
+    with temporary_dir() as cache_dir:
+      cache = RulesetValidationCache(cache_dir)
+      fingerprint = self._fingerprint(cache, [(A, (Select(SubA),), noop)])
+      self.assertFalse(cache.is_validated(fingerprint))
+      cache.mark_validated(fingerprint)
+      self.assertTrue(cache.is_validated(fingerprint))
+      self.assertTrue(RulesetValidationCache(cache_dir).is_validated(fingerprint))
+
+
 class RuleGraphMakerTest(unittest.TestCase):
   # TODO something with variants
   # TODO HasProducts?
@@ -66,6 +66,20 @@ class UnionProductsTest(BaseTest):
     self.assertEquals(copied.get_for_targets(b.closure(bfs=True)), OrderedSet([2, 3]))
     self.assertEquals(copied.get_for_targets(c.closure(bfs=True)), OrderedSet([3]))
 
+  def test_copy_edits_are_independent(self):
+    a = self.make_target('a')
+    self.products.add_for_target(a, [1, 2])
+
+    copied = self.products.copy()
+    self.products.add_for_target(a, [3])
+    copied.remove_for_target(a, [1])
+    copied_again = copied.copy()
+    copied_again.add_for_target(a, [4])
+
+    self.assertEquals(self.products.get_for_target(a), OrderedSet([1, 2, 3]))
+    self.assertEquals(copied.get_for_target(a), OrderedSet([2]))
+    self.assertEquals(copied_again.get_for_target(a), OrderedSet([2, 4]))
+
   def test_remove_for_target(self):
     c = self.make_target('c')
     b = self.make_target('b', dependencies=[c])
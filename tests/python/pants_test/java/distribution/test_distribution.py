@@ -15,8 +15,9 @@ from twitter.common.collections import maybe_list
 
 from pants.base.revision import Revision
 from pants.java.distribution.distribution import (Distribution, DistributionLocator,
-                                                  _EnvVarEnvironment, _LinuxEnvironment, _Locator,
-                                                  _OSXEnvironment, _UnknownEnvironment)
+                                                  SystemPropertiesCache, _EnvVarEnvironment,
+                                                  _LinuxEnvironment, _Locator, _OSXEnvironment,
+                                                  _UnknownEnvironment)
 from pants.util.contextutil import environment_as, temporary_dir, temporary_file
 from pants.util.dirutil import chmod_plus_x, safe_open, touch
 from pants_test.subsystem.subsystem_util import global_subsystem_instance
@@ -152,6 +153,43 @@ class DistributionValidationTest(unittest.TestCase):
                        dist.find_libs(['tools.jar', 'rt.jar']))
 
 
+class SystemPropertiesCacheTest(unittest.TestCase):
+  def test_round_trip(self):
+    with distribution(executables=EXE('bin/java')) as dist_root, temporary_dir() as cache_dir:
+      java = os.path.join(dist_root, 'bin', 'java')
+      cache = SystemPropertiesCache(cache_dir)
+      self.assertIsNone(cache.get(java))
+      cache.put(java, {'java.version': '1.8.0_1'})
+      self.assertEqual({'java.version': '1.8.0_1'}, SystemPropertiesCache(cache_dir).get(java))
+
+  def test_changed_binary_invalidates(self):
+    with distribution(executables=EXE('bin/java')) as dist_root, temporary_dir() as cache_dir:
+      java = os.path.join(dist_root, 'bin', 'java')
+      cache = SystemPropertiesCache(cache_dir)
+      cache.put(java, {'java.version': '1.8.0_1'})
+      with open(java, 'a') as fp:
+        fp.write('\n')
+      self.assertIsNone(cache.get(java))
+
+  def test_distribution_uses_cache(self):
+    with distribution(executables=EXE('bin/java', '1.7.0_25')) as dist_root:
+      with temporary_dir() as cache_dir:
+        bin_path = os.path.join(dist_root, 'bin')
+        cache = SystemPropertiesCache(cache_dir)
+
+        dist = Distribution(bin_path=bin_path, system_properties_cache=cache)
+        self.assertEqual(Revision.lenient('1.7.0_25'), dist.version)
+        properties = cache.get(dist.java)
+        self.assertEqual('1.7.0_25', properties['java.version'])
+
+        # Cached properties are used in place of launching the binary.
+        properties['java.version'] = '1.8.0_1'
+        cache.put(dist.java, properties)
+        dist = Distribution(bin_path=bin_path, minimum_version='1.8',
+                            system_properties_cache=cache)
+        self.assertEqual(Revision.lenient('1.8.0_1'), dist.version)
+
+
 class DistributionEnvLocationTest(unittest.TestCase):
   def setUp(self):
     super(DistributionEnvLocationTest, self).setUp()
@@ -144,6 +144,7 @@ class TestNailgunClient(unittest.TestCase):
     self.nailgun_client.execute('test')
     self.assertEquals(mock_try_connect.call_count, 1)
     self.assertEquals(mock_session.call_count, 1)
+    self.assertGreaterEqual(self.nailgun_client.last_connect_seconds, 0)
 
   @mock.patch.object(NailgunClient, 'try_connect', **PATCH_OPTS)
   @mock.patch('pants.java.nailgun_client.NailgunClientSession', **PATCH_OPTS)
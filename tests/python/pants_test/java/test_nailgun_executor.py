@@ -5,10 +5,14 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import fcntl
+import os
+
 import mock
 import psutil
 
-from pants.java.nailgun_executor import NailgunExecutor
+from pants.java.nailgun_client import NailgunClient
+from pants.java.nailgun_executor import NailgunExecutor, NailgunLatency, NailgunProcessGroup
 from pants_test.base_test import BaseTest
 
 
@@ -25,10 +29,13 @@ class NailgunExecutorTest(BaseTest):
   def setUp(self):
     super(NailgunExecutorTest, self).setUp()
     self.executor = NailgunExecutor(identity='test',
-                                    workdir='/__non_existent_dir',
+                                    workdir=os.path.join(self.pants_workdir, 'ng', 'test'),
                                     nailgun_classpath=[],
                                     distribution=mock.Mock(),
                                     metadata_base_dir=self.subprocess_dir)
+    verified_servers = mock.patch.dict(NailgunExecutor._verified_servers, clear=True)
+    verified_servers.start()
+    self.addCleanup(verified_servers.stop)
 
   def test_is_alive_override(self):
     with mock.patch.object(NailgunExecutor, '_as_process', **PATCH_OPTS) as mock_as_process:
@@ -51,3 +58,122 @@ class NailgunExecutorTest(BaseTest):
       )
       self.assertFalse(self.executor.is_alive())
       mock_as_process.assert_called_with(self.executor)
+
+  def test_verified_server_skips_state_check(self):
+    with mock.patch.object(NailgunExecutor, '_check_nailgun_state', **PATCH_OPTS) as mock_check, \
+         mock.patch.object(NailgunExecutor, '_create_ngclient', **PATCH_OPTS) as mock_create, \
+         mock.patch.object(NailgunExecutor, 'socket', new_callable=mock.PropertyMock) as mock_socket:
+      mock_check.return_value = (True, False)
+      mock_socket.return_value = 4567
+
+      self.executor._get_nailgun_client(['-Xmx1g'], ['a.jar'], None, None)
+      self.executor._get_nailgun_client(['-Xmx1g'], ['a.jar'], None, None)
+      self.assertEqual(1, mock_check.call_count)
+      mock_create.assert_called_with(self.executor, 4567, None, None)
+
+      # A differing fingerprint re-checks the server.
+      self.executor._get_nailgun_client(['-Xmx2g'], ['a.jar'], None, None)
+      self.assertEqual(2, mock_check.call_count)
+
+  def _mock_client(self, execute_side_effect):
+    self.executor._distribution.java = 'java'
+    client = mock.create_autospec(NailgunClient, instance=True)
+    client.NailgunError = NailgunClient.NailgunError
+    client.NailgunConnectionError = NailgunClient.NailgunConnectionError
+    client.execute.side_effect = execute_side_effect
+    client.last_connect_seconds = 0.0
+    return client
+
+  def test_run_retries_stale_verified_server(self):
+    stale = self._mock_client(NailgunClient.NailgunConnectionError('refused'))
+    fresh = self._mock_client(lambda *args: 0)
+    NailgunExecutor._verified_servers[self.executor._server_key] = ('fp', 'java', 1)
+    latencies = []
+    self.executor._latency_observer = latencies.append
+    with mock.patch.object(NailgunExecutor, '_get_nailgun_client', **PATCH_OPTS) as mock_get:
+      mock_get.side_effect = [stale, fresh]
+      self.assertEqual(0, self.executor.execute([], 'Main', args=['arg']))
+    self.assertEqual(2, mock_get.call_count)
+    self.assertNotIn(self.executor._server_key, NailgunExecutor._verified_servers)
+    self.assertEqual(1, len(latencies))
+    self.assertIsInstance(latencies[0], NailgunLatency)
+
+  def test_run_does_not_retry_unverified_server(self):
+    stale = self._mock_client(NailgunClient.NailgunConnectionError('refused'))
+    with mock.patch.object(NailgunExecutor, '_get_nailgun_client', **PATCH_OPTS) as mock_get, \
+         mock.patch.object(NailgunExecutor, 'terminate', **PATCH_OPTS) as mock_terminate:
+      mock_get.return_value = stale
+      with self.assertRaises(NailgunExecutor.Error):
+        self.executor.execute([], 'Main')
+    self.assertEqual(1, mock_get.call_count)
+    mock_terminate.assert_called_once_with(self.executor)
+
+  def test_pool_member(self):
+    self.assertIs(self.executor, self.executor._pool_member(0))
+    member = self.executor._pool_member(2)
+    self.assertEqual('test_2', member._identity)
+    self.assertEqual(os.path.join(self.executor._workdir, 'pool', '2'), member._workdir)
+
+  def test_lease_least_loaded(self):
+    idle_slots = []
+    with NailgunProcessGroup.lease('test', 2, on_idle=idle_slots.append) as first:
+      self.assertEqual(0, first)
+      with NailgunProcessGroup.lease('test', 2, on_idle=idle_slots.append) as second:
+        self.assertEqual(1, second)
+        with NailgunProcessGroup.lease('test', 2, on_idle=idle_slots.append) as third:
+          self.assertEqual(0, third)
+    with NailgunProcessGroup.lease('test', 2, on_idle=idle_slots.append) as after:
+      self.assertEqual(0, after)
+    self.assertEqual([0, 1, 0], idle_slots)
+
+  def test_lease_pool_of_one(self):
+    idle_slots = []
+    with NailgunProcessGroup.lease('test', 1, on_idle=idle_slots.append) as first:
+      with NailgunProcessGroup.lease('test', 1, on_idle=idle_slots.append) as second:
+        self.assertEqual([0, 0], [first, second])
+    # The slot is only idle for the first lease, so a server in use is never recycled.
+    self.assertEqual([0], idle_slots)
+
+  def test_recycle_if_oversized(self):
+    self.executor._max_rss_bytes = 100
+    NailgunExecutor._verified_servers[self.executor._server_key] = ('fp', 'java', 1)
+    with mock.patch.object(NailgunExecutor, '_as_process', **PATCH_OPTS) as mock_as_process, \
+         mock.patch.object(NailgunExecutor, 'is_alive', **PATCH_OPTS) as mock_is_alive, \
+         mock.patch.object(NailgunExecutor, 'terminate', **PATCH_OPTS) as mock_terminate:
+      mock_is_alive.return_value = True
+      process = fake_process()
+      process.memory_info.return_value = mock.Mock(rss=50)
+      mock_as_process.return_value = process
+
+      self.executor._recycle_if_oversized()
+      self.assertFalse(mock_terminate.called)
+
+      process.memory_info.return_value = mock.Mock(rss=150)
+      self.executor._recycle_if_oversized()
+      mock_terminate.assert_called_once_with(self.executor)
+      self.assertNotIn(self.executor._server_key, NailgunExecutor._verified_servers)
+
+  def test_recycle_skipped_while_in_use(self):
+    self.executor._max_rss_bytes = 100
+    with mock.patch.object(NailgunExecutor, '_as_process', **PATCH_OPTS) as mock_as_process, \
+         mock.patch.object(NailgunExecutor, 'is_alive', **PATCH_OPTS) as mock_is_alive, \
+         mock.patch.object(NailgunExecutor, 'terminate', **PATCH_OPTS) as mock_terminate:
+      mock_is_alive.return_value = True
+      process = fake_process()
+      process.memory_info.return_value = mock.Mock(rss=150)
+      mock_as_process.return_value = process
+
+      # A command running on the server, possibly in another process, holds the lock shared.
+      with self.executor._server_lock() as acquired:
+        self.assertTrue(acquired)
+        self.executor._recycle_if_oversized()
+        self.assertFalse(mock_terminate.called)
+
+      # A second command may run on the server alongside the first.
+      with open(os.path.join(self.executor._workdir, 'server.lock'), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_SH)
+        with self.executor._server_lock() as acquired:
+          self.assertTrue(acquired)
+
+      self.executor._recycle_if_oversized()
+      mock_terminate.assert_called_once_with(self.executor)
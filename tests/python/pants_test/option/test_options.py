@@ -1049,6 +1049,78 @@ class OptionsTest(unittest.TestCase):
     self.assertEquals((bool, True), pairs[1])
     self.assertEquals((int, 77), pairs[2])
 
+  def test_get_fingerprintable_for_scope_memoized(self):
+    options = self._parse('./pants compile.scala --modifycompile=blah')
+    pairs = options.get_fingerprintable_for_scope('compile.scala')
+    self.assertIn('compile.scala', options._fingerprintable_by_scope)
+    # Callers receive their own copy of the memoized pairs.
+    pairs.append((str, 'extra'))
+    self.assertEquals(len(pairs) - 1, len(options.get_fingerprintable_for_scope('compile.scala')))
+
+    # New registrations invalidate the memoized pairs.
+    options.register('simple', '--also-fingerprinted', fingerprint=True)
+    self.assertNotIn('compile.scala', options._fingerprintable_by_scope)
+
+  def test_register_lazily(self):
+    registered = []
+
+    class Compile(Optionable):
+      options_scope = 'compile'
+
+      @classmethod
+      def register_options(cls, register):
+        registered.append(cls.options_scope)
+        register('--outer', type=int, default=1, recursive=True)
+
+    class CompileJava(Optionable):
+      options_scope = 'compile.java'
+
+      @classmethod
+      def register_options(cls, register):
+        registered.append(cls.options_scope)
+        register('--inner', type=int, default=2)
+
+    options = Options.create(env={},
+                             config=self._create_config({}),
+                             known_scope_infos=OptionsTest._known_scope_infos,
+                             args=shlex.split('./pants compile.java --outer=3'),
+                             option_tracker=OptionTracker())
+    options.register_lazily(CompileJava)
+    options.register_lazily(Compile)
+    self.assertEquals([], registered)
+
+    # Using an inner scope registers its enclosing scopes first.
+    values = options.for_scope('compile.java')
+    self.assertEquals(['compile', 'compile.java'], registered)
+    self.assertEquals(3, values.outer)
+    self.assertEquals(2, values.inner)
+
+    # Registration happens only once.
+    options.for_scope('compile')
+    self.assertEquals(['compile', 'compile.java'], registered)
+
+  def test_register_lazily_walk(self):
+    registered = []
+
+    class Simple(Optionable):
+      options_scope = 'simple'
+
+      @classmethod
+      def register_options(cls, register):
+        registered.append(cls.options_scope)
+        register('--spam')
+
+    options = Options.create(env={},
+                             config=self._create_config({}),
+                             known_scope_infos=OptionsTest._known_scope_infos,
+                             args=shlex.split('./pants'),
+                             option_tracker=OptionTracker())
+    options.register_lazily(Simple)
+    scopes = []
+    options.walk_parsers(lambda parser: scopes.append(parser.scope))
+    self.assertEquals(['simple'], registered)
+    self.assertIn('simple', scopes)
+
   def assert_fromfile(self, parse_func, expected_append=None, append_contents=None):
     def _do_assert_fromfile(dest, expected, contents):
       with temporary_file() as fp:
@@ -29,7 +29,8 @@ class TestPailgunService(unittest.TestCase):
                                   exiter_class=self.mock_exiter_class,
                                   runner_class=self.mock_runner_class,
                                   target_roots_class=self.mock_target_roots_class,
-                                  scheduler_service=self.mock_scheduler_service)
+                                  scheduler_service=self.mock_scheduler_service,
+                                  read_only_goals=('list', 'filedeps'))
 
   @mock.patch.object(PailgunService, '_setup_pailgun', **PATCH_OPTS)
   def test_pailgun_property_values(self, mock_setup):
@@ -37,3 +38,91 @@ class TestPailgunService(unittest.TestCase):
     mock_setup.return_value = fake_pailgun
     self.assertIs(self.service.pailgun, fake_pailgun)
     self.assertEqual(self.service.pailgun_port, 33333)
+
+  def test_is_read_only(self):
+    self.assertTrue(self.service._is_read_only(['./pants', 'list', '::']))
+    self.assertTrue(self.service._is_read_only(['./pants', '-ldebug', 'list', 'filedeps', 'a/b:c']))
+    self.assertTrue(self.service._is_read_only(['./pants', 'list', '--', 'passthru']))
+
+  def test_is_not_read_only(self):
+    self.assertFalse(self.service._is_read_only(['./pants', 'test', '::']))
+    self.assertFalse(self.service._is_read_only(['./pants', 'list', 'test', '::']))
+    self.assertFalse(self.service._is_read_only(['./pants', '--version']))
+    # An unidentifiable spec is conservatively treated as a goal.
+    self.assertFalse(self.service._is_read_only(['./pants', 'list', 'src']))
+
+  @mock.patch('pants.pantsd.service.pailgun_service.clean_global_runtime_state', autospec=True)
+  @mock.patch('pants.pantsd.service.pailgun_service.OptionsInitializer', autospec=True)
+  def test_warm_build_configuration(self, mock_initializer_class, mock_clean):
+    mock_initializer = mock_initializer_class.return_value
+    mock_initializer.build_configuration_fingerprint.return_value = 'fp1'
+    mock_initializer_class.loaded_build_configuration_fingerprint.return_value = None
+
+    self.assertEqual((mock_initializer, 'fp1'),
+                     self.service._warm_build_configuration(['./pants', 'list'], {}))
+    mock_clean.assert_called_once_with(reset_runtracker=False, reset_subsystem=True)
+    mock_initializer.setup.assert_called_once_with(init_logging=False)
+
+  @mock.patch('pants.pantsd.service.pailgun_service.clean_global_runtime_state', autospec=True)
+  @mock.patch('pants.pantsd.service.pailgun_service.OptionsInitializer', autospec=True)
+  def test_warm_build_configuration_reused(self, mock_initializer_class, mock_clean):
+    mock_initializer = mock_initializer_class.return_value
+    mock_initializer.build_configuration_fingerprint.return_value = 'fp1'
+    mock_initializer_class.loaded_build_configuration_fingerprint.return_value = 'fp1'
+
+    self.assertEqual((mock_initializer, 'fp1'),
+                     self.service._warm_build_configuration(['./pants', 'list'], {}))
+    self.assertFalse(mock_clean.called)
+    self.assertFalse(mock_initializer.setup.called)
+
+  @mock.patch('pants.pantsd.service.pailgun_service.OptionsInitializer', autospec=True)
+  def test_warm_build_configuration_failure(self, mock_initializer_class):
+    mock_initializer_class.return_value.build_configuration_fingerprint.side_effect = Exception()
+    self.assertEqual((None, None),
+                     self.service._warm_build_configuration(['./pants', 'list'], {}))
+
+  @mock.patch('pants.pantsd.service.pailgun_service.OptionsInitializer', autospec=True)
+  def test_create_target_roots_reuses_warmed_options(self, mock_initializer_class):
+    mock_initializer = mock.Mock()
+    mock_initializer.setup.return_value = (mock.sentinel.options, mock.sentinel.build_config)
+    mock_initializer_class.loaded_build_configuration_fingerprint.return_value = 'fp1'
+    self.mock_target_roots_class.create = mock.Mock(return_value=mock.sentinel.target_roots)
+    self.service._scheduler_service = mock.Mock()
+
+    self.assertIs(mock.sentinel.target_roots,
+                  self.service._create_target_roots(['./pants', 'test'], mock_initializer, 'fp1'))
+    mock_initializer.setup.assert_called_once_with(init_logging=False)
+    self.mock_target_roots_class.create.assert_called_once_with(
+      options=mock.sentinel.options,
+      args=['./pants', 'test'],
+      change_calculator=self.service._scheduler_service.change_calculator)
+
+  @mock.patch('pants.pantsd.service.pailgun_service.OptionsInitializer', autospec=True)
+  def test_create_target_roots_after_reload(self, mock_initializer_class):
+    # Another request has since loaded a different build configuration.
+    mock_initializer = mock.Mock()
+    mock_initializer_class.loaded_build_configuration_fingerprint.return_value = 'fp2'
+    self.mock_target_roots_class.create = mock.Mock()
+    self.service._scheduler_service = mock.Mock()
+
+    self.service._create_target_roots(['./pants', 'test'], mock_initializer, 'fp1')
+    self.assertFalse(mock_initializer.setup.called)
+    self.assertIsNone(self.mock_target_roots_class.create.call_args[1]['options'])
+
+  @mock.patch.object(PailgunService, '_warm_build_configuration', **PATCH_OPTS)
+  @mock.patch('pants.pantsd.service.pailgun_service.PailgunServer', autospec=True)
+  def test_target_roots_created_under_build_configuration_lock(self, mock_server_class,
+                                                               mock_warm):
+    mock_warm.return_value = (None, None)
+    readers = []
+    def create(**kwargs):
+      readers.append(self.service._build_configuration_lock._readers)
+    self.mock_target_roots_class.create = mock.Mock(side_effect=create)
+    self.mock_exiter_class.side_effect = None
+    self.mock_runner_class.side_effect = None
+    self.service._scheduler_service = mock.MagicMock()
+
+    self.service._setup_pailgun()
+    runner_factory = mock_server_class.call_args[0][1]
+    runner_factory(mock.Mock(), ['./pants', 'test', 'a:b'], {})
+    self.assertEqual([1], readers)
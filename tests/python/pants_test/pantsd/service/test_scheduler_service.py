@@ -0,0 +1,55 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import mock
+
+from pants.base import project_tree_factory
+from pants.base.caching_project_tree import CachingProjectTree
+from pants.base.file_system_project_tree import FileSystemProjectTree
+from pants.base.project_tree_factory import get_project_tree
+from pants.pantsd.service.scheduler_service import SchedulerService
+from pants_test.base_test import BaseTest
+
+
+class TestSchedulerService(BaseTest):
+  def setUp(self):
+    super(TestSchedulerService, self).setUp()
+    self.mock_fs_event_service = mock.Mock()
+    self.mock_graph_helper = mock.Mock()
+    self.service = SchedulerService(self.mock_fs_event_service, self.mock_graph_helper,
+                                    self.build_root, ['.*'])
+
+  def tearDown(self):
+    project_tree_factory._CACHING_PROJECT_TREE = None
+    super(TestSchedulerService, self).tearDown()
+
+  def run_options(self, pants_ignore):
+    return mock.Mock(build_file_rev=None, pants_ignore=pants_ignore)
+
+  def test_project_tree_uncached_without_daemon(self):
+    project_tree = get_project_tree(self.run_options(['.*']))
+    self.assertIsInstance(project_tree, FileSystemProjectTree)
+
+  def test_project_tree_cached_by_daemon(self):
+    self.service.setup()
+    project_tree = get_project_tree(self.run_options(['.*']))
+    self.assertIsInstance(project_tree, CachingProjectTree)
+    self.assertIs(project_tree, get_project_tree(self.run_options(['.*'])))
+
+    # Runs that ignore other paths do not see the same files as the daemon.
+    self.assertIsInstance(get_project_tree(self.run_options([])), FileSystemProjectTree)
+
+  def test_project_tree_invalidated_by_events(self):
+    self.service.setup()
+    project_tree = get_project_tree(self.run_options(['.*']))
+    self.assertFalse(project_tree.exists('a/BUILD'))
+
+    self.create_file('a/BUILD')
+    self.assertFalse(project_tree.exists('a/BUILD'))
+    self.service._handle_batch_event(['a/BUILD'])
+    self.assertTrue(project_tree.exists('a/BUILD'))
+    self.mock_graph_helper.scheduler.invalidate_files.assert_called_once_with(['a/BUILD'])
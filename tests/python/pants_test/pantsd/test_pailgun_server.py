@@ -48,10 +48,20 @@ class TestPailgunServer(unittest.TestCase):
     self.assertEquals(self.server.server_port, 31337)
     self.assertIs(mock_tcpserver_bind.called, True)
 
+  @mock.patch.object(PailgunServer, 'process_request_thread', **PATCH_OPTS)
+  def test_process_request_threaded(self, mock_process_request_thread):
+    mock_request = mock.Mock()
+    with mock.patch('pants.pantsd.pailgun_server.threading.Thread') as mock_thread_class:
+      self.server.process_request(mock_request, ('1.2.3.4', 31338))
+    _, kwargs = mock_thread_class.call_args
+    self.assertEquals(kwargs['target'], self.server.process_request_thread)
+    self.assertEquals(kwargs['args'], (mock_request, ('1.2.3.4', 31338)))
+    self.assertIs(mock_thread_class.return_value.start.called, True)
+
   @mock.patch.object(PailgunServer, 'close_request', **PATCH_OPTS)
   def test_process_request(self, mock_close_request):
     mock_request = mock.Mock()
-    self.server.process_request(mock_request, ('1.2.3.4', 31338))
+    self.server.process_request_thread(mock_request, ('1.2.3.4', 31338))
     self.assertIs(self.mock_handler_inst.handle_request.called, True)
     mock_close_request.assert_called_once_with(self.server, mock_request)
 
@@ -59,7 +69,7 @@ class TestPailgunServer(unittest.TestCase):
   def test_process_request_error(self, mock_shutdown_request):
     mock_request = mock.Mock()
     self.mock_handler_inst.handle_request.side_effect = AttributeError('oops')
-    self.server.process_request(mock_request, ('1.2.3.4', 31338))
+    self.server.process_request_thread(mock_request, ('1.2.3.4', 31338))
     self.assertIs(self.mock_handler_inst.handle_request.called, True)
     self.assertIs(self.mock_handler_inst.handle_error.called, True)
     mock_shutdown_request.assert_called_once_with(self.server, mock_request)
@@ -6,16 +6,18 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import errno
+import logging
 import os
 import subprocess
 import sys
+import threading
 from contextlib import contextmanager
 
 import mock
 import psutil
 
 from pants.pantsd.process_manager import (ProcessGroup, ProcessManager, ProcessMetadataManager,
-                                          swallow_psutil_exceptions)
+                                          fork_with_logging_locks, swallow_psutil_exceptions)
 from pants.util.contextutil import temporary_dir
 from pants.util.dirutil import safe_file_dump
 from pants_test.base_test import BaseTest
@@ -30,6 +32,38 @@ def fake_process(**kwargs):
   return proc
 
 
+class TestForkWithLoggingLocks(BaseTest):
+  def test_child_threads_may_log(self):
+    test_logger = logging.getLogger('{}.{}'.format(__name__, self.__class__.__name__))
+    with temporary_dir() as tmpdir:
+      handler = logging.FileHandler(os.path.join(tmpdir, 'log'))
+      test_logger.addHandler(handler)
+      stop = threading.Event()
+      def log_until_stopped():
+        while not stop.is_set():
+          test_logger.warning('parent')
+      # Log concurrently with the fork, so that its locks are likely to be contended.
+      thread = threading.Thread(target=log_until_stopped)
+      thread.start()
+      try:
+        pid = fork_with_logging_locks()
+        if pid == 0:
+          # Log from the child's only thread, and then from a new one, which does not own any
+          # locks that were held across the fork.
+          test_logger.warning('child')
+          child_thread = threading.Thread(target=test_logger.warning, args=('child thread',))
+          child_thread.start()
+          child_thread.join(5)
+          os._exit(1 if child_thread.is_alive() else 0)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(0, status)
+      finally:
+        stop.set()
+        thread.join()
+        test_logger.removeHandler(handler)
+        handler.close()
+
+
 class TestProcessGroup(BaseTest):
   def setUp(self):
     super(TestProcessGroup, self).setUp()
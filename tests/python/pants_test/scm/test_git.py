@@ -211,6 +211,42 @@ class GitTest(unittest.TestCase):
     with current_reader.open('dir/relative-dotdot') as f:
       self.assertEquals('Hello World.\u2764'.encode('utf-8'), f.read())
 
+  def test_prefetch(self):
+    reader = self.git.repo_reader(self.initial_rev)
+    reader.prefetch()
+    self.assertEquals({'', 'dir'}, set(reader._trees))
+
+    # Prefetched trees are served without reading from git.
+    reader._read_objects_from_repo = None
+    self.assertEquals(['README', 'dir', 'link-to-dir', 'loop1', 'loop2', 'not-a-dir'],
+                      sorted(reader.listdir('.')))
+    self.assertTrue(reader.isdir('dir'))
+    self.assertEquals(reader.File, type(reader.lstat('dir/f')))
+
+  def test_prefetch_file(self):
+    reader = self.git.repo_reader(self.initial_rev)
+    reader.prefetch('README')
+    reader.prefetch('no-such-dir')
+    self.assertEquals(['f',
+                       'not-absolute\u2764'.encode('utf-8'),
+                       'relative-dotdot',
+                       'relative-nonexistent',
+                       'relative-symlink'],
+                      sorted(reader.listdir('dir')))
+
+  def test_read_objects_batched(self):
+    reader = self.git.repo_reader(self.initial_rev)
+    specs = ['{}:dir/f'.format(self.initial_rev)] * (reader._MAX_BATCH_SIZE * 2 + 1)
+    results = reader._read_objects_from_repo(specs)
+    self.assertEquals([('blob', 'file in subdir')] * len(specs), results)
+
+    with self.assertRaises(reader.MissingFileException):
+      reader._read_objects_from_repo(['{}:README'.format(self.initial_rev),
+                                      '{}:no-such-file'.format(self.initial_rev)])
+    # The pipe to git stays in sync after a missing object.
+    with reader.open('README') as f:
+      self.assertEquals('', f.read())
+
   def test_integration(self):
     self.assertEqual(set(), self.git.changed_files())
     self.assertEqual({'README'}, self.git.changed_files(from_commit='HEAD^'))
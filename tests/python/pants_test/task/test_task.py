@@ -6,11 +6,16 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import os
+import threading
+from contextlib import contextmanager
+
+import mock
 
 from pants.base.build_environment import get_buildroot
 from pants.base.payload import Payload
 from pants.build_graph.target import Target
 from pants.cache.cache_setup import CacheSetup
+from pants.invalidation.build_invalidator import CacheKey
 from pants.task.task import Task
 from pants.util.dirutil import safe_rmtree
 from pants_test.tasks.task_test_base import TaskTestBase
@@ -273,3 +278,52 @@ class TaskTest(TaskTestBase):
     vtC_live = list(vtC.live_dirs())
     self.assertNotIn(vtB.current_results_dir, vtC_live)
     self.assertEqual(len(vtC_live), 2)
+
+  def test_artifacts_for_keys(self):
+    self._toggle_cache(True)
+    task, _ = self._fixture(incremental=False)
+    artifact = self.create_file('artifacts/artifact', 'contents')
+    cache_key = CacheKey('artifact', 'hash')
+    self.assertFalse(task.fetch_cached_artifact(cache_key))
+
+    task.update_artifact_cache_for_keys([(cache_key, [artifact])])
+    os.unlink(artifact)
+    self.assertTrue(task.fetch_cached_artifact(cache_key))
+    with open(artifact) as fp:
+      self.assertEqual('contents', fp.read())
+
+  def test_results_dir_root(self):
+    task, vt, _ = self._run_fixture()
+    self.assertEqual(task.results_dir_root,
+                     os.path.dirname(os.path.dirname(vt.current_results_dir)))
+
+  def test_map_concurrently_in_calling_thread(self):
+    task, _ = self._fixture(incremental=False)
+    calls = []
+    def record(a, b):
+      calls.append(threading.current_thread())
+      return a + b
+
+    self.assertEqual([3, 7], task.map_concurrently('dummy', record, [(1, 2), (3, 4)], 1))
+    self.assertEqual([4], task.map_concurrently('dummy', record, [(2, 2)], 8))
+    self.assertEqual([threading.current_thread()] * 3, calls)
+
+  def test_map_concurrently_on_worker_pool(self):
+    task, _ = self._fixture(incremental=False)
+
+    @contextmanager
+    def new_workunit(name):
+      self.assertEqual('dummy-pool-bootstrap', name)
+      yield mock.Mock()
+
+    with mock.patch.object(task.context, 'new_workunit', side_effect=new_workunit), \
+         mock.patch('pants.task.task.WorkerPool') as mock_worker_pool_class:
+      worker_pool = mock_worker_pool_class.return_value
+      worker_pool.submit_work_and_wait.return_value = [3, 7, 11]
+      self.assertEqual([3, 7, 11],
+                       task.map_concurrently('dummy', None, [(1, 2), (3, 4), (5, 6)], 2))
+
+    self.assertEqual(2, mock_worker_pool_class.call_args[0][2])
+    self.assertEqual([(1, 2), (3, 4), (5, 6)],
+                     worker_pool.submit_work_and_wait.call_args[0][0].args_tuples)
+    worker_pool.shutdown.assert_called_once_with()
@@ -0,0 +1,81 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import threading
+import unittest
+
+from pants.util.rwlock import ReadWriteLock
+
+
+class ReadWriteLockTest(unittest.TestCase):
+  def setUp(self):
+    self.lock = ReadWriteLock()
+
+  def _start(self, target):
+    thread = threading.Thread(target=target)
+    thread.daemon = True
+    thread.start()
+    return thread
+
+  def test_concurrent_readers(self):
+    with self.lock.read_locked():
+      acquired = threading.Event()
+
+      def read():
+        with self.lock.read_locked():
+          acquired.set()
+
+      self._start(read)
+      self.assertTrue(acquired.wait(5))
+
+  def test_writer_excludes_readers(self):
+    acquired = threading.Event()
+
+    def read():
+      with self.lock.read_locked():
+        acquired.set()
+
+    with self.lock.write_locked():
+      thread = self._start(read)
+      self.assertFalse(acquired.wait(0.1))
+    thread.join(5)
+    self.assertTrue(acquired.is_set())
+
+  def test_waiting_writer_is_preferred(self):
+    events = []
+    writer_waiting = threading.Event()
+
+    def write():
+      writer_waiting.set()
+      with self.lock.write_locked():
+        events.append('write')
+
+    def read():
+      with self.lock.read_locked():
+        events.append('read')
+
+    self.lock.acquire_read()
+    writer = self._start(write)
+    writer_waiting.wait(5)
+    # Wait for the writer to block on the lock before starting another reader.
+    while not self.lock._waiting_writers:
+      writer.join(0.01)
+    reader = self._start(read)
+    self.lock.release_read()
+    writer.join(5)
+    reader.join(5)
+    self.assertEquals(['write', 'read'], events)
+
+  def test_yields_wait_time(self):
+    with self.lock.write_locked() as waited:
+      self.assertGreaterEqual(waited, 0)
+
+  def test_release_unheld(self):
+    with self.assertRaises(RuntimeError):
+      self.lock.release_read()
+    with self.assertRaises(RuntimeError):
+      self.lock.release_write()